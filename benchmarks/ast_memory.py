@@ -0,0 +1,83 @@
+from argparse import ArgumentParser
+import importlib.util
+from pathlib import Path
+import random
+import sys
+import tempfile
+import tracemalloc
+
+from pylox.expression_arena import ExpressionArena
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tool"))
+from generate_ast import define_ast  # noqa: E402
+
+
+def generate_source(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    operators = ["+", "-", "*", "/", "==", "<"]
+    pieces = ["1"]
+    length = 1
+    while length < size:
+        operand = rng.choice(["2", "(3 - 4)", "-5", "true ? 6 : 7"])
+        piece = f" {rng.choice(operators)} {operand}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def load_factory(slots: bool, frozen: bool, plain: bool = False):
+    # Generates a variant of `pylox.expression` and loads it as a module.
+    path = Path(tempfile.mkdtemp()) / "expression_variant.py"
+    path.write_text(define_ast(slots, frozen, plain))
+    spec = importlib.util.spec_from_file_location("expression_variant", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module.ExpressionFactory()
+
+
+class CountingFactory:
+    def __init__(self, factory):
+        self.factory = factory
+        self.nodes = 0
+
+    def __getattr__(self, name: str):
+        create = getattr(self.factory, name)
+
+        def counted(*args):
+            self.nodes += 1
+            return create(*args)
+
+        return counted
+
+
+def measure(tokens, factory) -> tuple[int, int]:
+    # Returns the node count and the bytes still allocated after parsing.
+    counter = CountingFactory(factory)
+    tracemalloc.start()
+    result = Parser(tokens, counter).parse()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result is not None
+    return counter.nodes, allocated
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Report AST memory per node")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tokens = RegexScanner(generate_source(args.size, args.seed)).scan_tokens()
+    layouts = [
+        ("dataclass", lambda: load_factory(False, False)),
+        ("slots", lambda: load_factory(True, False)),
+        ("slots+frozen", lambda: load_factory(True, True)),
+        ("slots+plain", lambda: load_factory(True, False, plain=True)),
+        ("arena", ExpressionArena),
+    ]
+    for name, create_factory in layouts:
+        nodes, allocated = measure(tokens, create_factory())
+        print(f"{name:>12}: {nodes} nodes, {allocated / nodes:6.1f} bytes/node")
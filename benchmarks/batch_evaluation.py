@@ -0,0 +1,87 @@
+from argparse import ArgumentParser
+import random
+import time
+
+import numpy as np
+
+from pylox.batch_evaluator import BatchEvaluator
+from pylox.interpreter import Interpreter
+from pylox.node_counter import NodeCounter
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+
+
+def generate_source(depth: int, rng: random.Random) -> str:
+    # A random formula over the columns `x`, `y` and `label` that evaluates
+    # without runtime errors for every row.
+    if depth == 0:
+        return rng.choice(["x", "y", str(rng.randint(1, 9))])
+    left = generate_source(depth - 1, rng)
+    right = generate_source(depth - 1, rng)
+    match rng.randrange(5):
+        case 0:
+            return f"({left} + {right})"
+        case 1:
+            return f"({left} - -{right})"
+        case 2:
+            return f"({left} * {right})"
+        case 3:
+            return f'((label == "a") ? {left} : {right})'
+        case _:
+            return f"({left} < {right} ? {left} : {right})"
+
+
+def generate_columns(rows: int, rng: np.random.Generator) -> dict:
+    return {
+        "x": rng.uniform(-10, 10, rows),
+        "y": rng.uniform(-10, 10, rows),
+        "label": rng.choice(np.array(["a", "b"], dtype=object), rows),
+    }
+
+
+def measure(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare per-row and batch evaluation")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--row-limit", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    source = generate_source(args.depth, random.Random(args.seed))
+    expression = Parser(RegexScanner(source).scan_tokens()).parse()
+    print(f"{NodeCounter().count(expression)} nodes")
+
+    for rows in args.rows:
+        columns = generate_columns(rows, np.random.default_rng(args.seed))
+        evaluator = BatchEvaluator(columns)
+        batch = measure(lambda: evaluator.evaluate(expression), args.repeat)
+        line = f"{rows:>10,} rows: batch {rows / batch:>14,.0f} rows/sec"
+
+        # Evaluating row by row is only timed up to `--row-limit` rows.
+        if rows <= args.row_limit:
+            records = [
+                dict(zip(columns, values))
+                for values in zip(*(column.tolist() for column in columns.values()))
+            ]
+            expected = [Interpreter(record).evaluate(expression) for record in records]
+            assert evaluator.evaluate(expression).tolist() == expected
+
+            per_row = measure(
+                lambda: [
+                    Interpreter(record).evaluate(expression) for record in records
+                ],
+                args.repeat,
+            )
+            line += f", per row {rows / per_row:>12,.0f} rows/sec"
+            line += f" ({per_row / batch:,.1f}x)"
+        print(line)
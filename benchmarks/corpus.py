@@ -0,0 +1,136 @@
+import random
+from typing import Callable, Dict
+
+
+# Seeded generators of Lox sources of roughly `size` characters, each a single
+# expression that scans and parses without errors. Some are representative
+# of real input, the others stress one part of the scanner or the parser.
+
+
+def literal_chain(size: int, rng: random.Random) -> str:
+    # A long left-associative chain of binary operations over literals.
+    operands = [
+        lambda: str(rng.randint(0, 10_000)),
+        lambda: f"{rng.randint(0, 999)}.{rng.randint(0, 999)}",
+        lambda: '"' + "x" * rng.randint(0, 16) + '"',
+        lambda: rng.choice(["true", "false", "nil"]),
+    ]
+    operators = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">="]
+    pieces = [operands[0]()]
+    length = len(pieces[0])
+    while length < size:
+        piece = f" {rng.choice(operators)} {rng.choice(operands)()}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def deep_parentheses(size: int, rng: random.Random) -> str:
+    # Groupings nested `size / 2` deep around a single literal.
+    depth = max(size // 2, 1)
+    return "(" * depth + str(rng.randint(0, 9)) + ")" * depth
+
+
+def ternary_chain(size: int, rng: random.Random) -> str:
+    # `a ? b : c ? d : e ...`, which nests to the left.
+    pieces = [str(rng.randint(0, 9))]
+    length = 1
+    while length < size:
+        piece = f" ? {rng.randint(0, 99)} < {rng.randint(0, 99)} : {rng.randint(0, 9)}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def huge_strings(size: int, rng: random.Random) -> str:
+    # A few string literals of tens of thousands of characters, with newlines.
+    pieces = []
+    length = 0
+    while length < size:
+        lines = [
+            "".join(rng.choice("abcdefghij ") for _ in range(rng.randint(40, 120)))
+            for _ in range(rng.randint(100, 400))
+        ]
+        piece = '"' + "\n".join(lines) + '"'
+        pieces.append(piece)
+        length += len(piece) + 3
+    return " + ".join(pieces)
+
+
+def nested_comments(size: int, rng: random.Random) -> str:
+    # Operands separated by block comments nested several levels deep.
+    def comment(depth: int) -> str:
+        if depth == 0:
+            return "text * / ( ) \n"
+        inner = " ".join(comment(depth - 1) for _ in range(rng.randint(1, 3)))
+        return f"/* {inner} */"
+
+    pieces = [str(rng.randint(0, 9))]
+    length = 1
+    while length < size:
+        piece = f" + {comment(rng.randint(1, 6))} {rng.randint(0, 9)}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def numeric(size: int, rng: random.Random) -> str:
+    # Arithmetic over many long number literals.
+    pieces = [str(rng.randint(1, 9))]
+    length = 1
+    while length < size:
+        number = str(rng.randint(0, 10**12))
+        if rng.random() < 0.5:
+            number += f".{rng.randint(0, 10**9)}"
+        piece = f" {rng.choice('+-*/')} {number}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def mixed(size: int, rng: random.Random) -> str:
+    # Balanced random trees that use every precedence level of the grammar,
+    # joined by commas until the source is long enough.
+    def tree(depth: int) -> str:
+        if depth == 0:
+            return rng.choice(["1", "2.5", '"a"', "true", "nil", "x"])
+        left = tree(depth - 1)
+        right = tree(depth - 1)
+        match rng.randrange(7):
+            case 0:
+                return f"({left} == {right})"
+            case 1:
+                return f"({left} ? {right} : {left})"
+            case 2:
+                return f"({left} < {right})"
+            case 3:
+                return f"({left} + {right})"
+            case 4:
+                return f"({left} * {right})"
+            case 5:
+                return f"({left} / {right})"
+            case _:
+                return f"-!{left}"
+
+    pieces = [tree(6)]
+    length = len(pieces[0])
+    while length < size:
+        piece = tree(6)
+        pieces.append(piece)
+        length += len(piece) + 2
+    return ",\n".join(pieces)
+
+
+CORPORA: Dict[str, Callable[[int, random.Random], str]] = {
+    "mixed": mixed,
+    "literal_chain": literal_chain,
+    "deep_parentheses": deep_parentheses,
+    "ternary_chain": ternary_chain,
+    "huge_strings": huge_strings,
+    "nested_comments": nested_comments,
+    "numeric": numeric,
+}
+
+
+def generate(name: str, size: int, seed: int) -> str:
+    return CORPORA[name](size, random.Random(seed))
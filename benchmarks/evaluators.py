@@ -0,0 +1,84 @@
+from argparse import ArgumentParser
+import random
+import time
+
+from pylox.closure_compiler import compile_expression
+from pylox.compiler import Compiler
+from pylox.evaluator import Evaluator
+from pylox.interpreter import Interpreter
+from pylox.node_counter import NodeCounter
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.transpiler import PythonBackend
+from pylox.vm import VM
+
+
+def generate_source(depth: int, rng: random.Random) -> str:
+    # A random expression tree of the given depth that evaluates without
+    # runtime errors: numeric operands only, and no division.
+    if depth == 0:
+        return str(rng.randint(1, 9))
+    left = generate_source(depth - 1, rng)
+    right = generate_source(depth - 1, rng)
+    match rng.randrange(5):
+        case 0:
+            return f"({left} + {right})"
+        case 1:
+            return f"({left} - -{right})"
+        case 2:
+            return f"({left} * {right})"
+        case 3:
+            return f"({left} == {right}, {right})"
+        case _:
+            return f"({left} < {right} ? 1 : 2)"
+
+
+def measure(evaluate, expressions, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for expression in expressions:
+            evaluate(expression)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare expression evaluation strategies")
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--trees", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    expressions = [
+        Parser(RegexScanner(generate_source(args.depth, rng)).scan_tokens()).parse()
+        for _ in range(args.trees)
+    ]
+    nodes = sum(NodeCounter().count(expression) for expression in expressions)
+
+    interpreter = Interpreter()
+    evaluator = Evaluator()
+    compiled = {id(e): compile_expression(e) for e in expressions}
+    vm = VM()
+    chunks = {id(e): Compiler().compile(e) for e in expressions}
+    python_backend = PythonBackend()
+    functions = {id(e): python_backend.compile(e) for e in expressions}
+    evaluators = [
+        ("dispatch-table", evaluator.evaluate),
+        ("closure", lambda expression: compiled[id(expression)]()),
+        ("vm", lambda expression: vm.run(chunks[id(expression)])),
+        ("python", lambda expression: functions[id(expression)]()),
+    ]
+    expected = [interpreter.evaluate(e) for e in expressions]
+    for _, evaluate in evaluators:
+        assert [evaluate(e) for e in expressions] == expected
+
+    baseline = measure(interpreter.evaluate, expressions, args.repeat)
+    print(f"{'visitor':>14}: {nodes / baseline:,.0f} nodes/sec")
+    for name, evaluate in evaluators:
+        elapsed = measure(evaluate, expressions, args.repeat)
+        print(
+            f"{name:>14}: {nodes / elapsed:,.0f} nodes/sec ({baseline / elapsed:.2f}x)"
+        )
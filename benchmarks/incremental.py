@@ -0,0 +1,117 @@
+from argparse import ArgumentParser
+import random
+import time
+
+from pylox.expression import Expression
+from pylox.incremental import Document
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics
+
+
+def generate_source(depth: int, rng: random.Random) -> str:
+    # A random expression tree of the given depth, spread over many lines.
+    if depth == 0:
+        return rng.choice(["1", "2.5", '"a"', "true", "nil", "x"])
+    left = generate_source(depth - 1, rng)
+    right = generate_source(depth - 1, rng)
+    separator = "\n" if depth < 4 else " "
+    match rng.randrange(4):
+        case 0:
+            return f"({left} +{separator}{right})"
+        case 1:
+            return f"({left} == {right})"
+        case 2:
+            return f"({left} ? {right} :{separator}{left})"
+        case _:
+            return f"({left} * {right})"
+
+
+def generate_chain(terms: int, rng: random.Random) -> str:
+    # A flat chain of binary operators without parentheses, a few terms to a
+    # line, whose tree is as deep as the chain is long.
+    parts = [rng.choice(["1", "2.5", "x"])]
+    for term in range(1, terms):
+        operator = rng.choice(["+", "-", "*", "==", "<"])
+        separator = "\n" if term % 8 == 0 else " "
+        parts.append(f" {operator}{separator}{rng.choice(['1', '2.5', 'x'])}")
+    return "".join(parts)
+
+
+def generate_edits(source: str, kind: str, count: int, rng: random.Random) -> list:
+    # Edits that keep the source valid, each made and then undone at a digit
+    # near the previous one, as when typing: a digit is replaced, or a space
+    # or a newline is inserted before it.
+    digits = [offset for offset, character in enumerate(source) if character == "1"]
+    position = rng.randrange(len(digits))
+    edits = []
+    for _ in range(count):
+        position = min(max(position + rng.randint(-20, 20), 0), len(digits) - 1)
+        offset = digits[position]
+        match kind:
+            case "replace":
+                edits += [(offset, 1, "7"), (offset, 1, "1")]
+            case "space":
+                edits += [(offset, 0, " "), (offset, 1, "")]
+            case _:
+                edits += [(offset, 0, "\n"), (offset, 1, "")]
+    return edits
+
+
+def full_parse(source: str):
+    return Parser(RegexScanner(source).scan_tokens(), diagnostics=Diagnostics()).parse()
+
+
+def same_tree(left, right) -> bool:
+    # `==` on nodes recurses, which a long chain is too deep for.
+    stack = [(left, right)]
+    while stack:
+        left, right = stack.pop()
+        if not isinstance(left, Expression) or type(left) is not type(right):
+            if left != right:
+                return False
+            continue
+        for name in left.__match_args__:
+            stack.append((getattr(left, name), getattr(right, name)))
+    return True
+
+
+def measure(name: str, source: str, edits: int, rng: random.Random) -> None:
+    start = time.perf_counter()
+    full_parse(source)
+    full = time.perf_counter() - start
+    print(f"{name}, {len(source):,} characters: full parse {full * 1e6:,.1f} us")
+
+    # The same edits with and without an error at the end of the source,
+    # which the parser reports after the last operator.
+    for suffix in ["", " +"]:
+        for kind in ["replace", "space", "newline"]:
+            edit_list = generate_edits(source, kind, edits, rng)
+            document = Document(source + suffix)
+            start = time.perf_counter()
+            for edit in edit_list:
+                document.edit(*edit)
+            incremental = (time.perf_counter() - start) / len(edit_list)
+            assert document.source == source + suffix
+            assert same_tree(document.expression, full_parse(source + suffix))
+            label = kind if not suffix else f"{kind}, error"
+            print(
+                f"{label:>16}: {incremental * 1e6:>12,.1f} us per edit"
+                f" ({full / incremental:,.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare incremental and full reparsing")
+    parser.add_argument("--depth", type=int, nargs="+", default=[8, 12, 16])
+    parser.add_argument("--terms", type=int, nargs="+", default=[10_000, 40_000])
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for depth in args.depth:
+        rng = random.Random(args.seed)
+        measure(f"depth {depth}", generate_source(depth, rng), args.edits, rng)
+    for terms in args.terms:
+        rng = random.Random(args.seed)
+        measure(f"{terms:,} terms", generate_chain(terms, rng), args.edits, rng)
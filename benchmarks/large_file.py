@@ -0,0 +1,73 @@
+from argparse import ArgumentParser
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+from scanner_throughput import generate_source
+
+# Scans a large file with each scanner engine in a fresh process, streaming
+# the tokens without keeping them, and reports the wall time and the peak
+# resident memory of the process. Pages of a memory-mapped file count
+# towards resident memory once they have been read.
+SCAN = """
+import resource, sys, time
+from pylox.lox import scanner_class
+
+start = time.perf_counter()
+with open(sys.argv[2], "r") as file:
+    count = sum(1 for _ in scanner_class(sys.argv[1])(file).iter_tokens())
+seconds = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(count, seconds, peak)
+"""
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Scan a large file with each engine")
+    parser.add_argument("--size", type=int, default=100, metavar="MB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", default=["default", "regex", "bytes"])
+    args = parser.parse_args()
+
+    environment = dict(os.environ)
+    source_path = str(Path(__file__).resolve().parents[1] / "src")
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [source_path, environment.get("PYTHONPATH")])
+    )
+
+    # A megabyte of source, repeated up to the requested size.
+    block = generate_source(1 << 20, args.seed) + "\n+ "
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as file:
+        for _ in range(max(args.size, 1)):
+            file.write(block)
+        file.write("0\n")
+    try:
+        size = os.path.getsize(file.name)
+        baseline = subprocess.run(
+            [sys.executable, "-c", SCAN, "default", os.devnull],
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        baseline_peak = int(baseline.stdout.split()[2])
+        print(
+            f"{size / (1 << 20):,.0f} MiB file, {baseline_peak / 1024:,.0f} MiB at start"
+        )
+        for engine in args.engines:
+            process = subprocess.run(
+                [sys.executable, "-c", SCAN, engine, file.name],
+                env=environment,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            count, seconds, peak = process.stdout.split()
+            print(
+                f"{engine:>8}: {int(count):,} tokens in {float(seconds):7.2f}s,"
+                f" peak {int(peak) / 1024:8,.0f} MiB resident"
+            )
+    finally:
+        os.unlink(file.name)
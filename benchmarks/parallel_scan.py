@@ -0,0 +1,91 @@
+from argparse import ArgumentParser
+import os
+import time
+
+from corpus import generate
+from pylox.parallel_scanner import ParallelScanner, split_points
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+
+def generate_source(size: int, seed: int) -> str:
+    # Mostly ordinary expressions, with multi-line strings and nested
+    # comments mixed in so that some natural split points are unsafe.
+    parts = []
+    length = 0
+    index = 0
+    while length < size:
+        name = ["mixed", "huge_strings", "mixed", "nested_comments"][index % 4]
+        part = generate(name, min(size - length, 1 << 18), seed + index)
+        parts.append(part)
+        length += len(part) + 3
+        index += 1
+    return "\n+ ".join(parts)
+
+
+def timed(scan):
+    diagnostics = Diagnostics()
+    start = time.perf_counter()
+    tokens = scan(diagnostics)
+    return time.perf_counter() - start, tokens, diagnostics.format()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Scan one large source in parallel")
+    parser.add_argument("--size", type=int, default=20_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()]
+    )
+    args = parser.parse_args()
+
+    source = generate_source(args.size, args.seed)
+    print(f"{len(source):,} characters, {os.cpu_count()} cores")
+
+    start = time.perf_counter()
+    split_points(source, 4 * os.cpu_count())
+    print(f"{'prepass':>12}: {time.perf_counter() - start:8.2f}s")
+
+    seconds, expected, errors = timed(
+        lambda diagnostics: Scanner(source, diagnostics=diagnostics).scan_tokens()
+    )
+    print(f"{'Scanner':>12}: {seconds:8.2f}s, {len(expected):,} tokens")
+    seconds, tokens, _ = timed(
+        lambda diagnostics: RegexScanner(source, diagnostics=diagnostics).scan_tokens()
+    )
+    print(f"{'RegexScanner':>12}: {seconds:8.2f}s")
+    seconds, buffer, _ = timed(
+        lambda diagnostics: RegexScanner(
+            source, diagnostics=diagnostics
+        ).scan_token_buffer()
+    )
+    print(f"{'  to buffer':>12}: {seconds:8.2f}s")
+    seconds, _, _ = timed(
+        lambda diagnostics: Parser(buffer, diagnostics=diagnostics).parse()
+    )
+    print(f"{'  parse':>12}: {seconds:8.2f}s")
+    del buffer
+
+    # `scan_token_buffer` is what `lox` parses. `scan_tokens` builds a
+    # `Token` for each token in this process, which takes about as long as
+    # `RegexScanner` does for the whole scan.
+    for workers in sorted(set(args.workers)):
+        seconds, buffer, parallel_errors = timed(
+            lambda diagnostics: ParallelScanner(
+                source, diagnostics=diagnostics, workers=workers, min_size=0
+            ).scan_token_buffer()
+        )
+        identical = list(buffer) == expected and parallel_errors == errors
+        del buffer
+        print(
+            f"{workers:>4} workers: {seconds:8.2f}s"
+            f"{'' if identical else ', DIFFERENT FROM Scanner'}"
+        )
+        seconds, _, _ = timed(
+            lambda diagnostics: ParallelScanner(
+                source, diagnostics=diagnostics, workers=workers, min_size=0
+            ).scan_tokens()
+        )
+        print(f"{'  as Tokens':>12}: {seconds:8.2f}s")
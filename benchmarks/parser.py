@@ -0,0 +1,73 @@
+from argparse import ArgumentParser
+import random
+import time
+
+from pylox.node_counter import NodeCounter
+from pylox.parser import Parser
+from pylox.recursive_descent_parser import RecursiveDescentParser
+from pylox.regex_scanner import RegexScanner
+
+
+def generate_source(depth: int, rng: random.Random) -> str:
+    # A random expression tree of the given depth that uses every precedence
+    # level of the grammar. Operands are parenthesised, since the branches of
+    # a ternary cannot themselves be ternaries.
+    if depth == 0:
+        return rng.choice(["1", "2.5", '"a"', "true", "nil", "x"])
+    left = generate_source(depth - 1, rng)
+    right = generate_source(depth - 1, rng)
+    match rng.randrange(8):
+        case 0:
+            return f"({left}, {right})"
+        case 1:
+            return f"({left} == {right})"
+        case 2:
+            return f"({left} ? {right} : {left})"
+        case 3:
+            return f"({left} < {right})"
+        case 4:
+            return f"({left} + {right})"
+        case 5:
+            return f"({left} * {right})"
+        case 6:
+            return f"({left} / {right})"
+        case _:
+            return f"-!{left}"
+
+
+def measure(parser_class, tokens, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_class(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare the parser implementations")
+    parser.add_argument("--depth", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    source = generate_source(args.depth, random.Random(args.seed))
+    tokens = RegexScanner(source).scan_tokens()
+    expression = Parser(tokens).parse()
+    assert expression == RecursiveDescentParser(tokens).parse()
+    nodes = NodeCounter().count(expression)
+    print(f"{len(tokens):,} tokens, {nodes:,} nodes")
+
+    baseline = measure(RecursiveDescentParser, tokens, args.repeat)
+    print(f"{'recursive descent':>20}: {nodes / baseline:>12,.0f} nodes/sec")
+    elapsed = measure(Parser, tokens, args.repeat)
+    print(
+        f"{'precedence climbing':>20}: {nodes / elapsed:>12,.0f} nodes/sec"
+        f" ({baseline / elapsed:.2f}x)"
+    )
+
+    # Nesting that the recursive descent parser cannot handle.
+    depth = 100_000
+    nested = RegexScanner("(" * depth + "1" + ")" * depth).scan_tokens()
+    elapsed = measure(Parser, nested, 1)
+    print(f"{depth:,} nested groupings: {depth / elapsed:,.0f} nodes/sec")
@@ -0,0 +1,81 @@
+from argparse import ArgumentParser
+import os
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def generate_program(statements: int, error_rate: float, seed: int) -> str:
+    # One short arithmetic statement per line, with a fraction of them
+    # broken in one of a few ways.
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(statements):
+        line = (
+            f"({rng.randint(0, 99)} + {rng.randint(0, 99)})"
+            f" * {rng.randint(1, 9)} == {rng.randint(0, 999)};"
+        )
+        if rng.random() < error_rate:
+            line = rng.choice(
+                [line.replace(")", "", 1), line.replace("+", "+ *"), line[:-1]]
+            )
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def run(arguments: list, environment: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pylox.lox", *arguments],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Compare one process per expression with --program"
+    )
+    parser.add_argument("--statements", type=int, default=100_000)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--sample", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    environment = dict(os.environ)
+    source_path = str(Path(__file__).resolve().parents[1] / "src")
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [source_path, environment.get("PYTHONPATH")])
+    )
+    program = generate_program(args.statements, args.error_rate, args.seed)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "program.lox")
+    with open(path, "w") as file:
+        file.write(program)
+
+    # A process per expression is only timed for a sample of them.
+    statement_path = os.path.join(directory, "statement.lox")
+    seconds = 0.0
+    for line in program.splitlines()[: args.sample]:
+        with open(statement_path, "w") as file:
+            file.write(line.rstrip(";"))
+        seconds += run(["-b", "evaluate", "-f", statement_path], environment)
+    estimate = seconds / args.sample * args.statements
+    print(f"{'process each':>16}: {estimate:10.2f} s (estimated from {args.sample})")
+
+    for output_format in ["text", "jsonl"]:
+        seconds = run(
+            ["-b", "evaluate", "-f", path, "--program", "--format", output_format],
+            environment,
+        )
+        print(
+            f"{'--program ' + output_format:>16}: {seconds:10.2f} s"
+            f" ({args.statements / seconds:,.0f} statements/sec)"
+        )
+    os.unlink(statement_path)
+    os.unlink(path)
+    os.rmdir(directory)
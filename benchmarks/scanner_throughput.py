@@ -0,0 +1,59 @@
+from argparse import ArgumentParser
+import random
+import time
+
+from pylox.byte_scanner import ByteScanner
+from pylox.regex_scanner import RegexScanner
+from pylox.scanner import Scanner
+
+
+def generate_source(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    fragments = [
+        lambda: str(rng.randint(0, 10_000)),
+        lambda: f"{rng.randint(0, 999)}.{rng.randint(0, 999)}",
+        lambda: '"' + "x" * rng.randint(0, 16) + '"',
+        lambda: '"multi\nline"',
+        lambda: rng.choice(["true", "false", "nil", "and", "or", "foo", "bar42"]),
+        lambda: rng.choice(["+", "-", "*", "/", "==", "!=", "<=", ">=", "?", ":"]),
+        lambda: rng.choice(["(", ")", ",", "!", "<", ">"]),
+        lambda: "// line comment\n",
+        lambda: "/* block /* nested */ comment */",
+        lambda: "\n",
+    ]
+    pieces = []
+    length = 0
+    while length < size:
+        piece = rng.choice(fragments)()
+        pieces.append(piece)
+        length += len(piece) + 1
+    return " ".join(pieces)
+
+
+def measure(scanner_class, source: str | bytes, repeat: int) -> tuple[int, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scanner_class(source).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return len(tokens), best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare scanner engine throughput")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    source = generate_source(args.size, args.seed)
+    for name, scanner_class, engine_source in [
+        ("default", Scanner, source),
+        ("regex", RegexScanner, source),
+        ("bytes", ByteScanner, source.encode("utf-8")),
+    ]:
+        token_count, elapsed = measure(scanner_class, engine_source, args.repeat)
+        print(
+            f"{name:>8}: {token_count} tokens in {elapsed:.3f}s "
+            f"({token_count / elapsed:,.0f} tokens/sec)"
+        )
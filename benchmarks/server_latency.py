@@ -0,0 +1,171 @@
+from argparse import ArgumentParser
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def generate_source(depth: int, rng: random.Random) -> str:
+    # A random expression tree of the given depth, spread over many lines.
+    if depth == 0:
+        return rng.choice(["1", "2.5", '"a"', "true", "nil", "x"])
+    left = generate_source(depth - 1, rng)
+    right = generate_source(depth - 1, rng)
+    separator = "\n" if depth < 4 else " "
+    match rng.randrange(3):
+        case 0:
+            return f"({left} +{separator}{right})"
+        case 1:
+            return f"({left} == {right})"
+        case _:
+            return f"({left} * {right})"
+
+
+class Client:
+    # A stand-in for an editor, talking to `python -m pylox.server` over pipes.
+    def __init__(self, debounce: float):
+        self.__process = subprocess.Popen(
+            [sys.executable, "-m", "pylox.server", "--debounce", str(debounce)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self.__next_id = 0
+
+    def send(self, method: str, params: dict, request: bool = False) -> int:
+        message = {"jsonrpc": "2.0", "method": method, "params": params}
+        if request:
+            self.__next_id += 1
+            message["id"] = self.__next_id
+        body = json.dumps(message).encode("utf-8")
+        self.__process.stdin.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.__process.stdin.flush()
+        return self.__next_id
+
+    def receive(self) -> dict:
+        length = None
+        while True:
+            line = self.__process.stdout.readline().strip()
+            if len(line) == 0:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(self.__process.stdout.read(length))
+
+    def wait_for(self, predicate) -> dict:
+        while True:
+            message = self.receive()
+            if predicate(message):
+                return message
+
+    def request(self, method: str, params: dict) -> dict:
+        id = self.send(method, params, request=True)
+        return self.wait_for(lambda message: message.get("id") == id)
+
+    def close(self) -> int:
+        self.request("shutdown", {})
+        self.send("exit", {})
+        self.__process.stdin.close()
+        return self.__process.wait()
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    median = samples[len(samples) // 2] * 1000
+    tail = samples[int(len(samples) * 0.95)] * 1000
+    return f"median {median:8.2f} ms, p95 {tail:8.2f} ms"
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measure language server latency")
+    parser.add_argument("--depth", type=int, default=12)
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--debounce", type=float, default=0, metavar="MS")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    source = generate_source(args.depth, rng)
+    print(f"{len(source):,} characters")
+    uri = "file:///benchmark.lox"
+
+    # Checking the snippet with a fresh interpreter each time.
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as file:
+        file.write(source)
+    try:
+        samples = []
+        for _ in range(5):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "pylox.lox", "--check", file.name],
+                stdout=subprocess.DEVNULL,
+            )
+            samples.append(time.perf_counter() - start)
+        print(f"{'new process':>20}: {percentiles(samples)}")
+    finally:
+        os.unlink(file.name)
+
+    start = time.perf_counter()
+    client = Client(args.debounce)
+    client.request("initialize", {"capabilities": {}})
+    client.send("initialized", {})
+    client.send(
+        "textDocument/didOpen",
+        {
+            "textDocument": {
+                "uri": uri,
+                "version": 0,
+                "text": source,
+                "languageId": "lox",
+            }
+        },
+    )
+    client.wait_for(
+        lambda message: message.get("method") == "textDocument/publishDiagnostics"
+    )
+    print(f"{'start and open':>20}: {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    # Each edit replaces a digit and waits for the diagnostics of that version.
+    lines = source.split("\n")
+    digits = [
+        (line, character)
+        for line, text in enumerate(lines)
+        for character, value in enumerate(text)
+        if value == "1"
+    ]
+    change_samples = []
+    hover_samples = []
+    for version in range(1, args.edits + 1):
+        line, character = rng.choice(digits)
+        position = {"line": line, "character": character}
+        end = {"line": line, "character": character + 1}
+        text = "7" if version % 2 else "1"
+        start = time.perf_counter()
+        client.send(
+            "textDocument/didChange",
+            {
+                "textDocument": {"uri": uri, "version": version},
+                "contentChanges": [
+                    {"range": {"start": position, "end": end}, "text": text}
+                ],
+            },
+        )
+        client.wait_for(
+            lambda message: message.get("method") == "textDocument/publishDiagnostics"
+            and message["params"].get("version") == version
+        )
+        change_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        client.request(
+            "textDocument/hover",
+            {"textDocument": {"uri": uri}, "position": position},
+        )
+        hover_samples.append(time.perf_counter() - start)
+
+    print(f"{'change to diagnostics':>20}: {percentiles(change_samples)}")
+    print(f"{'hover':>20}: {percentiles(hover_samples)}")
+    assert client.close() == 0
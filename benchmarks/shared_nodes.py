@@ -0,0 +1,108 @@
+from argparse import ArgumentParser
+import random
+import sys
+import time
+import tracemalloc
+
+from corpus import generate
+from pylox.ast_printer import AstPrinter
+from pylox.evaluator import Evaluator
+from pylox.interning import InterningFactory
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+
+
+def generate_repetitive(depth: int, pool_size: int, seed: int) -> str:
+    # A balanced tree whose subtrees at each level are drawn from a pool of
+    # `pool_size` expressions, as generated inputs tend to repeat the same
+    # subexpressions. Everything is on one line, since nodes are only shared
+    # between tokens on the same line.
+    rng = random.Random(seed)
+    pool = [str(rng.randint(0, 9)) for _ in range(pool_size)]
+    for _ in range(depth):
+        pool = [
+            f"({rng.choice(pool)} {rng.choice('+-*')} {rng.choice(pool)})"
+            for _ in range(pool_size)
+        ]
+    return pool[0]
+
+
+def parse(source: str, factory=None):
+    tokens = RegexScanner(source).scan_tokens()
+    if factory is None:
+        return Parser(tokens).parse()
+    return Parser(tokens, factory).parse()
+
+
+def retained_memory(source: str, shared: bool) -> int:
+    # The memory the tree holds once the parse is done and the tokens and
+    # the factory's table are gone.
+    tracemalloc.start()
+    try:
+        expression = parse(source, InterningFactory() if shared else None)
+        size = tracemalloc.get_traced_memory()[0]
+        del expression
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare shared and unshared ASTs")
+    parser.add_argument("--depth", type=int, default=14)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.setrecursionlimit(10_000)
+
+    sources = {
+        "repetitive": generate_repetitive(args.depth, args.pool_size, args.seed),
+        "mixed": generate("mixed", args.size, args.seed),
+    }
+    for name, source in sources.items():
+        factory = InterningFactory()
+        parse(source, factory)
+        print(
+            f"{name}: {len(source):,} characters,"
+            f" {factory.requested:,} nodes, {factory.built:,} distinct"
+        )
+        for shared in [False, True]:
+            label = "shared" if shared else "tree"
+            memory = retained_memory(source, shared)
+            seconds = best_time(
+                lambda: parse(source, InterningFactory() if shared else None),
+                args.repeat,
+            )
+            print(
+                f"{label:>20}: {memory / (1 << 20):8.2f} MiB,"
+                f" parsed in {seconds * 1000:9.2f} ms"
+            )
+
+    # Only the repetitive source evaluates without runtime errors.
+    source = sources["repetitive"]
+    tree = parse(source)
+    dag = parse(source, InterningFactory())
+    for label, expression, memoize in [
+        ("tree", tree, False),
+        ("shared", dag, False),
+        ("shared, memoized", dag, True),
+    ]:
+        evaluator = Evaluator(memoize=memoize)
+        printer = AstPrinter(memoize)
+        evaluate = best_time(lambda: evaluator.evaluate(expression), args.repeat)
+        print_ = best_time(lambda: printer.print(expression), args.repeat)
+        print(
+            f"{label:>20}: evaluated in {evaluate * 1000:9.2f} ms,"
+            f" printed in {print_ * 1000:9.2f} ms"
+        )
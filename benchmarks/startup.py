@@ -0,0 +1,134 @@
+from argparse import ArgumentParser
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+# Modules that a mode must not import, because only other modes need them.
+# Any of these showing up means an import was made eager again.
+BACKEND_MODULES = {
+    "pylox.byte_scanner",
+    "pylox.closure_compiler",
+    "pylox.compiler",
+    "pylox.disassembler",
+    "pylox.evaluator",
+    "pylox.expression_arena",
+    "pylox.interning",
+    "pylox.multi_file",
+    "pylox.optimizer",
+    "pylox.parallel_scanner",
+    "pylox.parse_cache",
+    "pylox.profiler",
+    "pylox.program",
+    "pylox.regex_scanner",
+    "pylox.transpiler",
+    "pylox.vm",
+}
+HEAVY_MODULES = {"concurrent.futures", "dataclasses", "inspect", "multiprocessing"}
+
+
+def modes(source_file: str) -> dict:
+    # Each mode is the command line after `python -X importtime`, the modules
+    # it must not import, and the most it may spend importing modules, in
+    # milliseconds, as a median. The budgets leave about a quarter on top of
+    # what the modes take on a quiet machine.
+    return {
+        "import": (
+            ["-c", "import pylox.lox"],
+            BACKEND_MODULES | HEAVY_MODULES | {"argparse", "pylox.ast_printer"},
+            60,
+        ),
+        "run": (
+            ["-m", "pylox.lox", "-f", source_file],
+            BACKEND_MODULES | HEAVY_MODULES,
+            75,
+        ),
+        "check": (
+            ["-m", "pylox.lox", "--check", source_file, "-j", "1", "--timings", "0"],
+            (BACKEND_MODULES - {"pylox.multi_file"})
+            | {"dataclasses", "inspect", "pylox.ast_printer"},
+            85,
+        ),
+    }
+
+
+def source_environment() -> dict:
+    # The environment to run pylox from this checkout in.
+    environment = dict(os.environ)
+    source_path = str(Path(__file__).resolve().parents[1] / "src")
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [source_path, environment.get("PYTHONPATH")])
+    )
+    return environment
+
+
+def import_times(arguments: list, environment: dict) -> dict:
+    # Returns the time each module took to import, without its own imports,
+    # in microseconds, from the `-X importtime` report on standard error.
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_time)
+    return times
+
+
+def measure(arguments: list, environment: dict, baseline: set, repeat: int):
+    # Returns the median time spent importing the modules that `arguments`
+    # imports on top of `baseline`, in milliseconds, and those modules.
+    samples = []
+    for _ in range(repeat):
+        times = import_times(arguments, environment)
+        imported = set(times) - baseline
+        samples.append(sum(times[module] for module in imported) / 1000)
+    return statistics.median(samples), imported
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Check the start-up time of pylox")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        metavar="MS",
+        help="the most any mode may spend importing modules, as a median, "
+        "in place of each mode's own budget",
+    )
+    args = parser.parse_args()
+
+    environment = source_environment()
+    # Only modules that the interpreter does not import on its own count.
+    baseline = set(import_times(["-c", "pass"], environment))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as file:
+        file.write("(1 + 2) * 3\n")
+    failures = []
+    try:
+        for name, (arguments, forbidden, budget) in modes(file.name).items():
+            median, imported = measure(arguments, environment, baseline, args.repeat)
+            print(f"{name:>8}: {median:8.2f} ms in {len(imported)} modules")
+
+            if args.budget is not None:
+                budget = args.budget
+            if median > budget:
+                failures.append(f"{name}: {median:.2f} ms is over {budget} ms")
+            for module in sorted(imported & forbidden):
+                failures.append(f"{name}: imports {module}")
+    finally:
+        os.unlink(file.name)
+
+    for failure in failures:
+        print(failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,247 @@
+from argparse import ArgumentParser
+from io import StringIO
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from corpus import CORPORA, generate
+from pylox import __version__
+from pylox.ast_printer import StreamingAstPrinter
+from pylox.parser import Parser
+from pylox.profiler import CountingFactory
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+
+# Runs every phase over every corpus and writes the results as JSON:
+#
+#     python benchmarks/suite.py run --output baseline.json
+#     ... change the code ...
+#     python benchmarks/suite.py run --output current.json
+#     python benchmarks/suite.py compare baseline.json current.json
+#
+# `compare` exits with status 1 if a phase got slower, or used more memory,
+# by more than the threshold. Rates are only comparable between runs with the
+# same settings on the same machine. Even then the speed of a shared machine
+# drifts from one second to the next, so every sample of a phase is paired
+# with a sample of a fixed reference workload, and `compare` goes by the
+# phase's cost relative to the reference.
+
+RESULTS_VERSION = 1
+
+
+def _parse(tokens):
+    diagnostics = Diagnostics()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    if diagnostics.has_error():
+        raise ValueError("\n".join(diagnostics.format()))
+    return expression
+
+
+def _print(expression) -> str:
+    output = StringIO()
+    StreamingAstPrinter(output).print(expression)
+    return output.getvalue()
+
+
+def _phases(source: str) -> List[Tuple[str, str, Callable[[], object], int]]:
+    # Each phase is a name, the unit of its rate, the function to time, and
+    # how many units one call processes.
+    tokens = RegexScanner(source).scan_tokens()
+    factory = CountingFactory()
+    Parser(tokens, factory).parse()
+    expression = _parse(tokens)
+    printed = _print(expression)
+    return [
+        ("scan", "tokens/sec", lambda: Scanner(source).scan_tokens(), len(tokens)),
+        (
+            "scan_regex",
+            "tokens/sec",
+            lambda: RegexScanner(source).scan_tokens(),
+            len(tokens),
+        ),
+        ("parse", "nodes/sec", lambda: _parse(tokens), sum(factory.counts.values())),
+        ("print", "bytes/sec", lambda: _print(expression), len(printed.encode())),
+    ]
+
+
+def _calls_for(function: Callable[[], object], min_time: float) -> int:
+    # As with `timeit`, a sample makes enough calls to take at least
+    # `min_time`, so that short phases are not swamped by timer noise.
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        if time.perf_counter() - start >= min_time:
+            return calls
+        calls *= 2
+
+
+def _time_calls(function: Callable[[], object], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+
+def _measure(
+    function: Callable[[], object], repeat: int, min_time: float = 0.05
+) -> Tuple[float, float]:
+    # Returns the best time per call over `repeat` samples, and the median of
+    # the time per call relative to the reference workload sampled right
+    # after it.
+    calls = _calls_for(function, min_time)
+    reference_calls = _calls_for(_reference_workload, min_time)
+    best = float("inf")
+    ratios = []
+    for _ in range(repeat):
+        seconds = _time_calls(function, calls)
+        best = min(best, seconds)
+        ratios.append(seconds / _time_calls(_reference_workload, reference_calls))
+    return best, statistics.median(ratios)
+
+
+def _reference_workload() -> None:
+    # Plain Python of the same kind as the phases: small objects, method
+    # calls, string slicing and dictionary lookups.
+    text = "abcdefghij" * 100
+    table = {character: index for index, character in enumerate("abcdefghij")}
+    objects = []
+    for index in range(len(text)):
+        objects.append((table[text[index]], text[index : index + 3]))
+    "".join(piece for _, piece in objects)
+
+
+def _peak_memory(function: Callable[[], object]) -> int:
+    # Only what the phase allocates is traced, not its input.
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(corpora: List[str], size: int, seed: int, repeat: int) -> Dict:
+    results = []
+    for name in corpora:
+        source = generate(name, size, seed)
+        for phase, unit, function, count in _phases(source):
+            seconds, relative_cost = _measure(function, repeat)
+            result = {
+                "corpus": name,
+                "phase": phase,
+                "unit": unit,
+                "count": count,
+                "input_bytes": len(source.encode()),
+                "seconds": seconds,
+                "rate": count / seconds,
+                "relative_cost": relative_cost,
+                "peak_bytes": _peak_memory(function),
+            }
+            results.append(result)
+            print(
+                f"{name:>16} {phase:>10}: {result['rate']:>14,.0f} {unit:<10}"
+                f" {result['peak_bytes'] / (1 << 20):>8.1f} MiB peak",
+                file=sys.stderr,
+            )
+    return {
+        "version": RESULTS_VERSION,
+        "settings": {"size": size, "seed": seed, "repeat": repeat},
+        "environment": {
+            "pylox": __version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    # Returns the regressions of `current` against `baseline`, and prints a
+    # line for every phase found in both.
+    if baseline["settings"]["size"] != current["settings"]["size"] or (
+        baseline["settings"]["seed"] != current["settings"]["seed"]
+    ):
+        raise ValueError("The results were run on different corpora.")
+
+    previous = {
+        (result["corpus"], result["phase"]): result for result in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        key = (result["corpus"], result["phase"])
+        if key not in previous:
+            continue
+        before = previous[key]
+        # The change in speed, adjusted by how fast the machine was running.
+        rate = before["relative_cost"] / result["relative_cost"] - 1
+        memory = result["peak_bytes"] / max(before["peak_bytes"], 1) - 1
+        flags = []
+        if rate < -threshold:
+            flags.append("slower")
+        if memory > threshold:
+            flags.append("more memory")
+        name = f"{key[0]} {key[1]}"
+        print(
+            f"{name:>28}: rate {rate:+7.1%}, peak memory {memory:+7.1%}"
+            + (f"  REGRESSION ({', '.join(flags)})" if flags else "")
+        )
+        if flags:
+            regressions.append(f"{name}: {', '.join(flags)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the scanner, parser and printer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument(
+        "--corpus", nargs="+", choices=CORPORA, default=list(CORPORA)
+    )
+    run_parser.add_argument("--size", type=int, default=200_000)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("-o", "--output", help="defaults to standard output")
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare results against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the relative change that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.corpus, args.size, args.seed, args.repeat)
+        if args.output is None:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        try:
+            regressions = compare(baseline, current, args.threshold)
+        except ValueError as exception:
+            parser.error(str(exception))
+        if regressions:
+            print(f"{len(regressions)} regressions.")
+        sys.exit(1 if regressions else 0)
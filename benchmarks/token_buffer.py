@@ -0,0 +1,76 @@
+from argparse import ArgumentParser
+import random
+import time
+import tracemalloc
+
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+
+
+def generate_source(size: int, seed: int) -> str:
+    # A single parseable expression made of a long chain of binary operations.
+    rng = random.Random(seed)
+    operands = [
+        lambda: str(rng.randint(0, 10_000)),
+        lambda: f"{rng.randint(0, 999)}.{rng.randint(0, 999)}",
+        lambda: '"' + "x" * rng.randint(0, 16) + '"',
+        lambda: rng.choice(["true", "false", "nil"]),
+        lambda: f"({rng.randint(0, 99)} - {rng.randint(0, 99)})",
+    ]
+    operators = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">="]
+    pieces = [operands[0]()]
+    length = len(pieces[0])
+    while length < size:
+        piece = f" {rng.choice(operators)} {rng.choice(operands)()}"
+        pieces.append(piece)
+        length += len(piece)
+    return "".join(pieces)
+
+
+def measure_memory(scan) -> tuple[int, int, int]:
+    # The memory the tokens take, and the peak of scanning and parsing, as
+    # `lox.parse` does with the layout.
+    tracemalloc.start()
+    tokens = scan()
+    allocated, _ = tracemalloc.get_traced_memory()
+    Parser(tokens).parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tokens), allocated, peak
+
+
+def measure_time(scan, repeat: int) -> tuple[float, float]:
+    # The best times to parse the scanned tokens, and to scan and parse.
+    best_parse = best_total = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scan()
+        scanned = time.perf_counter()
+        Parser(tokens).parse()
+        end = time.perf_counter()
+        best_parse = min(best_parse, end - scanned)
+        best_total = min(best_total, end - start)
+    return best_parse, best_total
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compare List[Token] and TokenBuffer")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    source = generate_source(args.size, args.seed)
+    layouts = [
+        ("List[Token]", lambda: RegexScanner(source).scan_tokens()),
+        ("TokenBuffer", lambda: RegexScanner(source).scan_token_buffer()),
+    ]
+    for name, scan in layouts:
+        token_count, allocated, peak = measure_memory(scan)
+        parse_time, total_time = measure_time(scan, args.repeat)
+        print(
+            f"{name:>12}: {allocated / token_count:6.1f} bytes/token, "
+            f"peak {peak / token_count:6.1f} bytes/token, "
+            f"parse {token_count / parse_time:,.0f} tokens/sec, "
+            f"scan and parse {token_count / total_time:,.0f} tokens/sec"
+        )
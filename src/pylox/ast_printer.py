@@ -1,4 +1,5 @@
-from typing import List
+from typing import Dict, List, Optional, TextIO
+
 from pylox.expression import (
     BinaryExpression,
     Expression,
@@ -6,16 +7,38 @@ from pylox.expression import (
     LiteralExpression,
     TernaryExpression,
     UnaryExpression,
+    VariableExpression,
     Visitor,
 )
+from pylox.runtime import stringify
 
 
 class AstPrinter(Visitor[str]):
+    # With `memoize`, the text of each node is kept for the rest of the
+    # `print` call, keyed on the node's identity, so that a node shared by
+    # an `InterningFactory` is only printed once.
+    def __init__(self, memoize: bool = False):
+        self.__results: Optional[Dict[int, str]] = {} if memoize else None
+
     def print(self, expression: Expression) -> str:
-        return expression.accept(self)
+        try:
+            return self.__accept(expression)
+        finally:
+            if self.__results is not None:
+                self.__results.clear()
+
+    def __accept(self, expression: Expression) -> str:
+        results = self.__results
+        if results is None:
+            return expression.accept(self)
+        key = id(expression)
+        text = results.get(key)
+        if text is None:
+            text = results[key] = expression.accept(self)
+        return text
 
     def parenthesize(self, name: str, expressions: List[Expression]) -> str:
-        return f"({name} {''.join((map(lambda expr: ' ' + expr.accept(self), expressions)))})"
+        return f"({name} {''.join((map(lambda expr: ' ' + self.__accept(expr), expressions)))})"
 
     def visit_binary_expression(self, expression: BinaryExpression) -> str:
         return self.parenthesize(
@@ -34,6 +57,9 @@ class AstPrinter(Visitor[str]):
     def visit_unary_expression(self, expression: UnaryExpression) -> str:
         return self.parenthesize(expression.operator.lexeme, [expression.right])
 
+    def visit_variable_expression(self, expression: VariableExpression) -> str:
+        return expression.name.lexeme
+
     def visit_ternary_expression(self, expression: TernaryExpression) -> str:
         return self.parenthesize(
             "?:",
@@ -43,3 +69,83 @@ class AstPrinter(Visitor[str]):
                 expression.false_expression,
             ],
         )
+
+
+class StreamingAstPrinter(Visitor[None]):
+    # Prints the same text as `AstPrinter`, but walks the tree with an
+    # explicit stack and writes straight to `output`, so no string is built
+    # per subtree and deep trees do not overflow the call stack. Each
+    # `visit_*` writes the start of its node and pushes what follows: its
+    # children, separators and closing parenthesis. Pieces are written in
+    # batches of `buffer_size`.
+    #
+    # With `compact`, operators are separated from their operands by a
+    # single space and literals are printed as Lox source: `true`, `1`,
+    # `"text"`, rather than Python's `True`, `1.0`, `text`.
+    def __init__(self, output: TextIO, compact: bool = False, buffer_size: int = 4096):
+        self.__output = output
+        self.__compact = compact
+        self.__buffer_size = buffer_size
+        self.__pieces: List[str] = []
+        self.__stack: List[Expression | str] = []
+
+    def __write(self, piece: str) -> None:
+        self.__pieces.append(piece)
+        if len(self.__pieces) >= self.__buffer_size:
+            self.__flush()
+
+    def __flush(self) -> None:
+        self.__output.write("".join(self.__pieces))
+        self.__pieces.clear()
+
+    def __parenthesize(self, name: str, expressions: List[Expression]) -> None:
+        self.__write(f"({name}" if self.__compact else f"({name} ")
+        stack = self.__stack
+        stack.append(")")
+        for expression in reversed(expressions):
+            stack.append(expression)
+            stack.append(" ")
+
+    def print(self, expression: Expression) -> None:
+        stack = self.__stack
+        stack.append(expression)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                self.__write(item)
+            else:
+                item.accept(self)
+        self.__flush()
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        self.__parenthesize(
+            expression.operator.lexeme, [expression.left, expression.right]
+        )
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.__parenthesize("group", [expression.expression])
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        value = expression.value
+        if not self.__compact:
+            self.__write("nil" if value is None else str(value))
+        elif isinstance(value, str):
+            self.__write(f'"{value}"')
+        else:
+            self.__write(stringify(value))
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        self.__parenthesize(expression.operator.lexeme, [expression.right])
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        self.__parenthesize(
+            "?:",
+            [
+                expression.conditional_expression,
+                expression.true_expression,
+                expression.false_expression,
+            ],
+        )
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        self.__write(expression.name.lexeme)
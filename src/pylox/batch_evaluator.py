@@ -0,0 +1,216 @@
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from pylox.reporter import RuntimeException
+from pylox.runtime import BINARY_OPERATIONS, is_equal, is_truthy, look_up, negate
+from pylox.token_type import TokenType
+
+
+def _as_column(values: ArrayLike) -> np.ndarray:
+    # Numbers are stored as float64 and booleans as bool. Anything else,
+    # such as strings or `nil`, is kept as Python objects.
+    column = np.asarray(values)
+    match column.dtype.kind:
+        case "b" | "O":
+            return column
+        case "f" | "i" | "u":
+            return column.astype(np.float64, copy=False)
+        case _:
+            return column.astype(object)
+
+
+def _map(function, *arrays: np.ndarray) -> np.ndarray:
+    # Applies a Python function element by element. The result is wrapped
+    # since `frompyfunc` returns a bare object for 0-d operands.
+    return np.asarray(np.frompyfunc(function, len(arrays), 1)(*arrays), dtype=object)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    match values.dtype.kind:
+        case "b":
+            return values
+        case "f":
+            return np.ones(values.shape, dtype=bool)
+        case _:
+            return _map(is_truthy, values).astype(bool)
+
+
+def _is_string(values: np.ndarray) -> bool:
+    return values.ndim == 0 and type(values.item()) is str
+
+
+def _equal(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    if _is_string(left) or _is_string(right):
+        # A string is only ever equal to another string, so Python's `==` is
+        # already type-strict.
+        return np.asarray(np.equal(left, right), dtype=bool)
+    if left.dtype.kind == "O" or right.dtype.kind == "O":
+        return _map(is_equal, left, right).astype(bool)
+    if left.dtype.kind != right.dtype.kind:
+        # A number is never equal to a boolean.
+        return np.zeros(np.broadcast_shapes(left.shape, right.shape), dtype=bool)
+    return np.asarray(np.equal(left, right))
+
+
+class BatchEvaluator(Visitor[np.ndarray]):
+    # Evaluates an expression over whole columns at once, with every
+    # identifier bound to a column of the same length. The tree is walked
+    # once per batch: operations on float64 columns are NumPy ufuncs, and
+    # any other operands are passed element by element to the matching
+    # `pylox.runtime` function, so that the same `RuntimeException` is raised
+    # as when each row is evaluated alone. Literals are 0-d arrays that are
+    # broadcast against the columns.
+    #
+    # The batch fails as a whole if any row fails, which may not be the
+    # error the first failing row would have raised on its own.
+    __NUMBER_OPERATIONS = {
+        TokenType.GREATER: np.greater,
+        TokenType.GREATER_EQUAL: np.greater_equal,
+        TokenType.LESS: np.less,
+        TokenType.LESS_EQUAL: np.less_equal,
+        TokenType.PLUS: np.add,
+        TokenType.MINUS: np.subtract,
+        TokenType.STAR: np.multiply,
+        TokenType.SLASH: np.divide,
+    }
+    __COMPARISONS = {
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+    }
+
+    def __init__(self, columns: Mapping[str, ArrayLike], length: Optional[int] = None):
+        # `length` only needs to be given when there are no columns.
+        self.__columns: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            column = _as_column(values)
+            if column.ndim != 1:
+                raise ValueError(f"Column '{name}' must be one-dimensional.")
+            if length is None:
+                length = len(column)
+            elif len(column) != length:
+                raise ValueError(
+                    f"Column '{name}' has {len(column)} rows, expected {length}."
+                )
+            self.__columns[name] = column
+        self.length = 1 if length is None else length
+
+    def evaluate(self, expression: Expression) -> np.ndarray:
+        # Overflow to infinity is not an error in Lox.
+        with np.errstate(all="ignore"):
+            values = expression.accept(self)
+        if values.ndim == 0:
+            return np.full(self.length, values.item(), dtype=values.dtype)
+        return values
+
+    def __select(self, rows: np.ndarray) -> "BatchEvaluator":
+        return BatchEvaluator(
+            {name: column[rows] for name, column in self.__columns.items()},
+            int(np.count_nonzero(rows)),
+        )
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> np.ndarray:
+        left = expression.left.accept(self)
+        right = expression.right.accept(self)
+        operator = expression.operator
+        token_type = operator.token_type
+
+        match token_type:
+            case TokenType.COMMA:
+                return right
+            case TokenType.EQUAL_EQUAL:
+                return _equal(left, right)
+            case TokenType.BANG_EQUAL:
+                return np.asarray(np.logical_not(_equal(left, right)))
+
+        if (
+            left.dtype.kind == "f"
+            and right.dtype.kind == "f"
+            and not (token_type == TokenType.SLASH and np.any(right == 0))
+        ):
+            operation = BatchEvaluator.__NUMBER_OPERATIONS[token_type]
+            return np.asarray(operation(left, right))
+
+        fallback = BINARY_OPERATIONS[token_type]
+        values = _map(lambda a, b: fallback(operator, a, b), left, right)
+        if token_type in BatchEvaluator.__COMPARISONS:
+            return values.astype(bool)
+        return values
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> np.ndarray:
+        return expression.expression.accept(self)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> np.ndarray:
+        value = expression.value
+        if isinstance(value, (bool, float)):
+            return np.asarray(value)
+        return np.asarray(value, dtype=object)
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> np.ndarray:
+        right = expression.right.accept(self)
+        operator = expression.operator
+
+        match operator.token_type:
+            case TokenType.BANG:
+                return np.asarray(np.logical_not(_truthy(right)))
+            case TokenType.MINUS:
+                if right.dtype.kind == "f":
+                    return np.asarray(np.negative(right))
+                return _map(lambda a: negate(operator, a), right)
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> np.ndarray:
+        condition = _truthy(expression.conditional_expression.accept(self))
+        if condition.ndim == 0:
+            branch = (
+                expression.true_expression if condition else expression.false_expression
+            )
+            return branch.accept(self)
+
+        try:
+            true_values = expression.true_expression.accept(self)
+            false_values = expression.false_expression.accept(self)
+        except RuntimeException:
+            # A row may fail in the branch it does not take, so evaluate each
+            # branch over only the rows that take it.
+            return self.__select_branches(expression, condition)
+
+        if true_values.dtype != false_values.dtype:
+            # Keep `np.where` from turning booleans into numbers.
+            true_values = true_values.astype(object)
+            false_values = false_values.astype(object)
+        return np.where(condition, true_values, false_values)
+
+    def __select_branches(
+        self, expression: TernaryExpression, condition: np.ndarray
+    ) -> np.ndarray:
+        results = [
+            (rows, self.__select(rows).evaluate(branch))
+            for rows, branch in (
+                (condition, expression.true_expression),
+                (~condition, expression.false_expression),
+            )
+            if rows.any()
+        ]
+        dtypes = {branch_values.dtype for _, branch_values in results}
+        values = np.empty(
+            self.length, dtype=dtypes.pop() if len(dtypes) == 1 else object
+        )
+        for rows, branch_values in results:
+            values[rows] = branch_values
+        return values
+
+    def visit_variable_expression(self, expression: VariableExpression) -> np.ndarray:
+        return look_up(self.__columns, expression.name)
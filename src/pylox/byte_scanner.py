@@ -0,0 +1,300 @@
+import mmap
+import re
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pylox.reporter import Diagnostics, Reporter
+from pylox.tokens import Token
+from pylox.token_type import RESERVED_KEYWORDS, TokenType
+
+_OPERATORS: Dict[str, TokenType] = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "?": TokenType.QUESTION_MARK,
+    ":": TokenType.COLON,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "/": TokenType.SLASH,
+}
+
+
+def _translate_newlines(source: bytes) -> bytes:
+    # As a file opened in text mode reads it.
+    if source.find(b"\r") == -1:
+        return source
+    return source.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def _by_first_byte(length: int) -> List[Optional[Tuple[TokenType, str]]]:
+    # A table of the operators of `length` bytes, indexed by their first byte.
+    table: List[Optional[Tuple[TokenType, str]]] = [None] * 256
+    for lexeme, token_type in _OPERATORS.items():
+        if len(lexeme) == length:
+            table[ord(lexeme[0])] = (token_type, lexeme)
+    return table
+
+
+class ByteScanner:
+    # Scans UTF-8 encoded bytes without decoding the source first. A file
+    # object is memory-mapped when its file can be, so the source is never
+    # copied into a `str` and the operating system pages it in as needed.
+    # Lexemes are only decoded for the tokens whose text varies: identifiers,
+    # numbers and strings. Operators and keywords get their lexemes from
+    # tables of constants. The token list and the reported errors are
+    # identical to those produced by `Scanner`.
+    #
+    # A file object is scanned as `Scanner` sees it through `open`, with
+    # "\r\n" and "\r" read as newlines. A mapped file that has any carriage
+    # return is copied with its newlines translated, since a lexeme or a line
+    # count could otherwise differ. Bytes and mappings passed in are scanned
+    # as they are, as a `str` is. Bytes that are not UTF-8 are reported as
+    # "Invalid UTF-8." errors, where `Scanner` would fail to read the file,
+    # and decode to U+FFFD inside strings.
+    __TOKEN_PATTERN = re.compile(
+        rb"""
+        (?P<whitespace>[ \t\r]+)
+        | (?P<newline>\n+)
+        | (?P<number>[0-9]+(?:\.[0-9]+)?)
+        | (?P<identifier>[A-Za-z][A-Za-z0-9]*)
+        | (?P<operator>[!=<>]=?|[(){},.\-+;*?:])
+        | (?P<line_comment>//[^\n]*)
+        | (?P<block_comment>/\*)
+        | (?P<slash>/)
+        | (?P<string>"[^"]*")
+        | (?P<unterminated_string>"[^"]*)
+        | (?P<other>.)
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+    __COMMENT_DELIMITER_PATTERN = re.compile(rb"/\*|\*/")
+
+    # Operators by their first byte, for one and for two byte operators.
+    __OPERATORS = _by_first_byte(1)
+    __TWO_BYTE_OPERATORS = _by_first_byte(2)
+
+    __KEYWORDS = {
+        keyword.encode("ascii"): (token_type, keyword)
+        for keyword, token_type in RESERVED_KEYWORDS.items()
+    }
+
+    def __init__(
+        self,
+        source: bytes | bytearray | mmap.mmap | str | TextIO,
+        diagnostics: Optional[Diagnostics] = None,
+    ):
+        # A `str` is encoded, and a file object that cannot be mapped, such
+        # as a pipe, is read and encoded. Files are mapped from the start,
+        # whatever their position.
+        self.__mapping: Optional[mmap.mmap] = None
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+        elif not isinstance(source, (bytes, bytearray, mmap.mmap)):
+            try:
+                source = self.__mapping = mmap.mmap(
+                    source.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except (AttributeError, OSError, ValueError):
+                # An empty file cannot be mapped either.
+                source = source.read()
+                if isinstance(source, str):
+                    # Already translated by a text file.
+                    source = source.encode("utf-8")
+                else:
+                    source = _translate_newlines(source)
+            else:
+                if source.find(b"\r") != -1:
+                    source = _translate_newlines(source[:])
+                    self.__mapping.close()
+                    self.__mapping = None
+        self.__source = source
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
+        self.__line = 1
+
+    def __decode(self, start: int, end: int) -> str:
+        # Reports the first byte that is not UTF-8, if any, and decodes such
+        # bytes as U+FFFD.
+        data = self.__source[start:end]
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError as error:
+            self.__error(start + error.start, "", "Invalid UTF-8.")
+            return data.decode("utf-8", "replace")
+
+    def __error(self, start: int, where: str, message: str) -> bool:
+        # Columns count characters, so the start of the line is decoded.
+        # Returns whether to stop.
+        line_start = self.__source.rfind(b"\n", 0, start) + 1
+        column = len(self.__source[line_start:start].decode("utf-8", "replace")) + 1
+        self.__diagnostics.report_error(self.__line, where, message, column)
+        return self.__diagnostics.is_full()
+
+    def __character(self, position: int) -> Tuple[Optional[str], int]:
+        # Decodes the character at `position`, and returns it with the
+        # position after it, or `None` and the next position if the byte
+        # there does not start a UTF-8 character.
+        lead = self.__source[position]
+        if lead < 0x80:
+            length = 1
+        elif lead >= 0xF0:
+            length = 4
+        elif lead >= 0xE0:
+            length = 3
+        else:
+            length = 2
+        try:
+            character = self.__source[position : position + length].decode("utf-8")
+        except UnicodeDecodeError:
+            return None, position + 1
+        return character, position + length
+
+    def __skip(self, position: int, predicate) -> int:
+        # Returns the position of the first character at or after `position`
+        # for which `predicate` is false.
+        end = len(self.__source)
+        while position < end:
+            character, following = self.__character(position)
+            if character is None or not predicate(character):
+                break
+            position = following
+        return position
+
+    def __match_block_comment(self, start: int) -> int:
+        # Newlines inside block comments are not counted, as in `Scanner`.
+        comment_blocks = 1
+        for delimiter in ByteScanner.__COMMENT_DELIMITER_PATTERN.finditer(
+            self.__source, start + 2
+        ):
+            comment_blocks += 1 if delimiter.group() == b"/*" else -1
+            if comment_blocks == 0:
+                return delimiter.end()
+
+        self.__error(start, "", "Unterminated comment.")
+        return len(self.__source)
+
+    def __match_other(self, start: int) -> Tuple[Optional[Token], int]:
+        # Slow path for lexemes with characters outside of ASCII, which are
+        # decoded one at a time. This mirrors the `str.isdigit`, `str.isalpha`
+        # and `str.isalnum` checks in `Scanner`.
+        character, current = self.__character(start)
+
+        if character is None:
+            # A run of bad bytes is one error.
+            end = len(self.__source)
+            while current < end and self.__character(current)[0] is None:
+                current += 1
+            if self.__error(start, "", "Invalid UTF-8."):
+                return None, end
+            return None, current
+        elif character.isdigit():
+            current = self.__skip(current, str.isdigit)
+            if current < len(self.__source) and self.__source[current] == 0x2E:
+                following = self.__skip(current + 1, str.isdigit)
+                if following > current + 1:
+                    current = following
+            lexeme = self.__decode(start, current)
+            return Token(TokenType.NUMBER, lexeme, float(lexeme), self.__line), current
+        elif character.isalpha():
+            current = self.__skip(current, str.isalnum)
+            lexeme = self.__decode(start, current)
+            token_type = RESERVED_KEYWORDS.get(lexeme, TokenType.IDENTIFIER)
+            return Token(token_type, lexeme, None, self.__line), current
+        elif self.__error(start, character, "Unexpected character."):
+            return None, len(self.__source)
+        return None, current
+
+    def iter_tokens(self) -> Iterator[Token]:
+        # Yields tokens as they are scanned, so that only the tokens the
+        # consumer holds on to are kept. A mapping made by the scanner is
+        # closed once the scan is done.
+        try:
+            yield from self.__scan()
+        finally:
+            if self.__mapping is not None:
+                self.__mapping.close()
+                self.__mapping = None
+
+    def __scan(self) -> Iterator[Token]:
+        source = self.__source
+        operators = ByteScanner.__OPERATORS
+        two_byte_operators = ByteScanner.__TWO_BYTE_OPERATORS
+        keywords = ByteScanner.__KEYWORDS
+        match_token = ByteScanner.__TOKEN_PATTERN.match
+
+        current = 0
+        end = len(source)
+        while current < end:
+            match = match_token(source, current)
+            kind = match.lastgroup
+            start = current
+            current = match.end()
+
+            if kind == "whitespace" or kind == "line_comment":
+                continue
+            elif kind == "newline":
+                self.__line += current - start
+            elif kind == "operator" or kind == "slash":
+                if current - start == 1:
+                    token_type, lexeme = operators[source[start]]
+                else:
+                    token_type, lexeme = two_byte_operators[source[start]]
+                yield Token(token_type, lexeme, None, self.__line)
+            elif (kind == "number" or kind == "identifier") and (
+                current < end
+                and (
+                    source[current] >= 0x80
+                    or (
+                        kind == "number"
+                        and source[current] == 0x2E
+                        and current + 1 < end
+                        and source[current + 1] >= 0x80
+                    )
+                )
+            ):
+                # The lexeme goes on past ASCII, as `Scanner` would take it.
+                token, current = self.__match_other(start)
+                yield token
+            elif kind == "number":
+                lexeme = match.group().decode("ascii")
+                yield Token(TokenType.NUMBER, lexeme, float(lexeme), self.__line)
+            elif kind == "identifier":
+                text = match.group()
+                keyword = keywords.get(text)
+                if keyword is None:
+                    lexeme = text.decode("ascii")
+                    yield Token(TokenType.IDENTIFIER, lexeme, None, self.__line)
+                else:
+                    yield Token(keyword[0], keyword[1], None, self.__line)
+            elif kind == "string":
+                lexeme = self.__decode(start, current)
+                self.__line += lexeme.count("\n")
+                yield Token(TokenType.STRING, lexeme, lexeme[1:-1], self.__line)
+            elif kind == "unterminated_string":
+                lexeme = self.__decode(start, current)
+                self.__line += lexeme.count("\n")
+                self.__error(start, lexeme, "Unterminated string.")
+                yield Token(TokenType.STRING, lexeme, None, self.__line)
+            elif kind == "block_comment":
+                current = self.__match_block_comment(start)
+            else:
+                token, current = self.__match_other(start)
+                if token is not None:
+                    yield token
+
+        yield Token(TokenType.EOF, "", None, self.__line)
+
+    def scan_tokens(self) -> List[Token]:
+        return list(self.iter_tokens())
@@ -0,0 +1,185 @@
+import operator as operators
+from typing import Callable, List, Tuple
+
+from pylox.evaluator import Evaluator
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from pylox.runtime import BINARY_OPERATIONS, is_equal, is_truthy, look_up, negate
+from pylox.token_type import TokenType
+
+
+class CompiledExpression:
+    # A compiled expression can be called any number of times. It pickles as
+    # the `Expression` it was compiled from and is recompiled when unpickled,
+    # since closures themselves cannot be pickled.
+    def __init__(self, expression: Expression, function: Callable[[], any]):
+        self.expression = expression
+        self.__function = function
+
+    def __call__(self) -> any:
+        try:
+            return self.__function()
+        except RecursionError:
+            # The closures call each other once per node, so a tree too deep
+            # for the call stack is evaluated by the `Evaluator` instead,
+            # which then walks it with its own stack.
+            return Evaluator().evaluate(self.expression)
+
+    def __reduce__(self):
+        return (compile_expression, (self.expression,))
+
+
+class ClosureCompiler(Visitor[None]):
+    # Turns an expression into nested closures with every operator resolved
+    # at compile time. Operations that only accept numbers take a fast path
+    # when both operands are numbers, and otherwise defer to `pylox.runtime`
+    # so that the same `RuntimeException` is raised as when tree-walking.
+    #
+    # The tree is walked with an explicit stack, as in `Optimizer`, so that
+    # compiling a deep tree does not overflow the call stack. Each `visit_*`
+    # pushes its children and then a step that builds the node's closure
+    # from theirs, which are left on a stack of functions.
+    __NUMBER_OPERATIONS = {
+        TokenType.GREATER: operators.gt,
+        TokenType.GREATER_EQUAL: operators.ge,
+        TokenType.LESS: operators.lt,
+        TokenType.LESS_EQUAL: operators.le,
+        TokenType.MINUS: operators.sub,
+        TokenType.STAR: operators.mul,
+    }
+
+    def __init__(self):
+        self.__stack: List[Expression | Tuple[Callable, Expression]] = []
+        self.__functions: List[Callable[[], any]] = []
+
+    def compile(self, expression: Expression) -> CompiledExpression:
+        stack = self.__stack
+        functions = self.__functions
+        stack.append(expression)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Expression):
+                item.accept(self)
+            else:
+                build, node = item
+                functions.append(build(node))
+        return CompiledExpression(expression, functions.pop())
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__binary, expression))
+        stack.append(expression.right)
+        stack.append(expression.left)
+
+    def __binary(self, expression: BinaryExpression) -> Callable[[], any]:
+        right = self.__functions.pop()
+        left = self.__functions.pop()
+        operator = expression.operator
+        token_type = operator.token_type
+        fallback = BINARY_OPERATIONS[token_type]
+
+        if token_type in ClosureCompiler.__NUMBER_OPERATIONS:
+            operation = ClosureCompiler.__NUMBER_OPERATIONS[token_type]
+
+            def number_operation() -> any:
+                a = left()
+                b = right()
+                if type(a) is float and type(b) is float:
+                    return operation(a, b)
+                return fallback(operator, a, b)
+
+            return number_operation
+
+        match token_type:
+            case TokenType.PLUS:
+
+                def add() -> any:
+                    a = left()
+                    b = right()
+                    if type(a) is type(b) and (type(a) is float or type(a) is str):
+                        return a + b
+                    return fallback(operator, a, b)
+
+                return add
+            case TokenType.SLASH:
+
+                def divide() -> any:
+                    a = left()
+                    b = right()
+                    if type(a) is float and type(b) is float and b != 0:
+                        return a / b
+                    return fallback(operator, a, b)
+
+                return divide
+            case TokenType.EQUAL_EQUAL:
+                return lambda: is_equal(left(), right())
+            case TokenType.BANG_EQUAL:
+                return lambda: not is_equal(left(), right())
+            case TokenType.COMMA:
+
+                def comma() -> any:
+                    left()
+                    return right()
+
+                return comma
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.__stack.append(expression.expression)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        value = expression.value
+        self.__functions.append(lambda: value)
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__unary, expression))
+        stack.append(expression.right)
+
+    def __unary(self, expression: UnaryExpression) -> Callable[[], any]:
+        right = self.__functions.pop()
+        operator = expression.operator
+
+        match operator.token_type:
+            case TokenType.BANG:
+                return lambda: not is_truthy(right())
+            case TokenType.MINUS:
+
+                def minus() -> any:
+                    a = right()
+                    if type(a) is float:
+                        return -a
+                    return negate(operator, a)
+
+                return minus
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__ternary, expression))
+        stack.append(expression.false_expression)
+        stack.append(expression.true_expression)
+        stack.append(expression.conditional_expression)
+
+    def __ternary(self, expression: TernaryExpression) -> Callable[[], any]:
+        functions = self.__functions
+        false_branch = functions.pop()
+        true_branch = functions.pop()
+        condition = functions.pop()
+        return lambda: true_branch() if is_truthy(condition()) else false_branch()
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        # Compiled expressions have no variables bound, so a reference only
+        # fails once it is evaluated.
+        name = expression.name
+        self.__functions.append(lambda: look_up({}, name))
+
+
+def compile_expression(expression: Expression) -> CompiledExpression:
+    return ClosureCompiler().compile(expression)
@@ -0,0 +1,195 @@
+from array import array
+from enum import IntEnum, auto
+from typing import Callable, List, Tuple
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from pylox.token_type import TokenType
+
+
+class OpCode(IntEnum):
+    # The `VM` tests ranges of opcodes, so related opcodes must stay adjacent.
+    CONSTANT = 0
+    NIL = auto()
+    TRUE = auto()
+    FALSE = auto()
+    POP = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    NOT = auto()
+    NEGATE = auto()
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    GET_VARIABLE = auto()
+    RETURN = auto()
+
+
+# Opcodes that are followed by a single operand word.
+OPERAND_OPCODES = {
+    OpCode.CONSTANT,
+    OpCode.JUMP,
+    OpCode.JUMP_IF_FALSE,
+    OpCode.GET_VARIABLE,
+}
+
+
+class Chunk:
+    # `code` holds opcodes and their operands as 32-bit words. `lines` runs
+    # parallel to `code` and records the `Token.line` each word came from.
+    def __init__(self):
+        self.code = array("i")
+        self.lines = array("i")
+        self.constants: List[any] = []
+
+    def write(self, word: int, line: int) -> int:
+        self.code.append(word)
+        self.lines.append(line)
+        return len(self.code) - 1
+
+    def add_constant(self, value: any) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+
+class Compiler(Visitor[None]):
+    # Lowers an expression into a `Chunk` for the `VM`. Operands are emitted
+    # in the same order the tree-walking interpreters evaluate them, so that
+    # the first runtime error raised is the same.
+    #
+    # The tree is walked with an explicit stack, as in `Optimizer`, so that
+    # deep trees do not overflow the call stack. Each `visit_*` pushes its
+    # children along with the steps that emit what comes between and after
+    # them. Jumps waiting to be patched are kept on a stack of their own.
+    __BINARY_OPCODES = {
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+    }
+
+    def __init__(self):
+        self.__chunk = Chunk()
+        # Literals carry no token, so they are attributed to the line of the
+        # closest operator emitted before them.
+        self.__line = 1
+        self.__stack: List[Expression | Tuple[Callable, Expression]] = []
+        self.__jumps: List[int] = []
+
+    def __emit(self, word: int) -> int:
+        return self.__chunk.write(word, self.__line)
+
+    def __emit_jump(self, opcode: OpCode) -> int:
+        self.__emit(opcode)
+        return self.__emit(0)
+
+    def __patch_jump(self, operand: int) -> None:
+        # Jump offsets are relative to the word after the operand.
+        self.__chunk.code[operand] = len(self.__chunk.code) - (operand + 1)
+
+    def compile(self, expression: Expression) -> Chunk:
+        stack = self.__stack
+        stack.append(expression)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Expression):
+                item.accept(self)
+            else:
+                step, node = item
+                step(node)
+        self.__emit(OpCode.RETURN)
+        return self.__chunk
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        stack = self.__stack
+        if expression.operator.token_type == TokenType.COMMA:
+            stack.append(expression.right)
+            stack.append((self.__emit_pop, expression))
+        else:
+            stack.append((self.__emit_binary, expression))
+            stack.append(expression.right)
+        stack.append(expression.left)
+
+    def __emit_pop(self, expression: BinaryExpression) -> None:
+        self.__line = expression.operator.line
+        self.__emit(OpCode.POP)
+
+    def __emit_binary(self, expression: BinaryExpression) -> None:
+        self.__line = expression.operator.line
+        self.__emit(Compiler.__BINARY_OPCODES[expression.operator.token_type])
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.__stack.append(expression.expression)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        match expression.value:
+            case None:
+                self.__emit(OpCode.NIL)
+            case True:
+                self.__emit(OpCode.TRUE)
+            case False:
+                self.__emit(OpCode.FALSE)
+            case value:
+                self.__emit(OpCode.CONSTANT)
+                self.__emit(self.__chunk.add_constant(value))
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__emit_unary, expression))
+        stack.append(expression.right)
+
+    def __emit_unary(self, expression: UnaryExpression) -> None:
+        self.__line = expression.operator.line
+        match expression.operator.token_type:
+            case TokenType.BANG:
+                self.__emit(OpCode.NOT)
+            case TokenType.MINUS:
+                self.__emit(OpCode.NEGATE)
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__patch_end_jump, expression))
+        stack.append(expression.false_expression)
+        stack.append((self.__emit_else, expression))
+        stack.append(expression.true_expression)
+        stack.append((self.__emit_condition_jump, expression))
+        stack.append(expression.conditional_expression)
+
+    def __emit_condition_jump(self, expression: TernaryExpression) -> None:
+        # `JUMP_IF_FALSE` pops the condition on both paths.
+        self.__jumps.append(self.__emit_jump(OpCode.JUMP_IF_FALSE))
+
+    def __emit_else(self, expression: TernaryExpression) -> None:
+        end_jump = self.__emit_jump(OpCode.JUMP)
+        self.__patch_jump(self.__jumps.pop())
+        self.__jumps.append(end_jump)
+
+    def __patch_end_jump(self, expression: TernaryExpression) -> None:
+        self.__patch_jump(self.__jumps.pop())
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        # The operand is the index of the variable's name in the constants.
+        self.__line = expression.name.line
+        self.__emit(OpCode.GET_VARIABLE)
+        self.__emit(self.__chunk.add_constant(expression.name.lexeme))
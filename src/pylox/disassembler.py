@@ -0,0 +1,43 @@
+from io import StringIO
+from typing import List, Optional
+
+from pylox.ast_printer import StreamingAstPrinter
+from pylox.compiler import OPERAND_OPCODES, Chunk, OpCode
+from pylox.expression import Expression
+from pylox.runtime import stringify
+
+
+def disassemble(chunk: Chunk, expression: Optional[Expression] = None) -> str:
+    # Lists every instruction with its offset and source line. When the
+    # expression is given, its `AstPrinter` form is used as the header. It is
+    # printed by `StreamingAstPrinter`, which handles trees of any depth.
+    if expression is None:
+        name = "chunk"
+    else:
+        output = StringIO()
+        StreamingAstPrinter(output).print(expression)
+        name = output.getvalue()
+    lines: List[str] = [f"== {name} =="]
+
+    offset = 0
+    while offset < len(chunk.code):
+        opcode = OpCode(chunk.code[offset])
+        if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+            line = "   |"
+        else:
+            line = f"{chunk.lines[offset]:4d}"
+
+        instruction = f"{offset:04d} {line} {opcode.name:<16}"
+        if opcode in OPERAND_OPCODES:
+            operand = chunk.code[offset + 1]
+            if opcode in (OpCode.CONSTANT, OpCode.GET_VARIABLE):
+                value = stringify(chunk.constants[operand])
+                instruction += f" {operand:4d} '{value}'"
+            else:
+                instruction += f" {offset:4d} -> {offset + 2 + operand}"
+            offset += 2
+        else:
+            offset += 1
+        lines.append(instruction.rstrip())
+
+    return "\n".join(lines)
@@ -0,0 +1,186 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+)
+from pylox.runtime import BINARY_OPERATIONS, UNARY_OPERATIONS, is_truthy, look_up
+
+
+class Evaluator:
+    # Evaluates expressions without `accept` -> `visit_*` double dispatch. Each
+    # node costs one lookup in a table keyed on its class and one call of the
+    # handler found there. Binary and unary handlers then pick the operation
+    # from `pylox.runtime` tables keyed on the operator's `TokenType`, which
+    # replaces a `match` over the operator.
+    #
+    # With `memoize`, the value of each interior node is kept for the rest of
+    # the `evaluate` call, keyed on the node's identity. This pays off for the
+    # DAGs built by an `InterningFactory`, where a node can appear many times:
+    # expressions have no side effects, so it always has the same value.
+    #
+    # The handlers recurse once per node, which is fastest for the trees most
+    # inputs parse to. A tree too deep for the call stack, such as a long
+    # chain of operators, is evaluated again by `__walk`, which keeps its own
+    # stack. Evaluation has no side effects, so starting over is safe.
+    def __init__(
+        self, variables: Optional[Dict[str, any]] = None, memoize: bool = False
+    ):
+        if variables is None:
+            variables = {}
+        self.__variables = variables
+        handlers: Dict[type, Callable[[Expression], any]] = {}
+        binary_operations = BINARY_OPERATIONS
+        unary_operations = UNARY_OPERATIONS
+
+        def binary_expression(expression: BinaryExpression) -> any:
+            left = expression.left
+            right = expression.right
+            operator = expression.operator
+            return binary_operations[operator.token_type](
+                operator,
+                handlers[left.__class__](left),
+                handlers[right.__class__](right),
+            )
+
+        def grouping_expression(expression: GroupingExpression) -> any:
+            inner = expression.expression
+            return handlers[inner.__class__](inner)
+
+        def literal_expression(expression: LiteralExpression) -> any:
+            return expression.value
+
+        def unary_expression(expression: UnaryExpression) -> any:
+            right = expression.right
+            operator = expression.operator
+            return unary_operations[operator.token_type](
+                operator, handlers[right.__class__](right)
+            )
+
+        def ternary_expression(expression: TernaryExpression) -> any:
+            condition = expression.conditional_expression
+            if is_truthy(handlers[condition.__class__](condition)):
+                branch = expression.true_expression
+            else:
+                branch = expression.false_expression
+            return handlers[branch.__class__](branch)
+
+        def variable_expression(expression: VariableExpression) -> any:
+            return look_up(variables, expression.name)
+
+        handlers[BinaryExpression] = binary_expression
+        handlers[GroupingExpression] = grouping_expression
+        handlers[LiteralExpression] = literal_expression
+        handlers[UnaryExpression] = unary_expression
+        handlers[TernaryExpression] = ternary_expression
+        handlers[VariableExpression] = variable_expression
+
+        # Leaves are cheaper to evaluate than to look up.
+        self.__results: Optional[Dict[int, any]] = None
+        if memoize:
+            self.__results = {}
+            for node_class in [
+                BinaryExpression,
+                GroupingExpression,
+                UnaryExpression,
+                TernaryExpression,
+            ]:
+                handlers[node_class] = _memoized(handlers[node_class], self.__results)
+        self.__handlers = handlers
+
+    def evaluate(self, expression: Expression) -> any:
+        try:
+            try:
+                return self.__handlers[expression.__class__](expression)
+            except RecursionError:
+                return self.__walk(expression)
+        finally:
+            # Identities are only unique while the nodes are alive, so nothing
+            # is kept from one call to the next.
+            if self.__results is not None:
+                self.__results.clear()
+
+    def __walk(self, expression: Expression) -> any:
+        # Evaluates in the same order as the handlers, with an explicit stack
+        # as in `StreamingAstPrinter`. A node is pushed once to evaluate its
+        # operands, and again with `_APPLY` or `_BRANCH` to combine the values
+        # they left on `values`.
+        variables = self.__variables
+        results = self.__results
+        values = []
+        stack: List[Expression | Tuple[int, Expression]] = [expression]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is tuple:
+                step, node = item
+                node_class = node.__class__
+                if step == _BRANCH:
+                    stack.append((_APPLY, node))
+                    if is_truthy(values.pop()):
+                        stack.append(node.true_expression)
+                    else:
+                        stack.append(node.false_expression)
+                    continue
+                if node_class is BinaryExpression:
+                    right = values.pop()
+                    value = BINARY_OPERATIONS[node.operator.token_type](
+                        node.operator, values.pop(), right
+                    )
+                elif node_class is UnaryExpression:
+                    value = UNARY_OPERATIONS[node.operator.token_type](
+                        node.operator, values.pop()
+                    )
+                else:
+                    # A grouping or a ternary has the value of its child.
+                    value = values.pop()
+                if results is not None:
+                    results[id(node)] = value
+                values.append(value)
+                continue
+
+            node = item
+            node_class = node.__class__
+            if node_class is LiteralExpression:
+                values.append(node.value)
+            elif node_class is VariableExpression:
+                values.append(look_up(variables, node.name))
+            elif results is not None and id(node) in results:
+                values.append(results[id(node)])
+            elif node_class is BinaryExpression:
+                stack.append((_APPLY, node))
+                stack.append(node.right)
+                stack.append(node.left)
+            elif node_class is GroupingExpression:
+                stack.append((_APPLY, node))
+                stack.append(node.expression)
+            elif node_class is UnaryExpression:
+                stack.append((_APPLY, node))
+                stack.append(node.right)
+            else:
+                stack.append((_BRANCH, node))
+                stack.append(node.conditional_expression)
+        return values.pop()
+
+
+# The steps `Evaluator.__walk` takes for a node once its operands, or its
+# condition, have been evaluated.
+_APPLY = 0
+_BRANCH = 1
+
+
+def _memoized(
+    handler: Callable[[Expression], any], results: Dict[int, any]
+) -> Callable[[Expression], any]:
+    def memoized(expression: Expression) -> any:
+        key = id(expression)
+        if key in results:
+            return results[key]
+        value = results[key] = handler(expression)
+        return value
+
+    return memoized
@@ -1,58 +1,175 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from pylox.tokens import Token
 
 
 class Expression(ABC):
-    pass
+    __slots__ = ()
 
 
-@dataclass
 class BinaryExpression(Expression):
-    left: Expression
-    operator: Token
-    right: Expression
+    __slots__ = ("left", "operator", "right")
+    __match_args__ = ("left", "operator", "right")
+    __hash__ = None
+
+    def __init__(self, left: Expression, operator: Token, right: Expression):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"BinaryExpression(left={self.left!r}, operator={self.operator!r}, right={self.right!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.left, self.operator, self.right) == (
+            other.left,
+            other.operator,
+            other.right,
+        )
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_binary_expression(self)
 
 
-@dataclass
 class GroupingExpression(Expression):
-    expression: Expression
+    __slots__ = ("expression",)
+    __match_args__ = ("expression",)
+    __hash__ = None
+
+    def __init__(self, expression: Expression):
+        self.expression = expression
+
+    def __repr__(self) -> str:
+        return f"GroupingExpression(expression={self.expression!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.expression,) == (other.expression,)
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_grouping_expression(self)
 
 
-@dataclass
 class LiteralExpression(Expression):
-    value: any
+    __slots__ = ("value",)
+    __match_args__ = ("value",)
+    __hash__ = None
+
+    def __init__(self, value: any):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"LiteralExpression(value={self.value!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.value,) == (other.value,)
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_literal_expression(self)
 
 
-@dataclass
 class UnaryExpression(Expression):
-    operator: Token
-    right: Expression
+    __slots__ = ("operator", "right")
+    __match_args__ = ("operator", "right")
+    __hash__ = None
+
+    def __init__(self, operator: Token, right: Expression):
+        self.operator = operator
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"UnaryExpression(operator={self.operator!r}, right={self.right!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.operator, self.right) == (other.operator, other.right)
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_unary_expression(self)
 
 
-@dataclass
 class TernaryExpression(Expression):
-    conditional_expression: Expression
-    true_expression: Expression
-    false_expression: Expression
+    __slots__ = ("conditional_expression", "true_expression", "false_expression")
+    __match_args__ = ("conditional_expression", "true_expression", "false_expression")
+    __hash__ = None
+
+    def __init__(
+        self,
+        conditional_expression: Expression,
+        true_expression: Expression,
+        false_expression: Expression,
+    ):
+        self.conditional_expression = conditional_expression
+        self.true_expression = true_expression
+        self.false_expression = false_expression
+
+    def __repr__(self) -> str:
+        return f"TernaryExpression(conditional_expression={self.conditional_expression!r}, true_expression={self.true_expression!r}, false_expression={self.false_expression!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.conditional_expression,
+            self.true_expression,
+            self.false_expression,
+        ) == (
+            other.conditional_expression,
+            other.true_expression,
+            other.false_expression,
+        )
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_ternary_expression(self)
 
 
+class VariableExpression(Expression):
+    __slots__ = ("name",)
+    __match_args__ = ("name",)
+    __hash__ = None
+
+    def __init__(self, name: Token):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"VariableExpression(name={self.name!r})"
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.name,) == (other.name,)
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_variable_expression(self)
+
+
+class ExpressionFactory:
+    binary_expression = BinaryExpression
+    grouping_expression = GroupingExpression
+    literal_expression = LiteralExpression
+    unary_expression = UnaryExpression
+    ternary_expression = TernaryExpression
+    variable_expression = VariableExpression
+
+
 class Visitor[T](ABC):
     @abstractmethod
     def visit_binary_expression(self, expression: BinaryExpression) -> T:
@@ -73,3 +190,7 @@ class Visitor[T](ABC):
     @abstractmethod
     def visit_ternary_expression(self, expression: TernaryExpression) -> T:
         pass
+
+    @abstractmethod
+    def visit_variable_expression(self, expression: VariableExpression) -> T:
+        pass
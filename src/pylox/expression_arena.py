@@ -0,0 +1,196 @@
+from __future__ import annotations
+from array import array
+from typing import List
+from pylox.expression import Expression, Visitor
+from pylox.tokens import Token
+
+
+class ExpressionArena:
+    BINARY_EXPRESSION = 0
+    GROUPING_EXPRESSION = 1
+    LITERAL_EXPRESSION = 2
+    UNARY_EXPRESSION = 3
+    TERNARY_EXPRESSION = 4
+    VARIABLE_EXPRESSION = 5
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.slots = (array("i"), array("i"), array("i"))
+        self.tokens: List[Token] = []
+        self.values: List[any] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def node(self, index: int) -> Expression:
+        return NODE_CLASSES[self.kinds[index]](self, index)
+
+    def binary_expression(self, left: int, operator: Token, right: int) -> int:
+        self.slots[0].append(-1 if left is None else left)
+        self.slots[1].append(len(self.tokens))
+        self.tokens.append(operator)
+        self.slots[2].append(-1 if right is None else right)
+        self.kinds.append(ExpressionArena.BINARY_EXPRESSION)
+        return len(self.kinds) - 1
+
+    def grouping_expression(self, expression: int) -> int:
+        self.slots[0].append(-1 if expression is None else expression)
+        self.slots[1].append(-1)
+        self.slots[2].append(-1)
+        self.kinds.append(ExpressionArena.GROUPING_EXPRESSION)
+        return len(self.kinds) - 1
+
+    def literal_expression(self, value: any) -> int:
+        self.slots[0].append(len(self.values))
+        self.values.append(value)
+        self.slots[1].append(-1)
+        self.slots[2].append(-1)
+        self.kinds.append(ExpressionArena.LITERAL_EXPRESSION)
+        return len(self.kinds) - 1
+
+    def unary_expression(self, operator: Token, right: int) -> int:
+        self.slots[0].append(len(self.tokens))
+        self.tokens.append(operator)
+        self.slots[1].append(-1 if right is None else right)
+        self.slots[2].append(-1)
+        self.kinds.append(ExpressionArena.UNARY_EXPRESSION)
+        return len(self.kinds) - 1
+
+    def ternary_expression(
+        self, conditional_expression: int, true_expression: int, false_expression: int
+    ) -> int:
+        self.slots[0].append(
+            -1 if conditional_expression is None else conditional_expression
+        )
+        self.slots[1].append(-1 if true_expression is None else true_expression)
+        self.slots[2].append(-1 if false_expression is None else false_expression)
+        self.kinds.append(ExpressionArena.TERNARY_EXPRESSION)
+        return len(self.kinds) - 1
+
+    def variable_expression(self, name: Token) -> int:
+        self.slots[0].append(len(self.tokens))
+        self.tokens.append(name)
+        self.slots[1].append(-1)
+        self.slots[2].append(-1)
+        self.kinds.append(ExpressionArena.VARIABLE_EXPRESSION)
+        return len(self.kinds) - 1
+
+
+class ArenaBinaryExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def left(self) -> Expression:
+        return self.arena.node(self.arena.slots[0][self.index])
+
+    @property
+    def operator(self) -> Token:
+        return self.arena.tokens[self.arena.slots[1][self.index]]
+
+    @property
+    def right(self) -> Expression:
+        return self.arena.node(self.arena.slots[2][self.index])
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_binary_expression(self)
+
+
+class ArenaGroupingExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def expression(self) -> Expression:
+        return self.arena.node(self.arena.slots[0][self.index])
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_grouping_expression(self)
+
+
+class ArenaLiteralExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def value(self) -> any:
+        return self.arena.values[self.arena.slots[0][self.index]]
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_literal_expression(self)
+
+
+class ArenaUnaryExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def operator(self) -> Token:
+        return self.arena.tokens[self.arena.slots[0][self.index]]
+
+    @property
+    def right(self) -> Expression:
+        return self.arena.node(self.arena.slots[1][self.index])
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_unary_expression(self)
+
+
+class ArenaTernaryExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def conditional_expression(self) -> Expression:
+        return self.arena.node(self.arena.slots[0][self.index])
+
+    @property
+    def true_expression(self) -> Expression:
+        return self.arena.node(self.arena.slots[1][self.index])
+
+    @property
+    def false_expression(self) -> Expression:
+        return self.arena.node(self.arena.slots[2][self.index])
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_ternary_expression(self)
+
+
+class ArenaVariableExpression(Expression):
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena: ExpressionArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def name(self) -> Token:
+        return self.arena.tokens[self.arena.slots[0][self.index]]
+
+    def accept[T](self, visitor: Visitor[T]) -> T:
+        return visitor.visit_variable_expression(self)
+
+
+NODE_CLASSES = (
+    ArenaBinaryExpression,
+    ArenaGroupingExpression,
+    ArenaLiteralExpression,
+    ArenaUnaryExpression,
+    ArenaTernaryExpression,
+    ArenaVariableExpression,
+)
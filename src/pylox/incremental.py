@@ -0,0 +1,840 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    TernaryExpression,
+    UnaryExpression,
+)
+from pylox.parser import INFIX_LEVELS, TERNARY_OPERAND_LEVEL, Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostic, Diagnostics
+from pylox.tokens import Token
+from pylox.token_type import TokenType
+
+# Above every infix level: where no infix operator may be taken, as in the
+# operand of a unary operator, and how tightly a node that is not a binary or
+# ternary expression binds.
+_OPERAND_LEVEL = max(INFIX_LEVELS.values()) + 1
+
+# Errors are kept as `(token index, error)` pairs, sorted by index.
+_INDEX = itemgetter(0)
+
+# Items on the `Document.__register` stack.
+_ENTER = 0
+_OWN = 1
+_OWN_IF = 2
+_EXIT = 3
+
+
+def _root_level(expression: Optional[Expression]) -> int:
+    # The lowest level at which the parser takes `expression` as one operand.
+    if isinstance(expression, BinaryExpression):
+        return INFIX_LEVELS[expression.operator.token_type]
+    elif isinstance(expression, TernaryExpression):
+        return INFIX_LEVELS[TokenType.QUESTION_MARK]
+    return _OPERAND_LEVEL
+
+
+def _absorbs(expression: Expression, token_type: TokenType) -> bool:
+    # Whether an infix operator of `token_type` right after `expression`
+    # would be taken into its last operand, whose parse is still open then.
+    level = INFIX_LEVELS.get(token_type)
+    if level is None:
+        return False
+    node = expression
+    while True:
+        if isinstance(node, BinaryExpression):
+            operator = node.operator.token_type
+            # The comma is right-associative and takes any operator after it.
+            if operator == TokenType.COMMA or level > INFIX_LEVELS[operator]:
+                return True
+            node = node.right
+        elif isinstance(node, TernaryExpression):
+            if level >= TERNARY_OPERAND_LEVEL:
+                return True
+            node = node.false_expression
+        elif isinstance(node, UnaryExpression):
+            node = node.right
+        else:
+            return False
+
+
+def _starts_with_error(expression: Expression) -> bool:
+    # Whether the parse of `expression` began with a missing operand, which
+    # is reported at its first token.
+    node = expression
+    while True:
+        if isinstance(node, BinaryExpression):
+            node = node.left
+        elif isinstance(node, TernaryExpression):
+            node = node.conditional_expression
+        else:
+            return node is None
+
+
+class _Node:
+    # Where a node of the tree sits: its parent and the attribute it is held
+    # in, with `None` for the root, the level the parser was at when it began
+    # on the node, and the number of tokens it was parsed from.
+    __slots__ = ("node", "parent", "attribute", "level", "size")
+
+    def __init__(
+        self,
+        node: Expression,
+        parent: Optional[Expression],
+        attribute: Optional[str],
+        level: int,
+        size: int,
+    ):
+        self.node = node
+        self.parent = parent
+        self.attribute = attribute
+        self.level = level
+        self.size = size
+
+
+class _ScanErrors:
+    # What a scan reports its errors to. Each error is kept with the index of
+    # the token that follows it, and not merged: `Document.diagnostics` does
+    # that as `Diagnostics` would for a full scan.
+    def __init__(self, tokens: List[Token], index: int):
+        self.errors: List[Tuple[int, Diagnostic]] = []
+        self.__tokens = tokens
+        self.__index = index
+
+    def report_error(
+        self, line: int, where: str, message: str, column: Optional[int] = None
+    ) -> None:
+        index = self.__index + len(self.__tokens)
+        self.errors.append((index, Diagnostic(line, column, where, message)))
+
+    def is_full(self) -> bool:
+        return False
+
+
+class _ParseErrors:
+    # What a parse reads its tokens from and reports its errors to. Yields the
+    # tokens from `start` up to `stop`, then an end of file in place of the
+    # token at `stop`. Each error is kept with the index of the token it was
+    # reported at, which is the token the parser read last, and `index` ends
+    # where the parser stopped.
+    def __init__(self, tokens: List[Token], start: int, stop: int):
+        self.errors: List[Tuple[int, str]] = []
+        self.index = start
+        self.__tokens = tokens
+        self.__start = start
+        self.__stop = stop
+
+    def __iter__(self) -> Iterator[Token]:
+        tokens = self.__tokens
+        for index in range(self.__start, self.__stop):
+            self.index = index
+            yield tokens[index]
+        self.index = self.__stop
+        # Errors are kept by index, so the line is never read.
+        yield Token(TokenType.EOF, "", None, 0)
+
+    def report_error(
+        self, line: int, where: str, message: str, column: Optional[int] = None
+    ) -> None:
+        self.errors.append((self.index, message))
+
+
+class _Resynchronized(Exception):
+    # Stops a rescan once it reaches a token that also starts a token of the
+    # previous source. Carries the index of that old token, the line the new
+    # scan is on where it starts, and how many of the errors after it are on
+    # the same line and by how much their columns move.
+    def __init__(self, index: int, line: int, moved: int, column_shift: int):
+        super().__init__()
+        self.index = index
+        self.line = line
+        self.moved = moved
+        self.column_shift = column_shift
+
+
+class Document:
+    # A source together with its tokens and AST, kept up to date through
+    # `edit`. An edit only rescans the tokens around the changed text, up to
+    # the first token that starts where an old token started, and only
+    # reparses the smallest node of the AST whose tokens include the changed
+    # ones. Everything else, tokens and nodes, is reused, and the result is
+    # identical to scanning and parsing the new source from scratch, errors
+    # included.
+    #
+    # The document owns its tokens and nodes and updates them in place: a
+    # tree returned before an edit must not be used after it. A reparsed
+    # node is put in place by assigning to its parent, so the nodes must be
+    # mutable. Nodes generated with `tool/generate_ast.py --frozen` are not,
+    # and a `Document` refuses to work with them.
+    #
+    # The parser reads a node's tokens the same way wherever they appear,
+    # given the level it is at when it starts on them, until the token after
+    # them: the new node can replace the old one if it is taken whole at that
+    # level, and does not take that next token into its last operand, which
+    # `_root_level` and `_absorbs` tell. Otherwise the parent is tried, and
+    # the whole source is parsed again only when the root fails. A rescan
+    # that never meets an old token start goes on to the end of the source.
+    #
+    # The scanner looks at most two characters past the end of a lexeme.
+    __LOOKAHEAD = 2
+
+    def __init__(self, source: str):
+        for node_class in [
+            BinaryExpression,
+            GroupingExpression,
+            UnaryExpression,
+            TernaryExpression,
+        ]:
+            if node_class.__setattr__ is not object.__setattr__:
+                raise TypeError("Incremental parsing needs mutable nodes.")
+        self.__source = source
+        self.__tokens: List[Token] = []
+        # Where each token starts and the line it ends on, kept like a gap
+        # buffer: before `__gap` they count from the start of the source, and
+        # after it from its end and from `__last_line`, the line of the `EOF`
+        # token. An edit only updates the entries between the previous edit
+        # and this one, and a newline moves every later line at once.
+        self.__starts: List[int] = []
+        self.__lines: List[int] = []
+        self.__gap = 0
+        self.__last_line = 1
+        # The tokens from `__stale` on may hold an outdated `line`, which is
+        # brought up to date when the tokens or the tree are handed out.
+        self.__stale = 0
+        # The node each token was parsed into, or `None` for the tokens after
+        # where the parser stopped.
+        self.__owners: List[Optional[Expression]] = []
+        # Every node of the AST, by id.
+        self.__nodes: Dict[int, _Node] = {}
+        self.__expression: Optional[Expression] = None
+        # Errors are few, so they are kept in plain sorted lists, by the index
+        # of the token they come before or were reported at, and those after
+        # an edit are updated on the spot.
+        self.__scan_errors: List[Tuple[int, Diagnostic]] = []
+        self.__parse_errors: List[Tuple[int, str]] = []
+        self.__diagnostics: Optional[List[Diagnostic]] = None
+        self.__scan_all()
+
+    @property
+    def source(self) -> str:
+        return self.__source
+
+    @property
+    def tokens(self) -> List[Token]:
+        self.__refresh_lines()
+        return self.__tokens
+
+    @property
+    def expression(self) -> Optional[Expression]:
+        self.__refresh_lines()
+        return self.__expression
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        # Built as a full scan and parse would report them.
+        if self.__diagnostics is None:
+            tokens = self.__tokens
+            diagnostics = Diagnostics()
+            for _, diagnostic in self.__scan_errors:
+                diagnostics.report_error(
+                    diagnostic.line,
+                    diagnostic.where,
+                    diagnostic.message,
+                    diagnostic.column,
+                )
+            for index, message in self.__parse_errors:
+                token = tokens[index]
+                if token.token_type == TokenType.EOF:
+                    where = " at end"
+                else:
+                    where = f"at '{token.lexeme}'"
+                diagnostics.report_error(self.__line(index), where, message)
+            self.__diagnostics = diagnostics.diagnostics
+        return self.__diagnostics
+
+    def has_error(self) -> bool:
+        return len(self.__scan_errors) > 0 or len(self.__parse_errors) > 0
+
+    def node_at(self, offset: int) -> Optional[Expression]:
+        # The innermost node that the token at `offset`, or the one ending
+        # there, belongs to. `None` between tokens, past the expression, and
+        # when the document has errors.
+        tokens = self.__tokens
+        length = len(self.__source)
+        target = self.__find(offset + 1, length, 0) - 1
+        if target >= 0 and tokens[target].token_type == TokenType.EOF:
+            target -= 1
+        if (
+            target < 0
+            or self.__start(target, length) + len(tokens[target].lexeme) < offset
+            or self.has_error()
+        ):
+            return None
+        self.__refresh_lines()
+        return self.__owners[target]
+
+    def edit(self, offset: int, removed: int, inserted: str) -> None:
+        # Replaces the `removed` characters at `offset` with `inserted`.
+        source = self.__source
+        if offset < 0 or removed < 0 or offset + removed > len(source):
+            raise ValueError("Edit is out of range.")
+        self.__source = source[:offset] + inserted + source[offset + removed :]
+        self.__diagnostics = None
+
+        first, end, old_tokens, count = self.__rescan(source, offset, len(inserted))
+        if end > first or count > 0:
+            self.__reparse(first, end, old_tokens, count)
+
+    def __rescan(
+        self, old_source: str, offset: int, inserted: int
+    ) -> Tuple[int, int, List[Token], int]:
+        # Rescans the tokens the edit may have changed and splices them into
+        # `__tokens`. Returns the index of the first changed token, the index
+        # after the last one before the edit, the old tokens in between and
+        # how many new tokens replace them.
+        source = self.__source
+        tokens = self.__tokens
+        old_length = len(old_source)
+        delta = len(source) - old_length
+        edit_end = offset + inserted
+
+        # Skip the tokens whose lexeme and lookahead end before the edit. The
+        # last of them is rescanned as well, since the scan has to start where
+        # a token starts.
+        index = self.__find(offset, old_length, 0)
+        while (
+            index > 0
+            and self.__start(index - 1, old_length)
+            + len(tokens[index - 1].lexeme)
+            + Document.__LOOKAHEAD
+            > offset
+        ):
+            index -= 1
+        if index > 0:
+            index -= 1
+            restart = self.__start(index, old_length)
+            line = self.__line(index) - tokens[index].lexeme.count("\n")
+        else:
+            restart = 0
+            line = 1
+
+        new_tokens: List[Token] = []
+        new_starts: List[int] = []
+        errors = _ScanErrors(new_tokens, index)
+
+        def add_token(
+            token_type: TokenType, start: int, end: int, literal: Any, line: int
+        ) -> None:
+            if start >= edit_end:
+                # From here on the source is the old source shifted by `delta`,
+                # so if a token started at the same place before, so do all the
+                # tokens after it. The old end of file always matches.
+                old_start = start - delta
+                old_index = self.__find(old_start, old_length, index)
+                if (
+                    old_index < len(tokens)
+                    and self.__start(old_index, old_length) == old_start
+                ):
+                    moved = self.__moved_columns(old_source, old_index, start)
+                    if moved is not None:
+                        line -= source.count("\n", start, end)
+                        raise _Resynchronized(old_index, line, *moved)
+            new_tokens.append(Token(token_type, source[start:end], literal, line))
+            new_starts.append(start)
+
+        try:
+            RegexScanner(source, errors).scan_range(restart, line, add_token)
+        except _Resynchronized as exception:
+            resynchronized = exception
+        resync = resynchronized.index
+        old_line = self.__line(resync) - tokens[resync].lexeme.count("\n")
+        line_delta = resynchronized.line - old_line
+
+        # The errors between the restart and the old token the scan stopped
+        # at are replaced, and those after it moved along. Those before the
+        # restart come before the token there, except that an unterminated
+        # string, which has no literal, is reported at its own start.
+        scan_errors = self.__scan_errors
+        if restart == 0:
+            low = 0
+        else:
+            low = bisect_right(scan_errors, index, key=_INDEX)
+            token = tokens[index]
+            if token.token_type == TokenType.STRING and token.literal is None:
+                low -= 1
+        high = bisect_right(scan_errors, resync, key=_INDEX)
+        shift = len(new_tokens) - (resync - index)
+        kept = scan_errors[high:]
+        column_shift = resynchronized.column_shift
+        for i in range(resynchronized.moved):
+            error_index, diagnostic = kept[i]
+            column = diagnostic.column + column_shift
+            kept[i] = (error_index, diagnostic._replace(column=column))
+        if shift != 0 or line_delta != 0:
+            kept = [
+                (
+                    error_index + shift,
+                    diagnostic._replace(line=diagnostic.line + line_delta),
+                )
+                for error_index, diagnostic in kept
+            ]
+        scan_errors[low:] = errors.errors + kept
+
+        # Keep the old objects for the tokens that were scanned again
+        # unchanged, at either end, so that the nodes holding them can be
+        # reused.
+        same = 0
+        while (
+            same < len(new_tokens)
+            and index + same < resync
+            and self.__is_same(
+                index + same, old_length, new_tokens[same], new_starts[same], 0, 0
+            )
+        ):
+            same += 1
+        suffix = 0
+        while (
+            suffix < len(new_tokens) - same
+            and resync - suffix - 1 >= index + same
+            and self.__is_same(
+                resync - suffix - 1,
+                old_length,
+                new_tokens[-1 - suffix],
+                new_starts[-1 - suffix],
+                delta,
+                line_delta,
+            )
+        ):
+            suffix += 1
+        first = index + same
+        end = resync - suffix
+        new_tokens = new_tokens[same : len(new_tokens) - suffix]
+        new_starts = new_starts[same : len(new_starts) - suffix]
+        count = len(new_tokens)
+
+        # The entries after the new tokens count from the end, where the
+        # source did not change, and the line of the end moves by
+        # `line_delta`.
+        self.__move_gap(end, old_length)
+        old_tokens = tokens[first:end]
+        tokens[first:end] = new_tokens
+        self.__starts[first:end] = new_starts
+        self.__lines[first:end] = [token.line for token in new_tokens]
+        self.__gap = first + count
+        self.__last_line += line_delta
+
+        stale = self.__stale
+        if stale >= end:
+            stale += count - (end - first)
+        elif stale > first:
+            stale = first + count
+        if line_delta != 0:
+            stale = min(stale, first + count)
+        self.__stale = stale
+        return first, end, old_tokens, count
+
+    def __moved_columns(
+        self, old_source: str, old_index: int, start: int
+    ) -> Optional[Tuple[int, int]]:
+        # If the rescan stops at the old token at `old_index`, which now
+        # starts at `start`: how many of the errors after it are on the line
+        # `start` is on, whose text before `start` the edit changed, and by
+        # how much their columns move. `None` if the tokens do not tell
+        # whether an error is on that line, and the rescan has to go on.
+        scan_errors = self.__scan_errors
+        after = bisect_right(scan_errors, old_index, key=_INDEX)
+        if after == len(scan_errors):
+            return 0, 0
+        source = self.__source
+        old_length = len(old_source)
+        delta = len(source) - old_length
+        column_shift = (start - source.rfind("\n", 0, start)) - (
+            start - delta - old_source.rfind("\n", 0, start - delta)
+        )
+        if column_shift == 0:
+            return 0, 0
+
+        # An error comes after the end of the token before it, and before the
+        # start of the token after it.
+        tokens = self.__tokens
+        newline = source.find("\n", start)
+        moved = 0
+        for error_index, _ in scan_errors[after:]:
+            previous = error_index - 1
+            previous_end = (
+                self.__start(previous, old_length)
+                + len(tokens[previous].lexeme)
+                + delta
+            )
+            if newline != -1 and newline < previous_end:
+                break
+            if (
+                newline != -1
+                and newline < self.__start(error_index, old_length) + delta
+            ):
+                return None
+            moved += 1
+        return moved, column_shift
+
+    def __is_same(
+        self,
+        index: int,
+        length: int,
+        token: Token,
+        start: int,
+        delta: int,
+        line_delta: int,
+    ) -> bool:
+        # Whether `token` at `start` is the old token at `index`, moved by
+        # `delta` characters and `line_delta` lines.
+        old = self.__tokens[index]
+        return (
+            self.__start(index, length) + delta == start
+            and self.__line(index) + line_delta == token.line
+            and old.token_type == token.token_type
+            and old.lexeme == token.lexeme
+            and old.literal == token.literal
+        )
+
+    def __start(self, index: int, length: int) -> int:
+        # The start of the token at `index` in a source of `length` characters.
+        if index < self.__gap:
+            return self.__starts[index]
+        return self.__starts[index] + length
+
+    def __line(self, index: int) -> int:
+        if index < self.__gap:
+            return self.__lines[index]
+        return self.__lines[index] + self.__last_line
+
+    def __find(self, offset: int, length: int, low: int) -> int:
+        # The index of the first token from `low` on that starts at or after
+        # `offset`, as `bisect_left` over the starts.
+        starts = self.__starts
+        gap = self.__gap
+        if low < gap and starts[gap - 1] >= offset:
+            return bisect_left(starts, offset, low, gap)
+        return bisect_left(starts, offset - length, max(low, gap))
+
+    def __move_gap(self, index: int, length: int) -> None:
+        starts = self.__starts
+        lines = self.__lines
+        last_line = self.__last_line
+        gap = self.__gap
+        if index < gap:
+            starts[index:gap] = [start - length for start in starts[index:gap]]
+            lines[index:gap] = [line - last_line for line in lines[index:gap]]
+        elif index > gap:
+            starts[gap:index] = [start + length for start in starts[gap:index]]
+            lines[gap:index] = [line + last_line for line in lines[gap:index]]
+        self.__gap = index
+
+    def __refresh_lines(self) -> None:
+        tokens = self.__tokens
+        for index in range(self.__stale, len(tokens)):
+            tokens[index].line = self.__line(index)
+        self.__stale = len(tokens)
+
+    def __reparse(
+        self, first: int, end: int, old_tokens: List[Token], count: int
+    ) -> None:
+        # Reparses the smallest node whose tokens included the old tokens
+        # from `first` to `end`, now replaced by `count` new ones, or the
+        # position between two tokens if there were none.
+        owners = self.__owners
+        nodes = self.__nodes
+        # The parser stopped at the token after the root's tokens, and never
+        # looked at the tokens after that one.
+        stop = self.__size(self.__expression)
+        if first > stop:
+            owners[first:end] = [None] * count
+            return
+
+        # A token the node has to own, found before the owners are updated.
+        if first < end:
+            index = first if first < stop else -1
+        else:
+            index = first - 1 if first > 0 else (0 if stop > 0 else -1)
+        if index < 0:
+            self.__parse_all()
+            return
+        node = owners[index]
+        if index < first:
+            token = self.__tokens[index]
+        elif index < end:
+            token = old_tokens[index - first]
+        else:
+            token = self.__tokens[index + count - (end - first)]
+        owners[first:end] = [None] * count
+
+        # Try the nodes around the token from the inside out, skipping those
+        # not much larger than one that failed, so that a change the nodes
+        # near it cannot take costs at most a few times the parse of the node
+        # that can.
+        info = nodes[id(node)]
+        start = index - self.__token_offset(node, token.token_type)
+        minimum = 1
+        while True:
+            size = info.size
+            if (
+                start <= first
+                and end <= start + size
+                and size >= minimum
+                and not self.__follows_operand(info)
+            ):
+                if self.__replace(info, start, start + size, count - (end - first)):
+                    return
+                minimum = 2 * size
+            if info.parent is None:
+                break
+            start -= self.__child_offset(info.parent, info.attribute)
+            info = nodes[id(info.parent)]
+        self.__parse_all()
+
+    def __replace(self, info: _Node, start: int, end: int, shift: int) -> bool:
+        # Parses the tokens that now stand where the node of `info` had the
+        # tokens from `start` to `end` and puts the result in its place.
+        # Returns `False` if the parser would not read them that way there.
+        tokens = self.__tokens
+        stop = end + shift
+        errors = _ParseErrors(tokens, start, stop)
+        expression = Parser(errors, diagnostics=errors).parse()
+        if (
+            errors.index != stop
+            or (
+                errors.errors
+                and errors.errors[-1][0] == stop
+                and tokens[stop].token_type != TokenType.EOF
+            )
+            or _root_level(expression) < info.level
+            or _absorbs(expression, tokens[stop].token_type)
+        ):
+            return False
+
+        # The node's errors are all those reported inside its tokens, the one
+        # at its first token if its first operand is missing, which comes
+        # after any error there from before it, and those at the token after
+        # it for operands and tokens missing at its end, which come before
+        # any error there from after it.
+        old = info.node
+        parse_errors = self.__parse_errors
+        low = bisect_right(parse_errors, start, key=_INDEX) - _starts_with_error(old)
+        high = bisect_left(parse_errors, end, key=_INDEX) + self.__end_errors(old)
+        if shift != 0:
+            parse_errors[high:] = [
+                (index + shift, message) for index, message in parse_errors[high:]
+            ]
+        parse_errors[low:high] = errors.errors
+
+        self.__forget(old)
+        self.__register(
+            expression, info.parent, info.attribute, info.level, start, stop
+        )
+        if info.parent is None:
+            self.__expression = expression
+        else:
+            setattr(info.parent, info.attribute, expression)
+            if shift != 0:
+                parent = info.parent
+                while parent is not None:
+                    parent_info = self.__nodes[id(parent)]
+                    parent_info.size += shift
+                    parent = parent_info.parent
+        return True
+
+    def __follows_operand(self, info: _Node) -> bool:
+        # Whether the node of `info` is the false branch of a ternary without
+        # its ":", so that the true branch stopped at the node's first token
+        # and has to be parsed again with it.
+        parent = info.parent
+        return info.attribute == "false_expression" and not self.__has_colon(parent)
+
+    def __scan_all(self) -> None:
+        source = self.__source
+        tokens: List[Token] = []
+        starts: List[int] = []
+
+        def add_token(
+            token_type: TokenType, start: int, end: int, literal: Any, line: int
+        ) -> None:
+            tokens.append(Token(token_type, source[start:end], literal, line))
+            starts.append(start)
+
+        errors = _ScanErrors(tokens, 0)
+        RegexScanner(source, errors).scan_range(0, 1, add_token)
+        self.__tokens = tokens
+        self.__starts = starts
+        self.__lines = [token.line for token in tokens]
+        self.__gap = len(starts)
+        self.__last_line = tokens[-1].line
+        self.__stale = len(tokens)
+        self.__scan_errors = errors.errors
+        self.__parse_all()
+
+    def __parse_all(self) -> None:
+        tokens = self.__tokens
+        errors = _ParseErrors(tokens, 0, len(tokens) - 1)
+        expression = Parser(errors, diagnostics=errors).parse()
+        self.__expression = expression
+        self.__parse_errors = errors.errors
+        self.__owners = [None] * len(tokens)
+        self.__nodes = {}
+        if expression is not None:
+            self.__register(expression, None, None, 0, 0, errors.index)
+
+    def __register(
+        self,
+        expression: Expression,
+        parent: Optional[Expression],
+        attribute: Optional[str],
+        level: int,
+        start: int,
+        stop: int,
+    ) -> None:
+        # Records the nodes of `expression`, which was parsed from the tokens
+        # from `start` to `stop`, and the tokens each owns. A walk in source
+        # order meets the tokens in order, and a ")" or ":" that the parser
+        # expected was consumed if it is the next token.
+        tokens = self.__tokens
+        owners = self.__owners
+        nodes = self.__nodes
+        index = start
+        stack: List[Tuple[Any, ...]] = [(_ENTER, expression, parent, attribute, level)]
+
+        def enter(child: Optional[Expression], name: str, level: int) -> None:
+            if child is not None:
+                stack.append((_ENTER, child, node, name, level))
+
+        while stack:
+            item = stack.pop()
+            kind = item[0]
+            if kind == _OWN:
+                owners[index] = item[1]
+                index += 1
+            elif kind == _OWN_IF:
+                if index < stop and tokens[index].token_type == item[2]:
+                    owners[index] = item[1]
+                    index += 1
+            elif kind == _EXIT:
+                info = item[1]
+                info.size = index - info.size
+            else:
+                _, node, parent, attribute, level = item
+                info = _Node(node, parent, attribute, level, index)
+                nodes[id(node)] = info
+                stack.append((_EXIT, info))
+                # Pushed in reverse source order.
+                if isinstance(node, BinaryExpression):
+                    operator = node.operator.token_type
+                    if operator == TokenType.COMMA:
+                        enter(node.right, "right", 0)
+                    else:
+                        enter(node.right, "right", INFIX_LEVELS[operator] + 1)
+                    stack.append((_OWN, node))
+                    enter(node.left, "left", level)
+                elif isinstance(node, GroupingExpression):
+                    stack.append((_OWN_IF, node, TokenType.RIGHT_PAREN))
+                    enter(node.expression, "expression", 0)
+                    stack.append((_OWN, node))
+                elif isinstance(node, UnaryExpression):
+                    enter(node.right, "right", _OPERAND_LEVEL)
+                    stack.append((_OWN, node))
+                elif isinstance(node, TernaryExpression):
+                    enter(
+                        node.false_expression, "false_expression", TERNARY_OPERAND_LEVEL
+                    )
+                    stack.append((_OWN_IF, node, TokenType.COLON))
+                    enter(
+                        node.true_expression, "true_expression", TERNARY_OPERAND_LEVEL
+                    )
+                    stack.append((_OWN, node))
+                    enter(node.conditional_expression, "conditional_expression", level)
+                else:
+                    stack.append((_OWN, node))
+
+    def __forget(self, expression: Expression) -> None:
+        nodes = self.__nodes
+        stack = [expression]
+        while stack:
+            node = stack.pop()
+            del nodes[id(node)]
+            for name in node.__match_args__:
+                child = getattr(node, name)
+                if isinstance(child, Expression):
+                    stack.append(child)
+
+    def __size(self, node: Optional[Expression]) -> int:
+        if node is None:
+            return 0
+        return self.__nodes[id(node)].size
+
+    def __has_colon(self, node: TernaryExpression) -> bool:
+        return self.__nodes[id(node)].size == (
+            self.__size(node.conditional_expression)
+            + self.__size(node.true_expression)
+            + self.__size(node.false_expression)
+            + 2
+        )
+
+    def __has_right_paren(self, node: GroupingExpression) -> bool:
+        return self.__nodes[id(node)].size == self.__size(node.expression) + 2
+
+    def __token_offset(self, node: Expression, token_type: TokenType) -> int:
+        # Where the token of `token_type` that `node` owns is among its tokens.
+        if isinstance(node, BinaryExpression):
+            return self.__size(node.left)
+        elif isinstance(node, TernaryExpression):
+            offset = self.__size(node.conditional_expression)
+            if token_type == TokenType.COLON:
+                offset += 1 + self.__size(node.true_expression)
+            return offset
+        elif (
+            isinstance(node, GroupingExpression) and token_type == TokenType.RIGHT_PAREN
+        ):
+            return 1 + self.__size(node.expression)
+        return 0
+
+    def __child_offset(self, parent: Expression, attribute: str) -> int:
+        # Where the child of `parent` held in `attribute` starts among its
+        # tokens.
+        if isinstance(parent, BinaryExpression):
+            return 0 if attribute == "left" else self.__size(parent.left) + 1
+        elif isinstance(parent, TernaryExpression):
+            if attribute == "conditional_expression":
+                return 0
+            offset = self.__size(parent.conditional_expression) + 1
+            if attribute == "false_expression":
+                offset += self.__size(parent.true_expression) + self.__has_colon(parent)
+            return offset
+        # The operand of a unary operator or the expression in a group.
+        return 1
+
+    def __end_errors(self, expression: Expression) -> int:
+        # How many errors the parse of `expression` reported at the token
+        # after it, for operands and tokens missing at its end.
+        count = 0
+        node = expression
+        while True:
+            if isinstance(node, (BinaryExpression, UnaryExpression)):
+                node = node.right
+            elif isinstance(node, TernaryExpression):
+                if node.false_expression is None and not self.__has_colon(node):
+                    # The true branch ends where the ":" was expected.
+                    count += 2
+                    node = node.true_expression
+                else:
+                    node = node.false_expression
+            elif isinstance(node, GroupingExpression):
+                if self.__has_right_paren(node):
+                    return count
+                count += 1
+                node = node.expression
+            elif node is None:
+                return count + 1
+            else:
+                return count
@@ -0,0 +1,118 @@
+from typing import Dict
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    ExpressionFactory,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+)
+from pylox.tokens import Token
+
+# The first element of each key, so that keys of different node types
+# never compare equal.
+_BINARY = 0
+_GROUPING = 1
+_LITERAL = 2
+_UNARY = 3
+_TERNARY = 4
+_VARIABLE = 5
+
+
+class InterningFactory(ExpressionFactory):
+    # Hash-conses nodes: a node that is structurally equal to one built
+    # before is not built again, and the earlier node is returned instead.
+    # The parser builds children before their parents, so children are
+    # already shared, and a node's key only needs their identities. The key,
+    # kept in the table with the node, still stands for the node's whole
+    # structure, and building and hashing it is a constant amount of work,
+    # however large the subtree. The result is a DAG rather than a tree. Walkers that keep a result per node, such as
+    # `Evaluator(memoize=True)` and `AstPrinter(memoize=True)`, then do the
+    # work for each distinct subexpression once.
+    #
+    # Sharing is per line. A node holds its operator token, and with it the
+    # line that runtime errors name, so one node cannot stand for operators
+    # on different lines: a ternary may only evaluate the later of two such
+    # copies, and its error must name the later line. Tokens are therefore
+    # keyed on their line as well as their lexeme, and identical
+    # subexpressions on different lines stay apart. Literals, and groupings
+    # and ternaries of shared nodes, carry no line and are shared across
+    # lines.
+    #
+    # The table holds every node it has built. Drop the factory once the
+    # parse is done, or `clear` it, to keep only the nodes the tree uses.
+    def __init__(self):
+        self.__nodes: Dict[tuple, Expression] = {}
+        # The number of nodes asked for, and the number actually built.
+        self.requested = 0
+        self.built = 0
+
+    def __intern(self, key: tuple, node_class: type, *args) -> Expression:
+        self.requested += 1
+        node = self.__nodes.get(key)
+        if node is None:
+            node = self.__nodes[key] = node_class(*args)
+            self.built += 1
+        return node
+
+    def binary_expression(
+        self, left: Expression, operator: Token, right: Expression
+    ) -> BinaryExpression:
+        key = (
+            _BINARY,
+            id(left),
+            operator.token_type,
+            operator.lexeme,
+            operator.line,
+            id(right),
+        )
+        return self.__intern(key, BinaryExpression, left, operator, right)
+
+    def grouping_expression(self, expression: Expression) -> GroupingExpression:
+        return self.__intern(
+            (_GROUPING, id(expression)), GroupingExpression, expression
+        )
+
+    def literal_expression(self, value: any) -> LiteralExpression:
+        # Keyed on the class as well, since `1.0 == True` in Python. Floats
+        # are keyed on their exact representation, which tells 0.0 and -0.0
+        # apart.
+        if value.__class__ is float:
+            key = (_LITERAL, float, value.hex())
+        else:
+            key = (_LITERAL, value.__class__, value)
+        return self.__intern(key, LiteralExpression, value)
+
+    def unary_expression(self, operator: Token, right: Expression) -> UnaryExpression:
+        key = (_UNARY, operator.token_type, operator.lexeme, operator.line, id(right))
+        return self.__intern(key, UnaryExpression, operator, right)
+
+    def ternary_expression(
+        self,
+        conditional_expression: Expression,
+        true_expression: Expression,
+        false_expression: Expression,
+    ) -> TernaryExpression:
+        key = (
+            _TERNARY,
+            id(conditional_expression),
+            id(true_expression),
+            id(false_expression),
+        )
+        return self.__intern(
+            key,
+            TernaryExpression,
+            conditional_expression,
+            true_expression,
+            false_expression,
+        )
+
+    def variable_expression(self, name: Token) -> VariableExpression:
+        key = (_VARIABLE, name.lexeme, name.line)
+        return self.__intern(key, VariableExpression, name)
+
+    def clear(self) -> None:
+        self.__nodes.clear()
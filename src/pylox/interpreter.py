@@ -0,0 +1,44 @@
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from typing import Dict, Optional
+
+from pylox.runtime import binary, is_truthy, look_up, unary
+
+
+class Interpreter(Visitor[any]):
+    def __init__(self, variables: Optional[Dict[str, any]] = None):
+        self.__variables = {} if variables is None else variables
+
+    def evaluate(self, expression: Expression) -> any:
+        return expression.accept(self)
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> any:
+        left = expression.left.accept(self)
+        right = expression.right.accept(self)
+        return binary(expression.operator, left, right)
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> any:
+        return expression.expression.accept(self)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> any:
+        return expression.value
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> any:
+        right = expression.right.accept(self)
+        return unary(expression.operator, right)
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> any:
+        if is_truthy(expression.conditional_expression.accept(self)):
+            return expression.true_expression.accept(self)
+        return expression.false_expression.accept(self)
+
+    def visit_variable_expression(self, expression: VariableExpression) -> any:
+        return look_up(self.__variables, expression.name)
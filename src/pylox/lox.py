@@ -1,36 +1,334 @@
-from argparse import ArgumentParser
+from io import StringIO
 import sys
+import time
+from typing import Callable, List, NamedTuple, Optional, TextIO
 
-from pylox.ast_printer import AstPrinter
+from pylox.expression import Expression
 from pylox.parser import Parser
-from pylox.reporter import Reporter
+from pylox.reporter import Diagnostics, Reporter, RuntimeException
+from pylox.runtime import stringify
 from pylox.scanner import Scanner
+from pylox.source_cache import SourceCache
+from pylox.token_buffer import TokenBuffer
+
+# Start-up time matters for short scripts, so only what every run needs is
+# imported above. Backends, scanner engines and the other modes import their
+# modules the first time they are used. `benchmarks/startup.py` checks this.
 
 
 __PROMPT = "> "
 
+# Shared by `run` and the REPL when `Options.source_cache` is set. Embedders
+# can read its statistics or `clear()` it.
+SOURCE_CACHE = SourceCache()
+
+
+def print_expression(expression: Expression, compact: bool = False) -> str:
+    from pylox.ast_printer import StreamingAstPrinter
+
+    output = StringIO()
+    StreamingAstPrinter(output, compact).print(expression)
+    return output.getvalue()
+
+
+SCANNER_ENGINES = ("default", "regex", "bytes", "parallel")
+
+
+def scanner_class(scanner_engine: str) -> type:
+    if scanner_engine == "regex":
+        from pylox.regex_scanner import RegexScanner
+
+        return RegexScanner
+    if scanner_engine == "bytes":
+        # Memory-maps files rather than decoding them.
+        from pylox.byte_scanner import ByteScanner
+
+        return ByteScanner
+    if scanner_engine == "parallel":
+        # Scans a large source in a pool of processes, one per core.
+        from pylox.parallel_scanner import ParallelScanner
+
+        return ParallelScanner
+    return Scanner
+
+
+def __evaluate(expression: Expression, memoize: bool = False) -> str:
+    from pylox.evaluator import Evaluator
+
+    return stringify(Evaluator(memoize=memoize).evaluate(expression))
+
+
+def __print_shared(expression: Expression) -> str:
+    # A shared node is printed once and its text reused. `AstPrinter`
+    # recurses, so a tree too deep for it is streamed instead.
+    from pylox.ast_printer import AstPrinter
+
+    try:
+        return AstPrinter(memoize=True).print(expression)
+    except RecursionError:
+        return print_expression(expression)
+
+
+def __closure(expression: Expression) -> str:
+    from pylox.closure_compiler import compile_expression
+
+    return stringify(compile_expression(expression)())
+
+
+__PYTHON_BACKEND = None
+
+
+def __python(expression: Expression) -> str:
+    # The backend keeps a cache of compiled expressions, so it is shared.
+    global __PYTHON_BACKEND
+    if __PYTHON_BACKEND is None:
+        from pylox.transpiler import PythonBackend
+
+        __PYTHON_BACKEND = PythonBackend()
+    return stringify(__PYTHON_BACKEND.evaluate(expression))
+
+
+def __vm(expression: Expression) -> str:
+    from pylox.compiler import Compiler
+    from pylox.vm import VM
+
+    return stringify(VM().run(Compiler().compile(expression)))
+
+
+def __disassemble(expression: Expression) -> str:
+    from pylox.compiler import Compiler
+    from pylox.disassembler import disassemble
 
-def run(source: str):
-    scanner = Scanner(source)
-    tokens = scanner.scan_tokens()
-    parser = Parser(tokens)
-    ast_printer = AstPrinter()
+    return disassemble(Compiler().compile(expression), expression)
+
+
+BACKENDS = {
+    "print": lambda expression: print_expression(expression),
+    "canonical": lambda expression: print_expression(expression, compact=True),
+    "evaluate": __evaluate,
+    "closure": __closure,
+    "python": __python,
+    "vm": __vm,
+    "disassemble": __disassemble,
+}
+
+
+class Options(NamedTuple):
+    # A `NamedTuple` rather than a frozen dataclass keeps `dataclasses` out of
+    # start-up.
+    scanner_engine: str = "default"
+    optimize: bool = False
+    backend: str = "print"
+    cache_directory: Optional[str] = None
+    cache_size: int = 256 << 20
+    source_cache: bool = True
+    max_errors: Optional[int] = None
+    share_nodes: bool = False
+
+
+def backend(options: Options) -> Callable[[Expression], str]:
+    # With `share_nodes`, the backends that can memoise work on each shared
+    # node once rather than once per use.
+    if options.share_nodes:
+        if options.backend == "print":
+            return __print_shared
+        if options.backend == "evaluate":
+            return lambda expression: __evaluate(expression, memoize=True)
+    return BACKENDS[options.backend]
+
+
+def parse(source: str | TextIO, options: Options = Options()) -> Optional[Expression]:
+    cacheable = options.source_cache and isinstance(source, str)
+    # The options the tree depends on. The others change how it is reached or
+    # what is done with it, and only a tree parsed without errors is cached.
+    tree_options = (options.share_nodes,)
+    if cacheable:
+        expression = SOURCE_CACHE.get(source, tree_options)
+        if expression is not None:
+            # Errors are sticky until `Reporter.reset_error`, as for a parse.
+            return None if Reporter.has_error() else expression
+
+    diagnostics = Diagnostics(options.max_errors)
+    scanner = scanner_class(options.scanner_engine)(source, diagnostics=diagnostics)
+    if options.scanner_engine == "parallel":
+        # The chunks' tokens are joined and parsed in place, without a
+        # `Token` for each.
+        tokens = scanner.scan_token_buffer()
+    else:
+        tokens = scanner.iter_tokens()
+    if options.share_nodes:
+        # Repeated subexpressions become one shared node.
+        from pylox.interning import InterningFactory
+
+        parser = Parser(tokens, InterningFactory(), diagnostics)
+    else:
+        parser = Parser(tokens, diagnostics=diagnostics)
 
     expression = parser.parse()
+    # Scan the rest of the input so that its errors are still reported.
+    if not isinstance(tokens, TokenBuffer):
+        for _ in tokens:
+            pass
+    Reporter.report_errors(diagnostics)
     if Reporter.has_error():
-        return
-    print(ast_printer.print(expression))
+        return None
+    if cacheable:
+        SOURCE_CACHE.put(source, expression, tree_options)
+    return expression
+
+
+def execute(expression: Expression, options: Options = Options()):
+    if options.optimize:
+        from pylox.optimizer import Optimizer
+
+        expression = Optimizer().optimize(expression)
+    try:
+        print(backend(options)(expression))
+    except RuntimeException as exception:
+        Reporter.report_runtime_error(exception)
+
+
+def run(source: str | TextIO, options: Options = Options()):
+    expression = parse(source, options)
+    if expression is not None:
+        execute(expression, options)
 
 
-def run_file(file_path: str):
-    with open(file_path, "r") as file:
-        run(file.readlines())
+def run_file(file_path: str, options: Options = Options()):
+    if file_path == "-":
+        run(sys.stdin, options)
+    elif options.cache_directory is not None:
+        from pylox.parse_cache import ParseCache
 
-        if Reporter.has_error():
-            sys.exit()
+        cache = ParseCache(options.cache_directory, options.cache_size)
+        expression = cache.parse_file(
+            file_path, scanner_class(options.scanner_engine), options.max_errors
+        )
+        if expression is not None:
+            execute(expression, options)
+    else:
+        with open(file_path, "r") as file:
+            run(file, options)
 
+    if Reporter.has_error() or Reporter.has_runtime_error():
+        sys.exit()
 
-def run_interactive():
+
+def run_profile(
+    file_path: str,
+    report_path: str,
+    options: Options = Options(),
+    stats_path: Optional[str] = None,
+):
+    # Runs a file as `run_file` does, phase by phase, and writes a JSON report
+    # of where the time went to `report_path`, or to standard error for "-".
+    # The caches are bypassed, since a cache hit says nothing about the
+    # phases.
+    import json
+
+    from pylox.profiler import profile
+
+    if file_path == "-":
+        source = sys.stdin.read()
+    else:
+        with open(file_path, "r") as file:
+            source = file.read()
+    report = profile(
+        source,
+        scanner_class(options.scanner_engine),
+        backend(options),
+        options.backend,
+        options.optimize,
+        options.max_errors,
+        stats_path,
+        options.share_nodes,
+    )
+    output = report.pop("output")
+    if output is not None:
+        print(output)
+    report["options"] = {
+        "scanner": options.scanner_engine,
+        "backend": options.backend,
+        "optimize": options.optimize,
+        "share_nodes": options.share_nodes,
+    }
+    if report_path == "-":
+        json.dump(report, sys.stderr, indent=2)
+        sys.stderr.write("\n")
+    else:
+        with open(report_path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if Reporter.has_error() or Reporter.has_runtime_error():
+        sys.exit()
+
+
+def run_program_file(
+    file_path: str, options: Options = Options(), output_format="text"
+):
+    # Runs every `;`-terminated expression in the file, carrying on past
+    # errors, and exits with 65 if any statement had a syntax error or 70 if
+    # any failed at runtime.
+    from pylox.program import run_program
+
+    run_statement = backend(options)
+    engine = scanner_class(options.scanner_engine)
+    if file_path == "-":
+        result = run_program(
+            sys.stdin,
+            run_statement,
+            sys.stdout,
+            output_format,
+            engine,
+            options.optimize,
+            options.max_errors,
+            options.share_nodes,
+        )
+    else:
+        with open(file_path, "r") as file:
+            result = run_program(
+                file,
+                run_statement,
+                sys.stdout,
+                output_format,
+                engine,
+                options.optimize,
+                options.max_errors,
+                options.share_nodes,
+            )
+
+    if result.syntax_errors > 0:
+        sys.exit(65)
+    if result.runtime_errors > 0:
+        sys.exit(70)
+
+
+def run_check(
+    paths: List[str],
+    options: Options = Options(),
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+    slowest: int = 5,
+):
+    # Scans and parses every file under `paths` without evaluating anything,
+    # and exits with a non-zero status if any file has errors.
+    from pylox.multi_file import check_files, collect_files, format_report
+
+    start = time.perf_counter()
+    results = check_files(
+        collect_files(paths),
+        scanner_class(options.scanner_engine),
+        workers,
+        chunk_size,
+        options.max_errors,
+    )
+    print("\n".join(format_report(results, time.perf_counter() - start, slowest)))
+
+    if any(result.diagnostics for result in results):
+        sys.exit(65)
+
+
+def run_interactive(options: Options = Options()):
     while True:
         try:
             line = input(__PROMPT)
@@ -39,17 +337,77 @@ def run_interactive():
         if len(line) == 0:
             break
 
-        run(line)
+        run(line, options)
         Reporter.reset_error()
 
 
 if __name__ == "__main__":
+    from argparse import ArgumentParser
+
     parser = ArgumentParser(prog="pylox", description="A tree-walk interpreter for Lox")
     parser.add_argument("-f", "--file", required=False)
+    parser.add_argument("--check", nargs="+", metavar="PATH", required=False)
+    parser.add_argument("-j", "--jobs", type=int, required=False)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--timings", type=int, default=5, metavar="N")
     parser.add_argument("-i", "--interactive", action="store_true", default=True)
+    parser.add_argument("--scanner", choices=SCANNER_ENGINES, default="default")
+    parser.add_argument("-O", "--optimize", action="store_true", default=False)
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="print")
+    parser.add_argument("--cache-dir", required=False)
+    parser.add_argument("--cache-size", type=int, default=256 << 20)
+    parser.add_argument(
+        "--no-source-cache", dest="source_cache", action="store_false", default=True
+    )
+    parser.add_argument("--max-errors", type=int, required=False)
+    parser.add_argument(
+        "--share-nodes",
+        action="store_true",
+        default=False,
+        help="build repeated subexpressions as one shared node",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="with --file, write a JSON report of each phase, or - for stderr",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        metavar="STATS",
+        help="with --profile, also dump cProfile statistics for pstats",
+    )
+    parser.add_argument(
+        "--program",
+        action="store_true",
+        default=False,
+        help="with --file, run every ';'-terminated expression in the file",
+    )
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text")
     args = parser.parse_args()
+    if args.program and args.file is None:
+        parser.error("--program needs --file")
+    if args.profile is not None and args.file is None:
+        parser.error("--profile needs --file")
+    if args.profile_stats is not None and args.profile is None:
+        parser.error("--profile-stats needs --profile")
+    options = Options(
+        args.scanner,
+        args.optimize,
+        args.backend,
+        args.cache_dir,
+        args.cache_size,
+        args.source_cache,
+        args.max_errors,
+        args.share_nodes,
+    )
 
-    if args.file is not None:
-        run_file(args.file)
+    if args.check is not None:
+        run_check(args.check, options, args.jobs, args.chunk_size, args.timings)
+    elif args.program:
+        run_program_file(args.file, options, args.format)
+    elif args.profile is not None:
+        run_profile(args.file, args.profile, options, args.profile_stats)
+    elif args.file is not None:
+        run_file(args.file, options)
     elif args.interactive:
-        run_interactive()
+        run_interactive(options)
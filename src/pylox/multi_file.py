@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+
+class FileResult(NamedTuple):
+    path: str
+    diagnostics: List[str]
+    seconds: float
+
+
+def collect_files(paths: Iterable[str], suffix: str = ".lox") -> List[str]:
+    # Directories are searched recursively for files ending in `suffix`.
+    # Files named explicitly are kept whatever their suffix. The result is
+    # sorted so that the order does not depend on the file system.
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(str(file) for file in Path(path).rglob(f"*{suffix}"))
+        else:
+            files.add(path)
+    return sorted(files)
+
+
+def check_file(
+    path: str, scanner_class: type = Scanner, max_errors: Optional[int] = None
+) -> FileResult:
+    # Each file gets its own `Diagnostics`, which is returned formatted, so
+    # that nothing is shared between the files a worker process checks.
+    diagnostics = Diagnostics(max_errors)
+    start = time.perf_counter()
+    try:
+        with open(path, "r") as file:
+            tokens = scanner_class(file, diagnostics=diagnostics).iter_tokens()
+            Parser(tokens, diagnostics=diagnostics).parse()
+            # Scan the rest of the input so that its errors are still reported.
+            for _ in tokens:
+                pass
+    except (OSError, UnicodeDecodeError) as exception:
+        return FileResult(path, [f"Error: {exception}"], time.perf_counter() - start)
+    return FileResult(path, diagnostics.format(), time.perf_counter() - start)
+
+
+def check_files(
+    paths: Iterable[str],
+    scanner_class: type = Scanner,
+    workers: Optional[int] = None,
+    chunk_size: int = 16,
+    max_errors: Optional[int] = None,
+) -> List[FileResult]:
+    # Scans and parses every file, spreading the files over `workers`
+    # processes in chunks of `chunk_size`. Results are returned in the order
+    # of `paths`, however the work was scheduled. With a single worker the
+    # files are checked in this process.
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [check_file(path, scanner_class, max_errors) for path in paths]
+
+    # Only imported when needed: `concurrent.futures` takes longer to import
+    # than checking a small file.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                check_file,
+                paths,
+                [scanner_class] * len(paths),
+                [max_errors] * len(paths),
+                chunksize=chunk_size,
+            )
+        )
+
+
+def format_report(
+    results: List[FileResult], seconds: float, slowest: int = 5
+) -> List[str]:
+    lines = [
+        f"{result.path}: {diagnostic}"
+        for result in results
+        for diagnostic in result.diagnostics
+    ]
+
+    failed = sum(1 for result in results if result.diagnostics)
+    lines.append(
+        f"Checked {len(results)} files in {seconds:.3f}s, {failed} with errors."
+    )
+    if slowest > 0 and results:
+        lines.append("Slowest files:")
+        # Ties are broken by path so that the report is stable.
+        ranked = sorted(results, key=lambda result: (-result.seconds, result.path))
+        for result in ranked[:slowest]:
+            lines.append(f"  {result.seconds * 1000:9.3f} ms  {result.path}")
+    return lines
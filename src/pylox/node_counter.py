@@ -0,0 +1,24 @@
+from pylox.expression import Expression
+
+
+class NodeCounter:
+    # Counts with an explicit stack, so that deep trees do not overflow the
+    # call stack. With `distinct`, a node shared by an `InterningFactory` is
+    # counted once, which is what it costs in memory, and is not walked again:
+    # counted per use, a tree of shared nodes can take exponential time.
+    def count(self, expression: Expression, distinct: bool = False) -> int:
+        count = 0
+        seen = set() if distinct else None
+        stack = [expression]
+        while stack:
+            node = stack.pop()
+            if seen is not None:
+                if id(node) in seen:
+                    continue
+                seen.add(id(node))
+            count += 1
+            for name in node.__match_args__:
+                child = getattr(node, name)
+                if isinstance(child, Expression):
+                    stack.append(child)
+        return count
@@ -0,0 +1,154 @@
+from typing import Callable, List, Tuple
+
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from pylox.node_counter import NodeCounter
+from pylox.reporter import RuntimeException
+from pylox.runtime import binary, is_truthy, unary
+from pylox.token_type import TokenType
+
+
+class Optimizer(Visitor[None]):
+    # Folds operators over literal operands, removes groupings and prunes
+    # ternaries whose condition is a literal. Operations that would raise a
+    # `RuntimeException`, such as a division by zero or `+` on mixed types,
+    # are left in place so that they still fail when evaluated.
+    #
+    # The tree is walked with an explicit stack, as in `StreamingAstPrinter`,
+    # so that long chains of operators do not overflow the call stack. Each
+    # `visit_*` pushes its children and then a step that builds the node from
+    # their optimized forms, which are left on a stack of results.
+    def __init__(self):
+        self.removed_nodes = 0
+        self.__stack: List[Expression | Tuple[Callable[[any], None], any]] = []
+        self.__results: List[Expression] = []
+
+    def optimize(self, expression: Expression) -> Expression:
+        stack = self.__stack
+        stack.append(expression)
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Expression):
+                item.accept(self)
+            else:
+                step, expression = item
+                step(expression)
+        return self.__results.pop()
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__fold_binary, expression))
+        stack.append(expression.right)
+        stack.append(expression.left)
+
+    def __fold_binary(self, expression: BinaryExpression) -> None:
+        results = self.__results
+        right = results.pop()
+        left = results.pop()
+
+        if isinstance(left, LiteralExpression):
+            if isinstance(right, LiteralExpression):
+                try:
+                    value = binary(expression.operator, left.value, right.value)
+                except RuntimeException:
+                    pass
+                else:
+                    self.removed_nodes += 2
+                    results.append(LiteralExpression(value))
+                    return
+            elif expression.operator.token_type == TokenType.COMMA:
+                # The left operand of a comma is evaluated for its effects
+                # only, and a literal has none.
+                self.removed_nodes += 2
+                results.append(right)
+                return
+
+        if left is expression.left and right is expression.right:
+            results.append(expression)
+        else:
+            results.append(BinaryExpression(left, expression.operator, right))
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.removed_nodes += 1
+        self.__stack.append(expression.expression)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        self.__results.append(expression)
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__fold_unary, expression))
+        stack.append(expression.right)
+
+    def __fold_unary(self, expression: UnaryExpression) -> None:
+        results = self.__results
+        right = results.pop()
+
+        if isinstance(right, LiteralExpression):
+            try:
+                value = unary(expression.operator, right.value)
+            except RuntimeException:
+                pass
+            else:
+                self.removed_nodes += 1
+                results.append(LiteralExpression(value))
+                return
+
+        if right is expression.right:
+            results.append(expression)
+        else:
+            results.append(UnaryExpression(expression.operator, right))
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__prune_ternary, expression))
+        stack.append(expression.conditional_expression)
+
+    def __prune_ternary(self, expression: TernaryExpression) -> None:
+        # Runs once the condition is optimized, so that only the branch that
+        # is kept is optimized when the condition is a literal.
+        conditional_expression = self.__results[-1]
+        stack = self.__stack
+
+        if isinstance(conditional_expression, LiteralExpression):
+            self.__results.pop()
+            if is_truthy(conditional_expression.value):
+                kept, pruned = expression.true_expression, expression.false_expression
+            else:
+                kept, pruned = expression.false_expression, expression.true_expression
+            self.removed_nodes += 2 + NodeCounter().count(pruned)
+            stack.append(kept)
+            return
+
+        stack.append((self.__fold_ternary, expression))
+        stack.append(expression.false_expression)
+        stack.append(expression.true_expression)
+
+    def __fold_ternary(self, expression: TernaryExpression) -> None:
+        results = self.__results
+        false_expression = results.pop()
+        true_expression = results.pop()
+        conditional_expression = results.pop()
+        if (
+            conditional_expression is expression.conditional_expression
+            and true_expression is expression.true_expression
+            and false_expression is expression.false_expression
+        ):
+            results.append(expression)
+        else:
+            results.append(
+                TernaryExpression(
+                    conditional_expression, true_expression, false_expression
+                )
+            )
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        self.__results.append(expression)
@@ -0,0 +1,222 @@
+from bisect import bisect_right
+from itertools import islice
+import os
+import re
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostic, Diagnostics, Reporter
+from pylox.token_buffer import TokenBuffer
+from pylox.tokens import Token
+from pylox.token_type import TokenType
+
+# What the prepass looks for: the start of a string, which runs to the next
+# quote or the end of the input, a line comment, or the start of a block
+# comment. Nothing else can contain a newline that is not a line break.
+_LEXEME_PATTERN = re.compile(r'"[^"]*"?|//[^\n]*|/\*')
+_COMMENT_DELIMITER_PATTERN = re.compile(r"/\*|\*/")
+
+
+def _comment_end(source: str, start: int) -> int:
+    # Where the block comment at `start` ends, with nesting, as in
+    # `RegexScanner`.
+    comment_blocks = 1
+    for delimiter in _COMMENT_DELIMITER_PATTERN.finditer(source, start + 2):
+        comment_blocks += 1 if delimiter.group() == "/*" else -1
+        if comment_blocks == 0:
+            return delimiter.end()
+    return len(source)
+
+
+def _multi_line_spans(source: str) -> List[Tuple[int, int]]:
+    # The strings and block comments that contain a newline, as sorted
+    # `(start, end)` pairs. The input must not be split inside them.
+    spans = []
+    search = _LEXEME_PATTERN.search
+    position = 0
+    while (match := search(source, position)) is not None:
+        start = match.start()
+        if source.startswith("/*", start):
+            end = _comment_end(source, start)
+        else:
+            end = match.end()
+        if source.find("\n", start, end) != -1:
+            spans.append((start, end))
+        position = end
+    return spans
+
+
+def split_points(source: str, chunks: int) -> List[int]:
+    # Offsets that split `source` into about `chunks` pieces of similar size,
+    # each starting at the beginning of a line, outside any string or block
+    # comment. Starts with 0 and ends with `len(source)`.
+    return _split_points(source, _multi_line_spans(source), chunks)
+
+
+def _split_points(source: str, spans: List[Tuple[int, int]], chunks: int) -> List[int]:
+    span_starts = [start for start, _ in spans]
+    points = [0]
+    for chunk in range(1, chunks):
+        position = max(len(source) * chunk // chunks, points[-1])
+        while True:
+            newline = source.find("\n", position)
+            if newline == -1:
+                position = len(source)
+                break
+            span = bisect_right(span_starts, newline) - 1
+            if span >= 0 and spans[span][1] > newline:
+                position = spans[span][1]
+            else:
+                position = newline + 1
+                break
+        if position >= len(source):
+            break
+        if position > points[-1]:
+            points.append(position)
+    points.append(len(source))
+    return points
+
+
+def _first_lines(
+    source: str, spans: List[Tuple[int, int]], points: List[int]
+) -> List[int]:
+    # The line the scanner is on at each of `points`. Newlines are counted
+    # except inside block comments, which no point falls in.
+    lines = []
+    line = 1
+    position = 0
+    span = 0
+    for point in points:
+        line += source.count("\n", position, point)
+        while span < len(spans) and spans[span][0] < point:
+            start, end = spans[span]
+            if source.startswith("/*", start):
+                line -= source.count("\n", start, end)
+            span += 1
+        lines.append(line)
+        position = point
+    return lines
+
+
+class _ErrorList:
+    # What a worker reports its errors to. They are kept as they come: not
+    # merged, since the caller's sink does that as it would for `Scanner`,
+    # and without a limit, since only the caller knows how many came before.
+    def __init__(self):
+        self.diagnostics: List[Diagnostic] = []
+
+    def report_error(
+        self, line: int, where: str, message: str, column: Optional[int] = None
+    ) -> None:
+        self.diagnostics.append(Diagnostic(line, column, where, message))
+
+    def is_full(self) -> bool:
+        return False
+
+
+def _scan_chunk(
+    chunk: Tuple[str, int, int],
+) -> Tuple[TokenBuffer, List[Diagnostic]]:
+    # Runs in a worker process. Scans a piece of the source that starts at
+    # an offset and on a line of the whole source, so that the tokens and
+    # errors need no fixing up.
+    text, offset, line = chunk
+    errors = _ErrorList()
+    tokens = TokenBuffer(text, offset)
+    RegexScanner(text, diagnostics=errors).scan_range(0, line, tokens.append)
+    return tokens, errors.diagnostics
+
+
+class ParallelScanner:
+    # Scans a large source in chunks, in a pool of `workers` processes. The
+    # source is split where lines begin outside strings and block comments,
+    # which a prepass over the whole source finds with a few regular
+    # expressions, and the lines before each chunk are counted as the
+    # scanner counts them. Each chunk is scanned by `RegexScanner` into a
+    # `TokenBuffer` with the offsets and lines of the whole source, which is
+    # cheap to send back and needs no fixing up.
+    #
+    # `scan_token_buffer` joins the chunks' buffers by copying their arrays,
+    # without building a `Token`, for the `Parser` to read in place, and is
+    # what `lox` uses. `iter_tokens` builds a `Token` for every token, which
+    # takes about as long as scanning the whole source in this process, so
+    # it is no faster than `RegexScanner` and only there for callers that
+    # need `Token` objects.
+    #
+    # The tokens are identical to those produced by `Scanner`, and so are
+    # the errors reported to the sink, in the same order. Two things differ.
+    # A chunk's errors are reported before any of its tokens are handed out,
+    # so a parser sharing the sink can report its own errors after scanner
+    # errors further on. And the scan does not stop early when a
+    # `Diagnostics` with `max_errors` fills up. Sources shorter than
+    # `min_size` characters are scanned in this process.
+    def __init__(
+        self,
+        source: str | TextIO,
+        diagnostics: Optional[Diagnostics] = None,
+        workers: Optional[int] = None,
+        chunks_per_worker: int = 4,
+        min_size: int = 1 << 20,
+    ):
+        self.__source = source if isinstance(source, str) else source.read()
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
+        self.__workers = os.cpu_count() if workers is None else workers
+        self.__chunks_per_worker = chunks_per_worker
+        self.__min_size = min_size
+
+    def __scan_chunks(self) -> Iterator[Tuple[TokenBuffer, List[Diagnostic]]]:
+        source = self.__source
+        if self.__workers <= 1 or len(source) < self.__min_size:
+            yield _scan_chunk((source, 0, 1))
+            return
+
+        spans = _multi_line_spans(source)
+        points = _split_points(source, spans, self.__workers * self.__chunks_per_worker)
+        lines = _first_lines(source, spans, points)
+        chunks = [
+            (source[start:end], start, line)
+            for start, end, line in zip(points, points[1:], lines)
+        ]
+        # Only imported when needed, as in `multi_file`.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=self.__workers) as executor:
+            # Results come back in order, so the tokens of the first chunks
+            # can be consumed while the others are being scanned.
+            yield from executor.map(_scan_chunk, chunks)
+
+    def __report(self, diagnostics: List[Diagnostic]) -> None:
+        for diagnostic in diagnostics:
+            self.__diagnostics.report_error(
+                diagnostic.line, diagnostic.where, diagnostic.message, diagnostic.column
+            )
+
+    def scan_token_buffer(self) -> TokenBuffer:
+        # Every chunk ends with an `EOF` token on its last line, which is
+        # left out unless the chunk is the last one.
+        joined = None
+        previous = None
+        for tokens, diagnostics in self.__scan_chunks():
+            self.__report(diagnostics)
+            if previous is not None:
+                if joined is None:
+                    joined = TokenBuffer(self.__source)
+                joined.extend(previous, len(previous) - 1)
+            previous = tokens
+        if joined is None:
+            return previous
+        joined.extend(previous, len(previous))
+        return joined
+
+    def iter_tokens(self) -> Iterator[Token]:
+        line = 1
+        for tokens, diagnostics in self.__scan_chunks():
+            self.__report(diagnostics)
+            count = len(tokens) - 1
+            yield from islice(tokens, count)
+            line = tokens.line(count)
+        yield Token(TokenType.EOF, "", None, line)
+
+    def scan_tokens(self) -> List[Token]:
+        return list(self.iter_tokens())
@@ -0,0 +1,279 @@
+from array import array
+import hashlib
+from io import BytesIO, TextIOWrapper
+import marshal
+import os
+from pathlib import Path
+import sys
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pylox import __version__
+from pylox.expression import Expression, ExpressionFactory
+from pylox.expression_arena import ExpressionArena
+from pylox.parser import GRAMMAR_VERSION, Parser
+from pylox.reporter import Diagnostics, Reporter
+from pylox.token_type import TokenType
+from pylox.tokens import Token
+
+
+class ParseCache:
+    # Persists the tokens and the AST of successfully parsed files in
+    # `directory`, keyed by a hash of the file contents, the pylox version,
+    # the grammar version, the entry format and the Python and `marshal`
+    # versions that wrote it. Entries are written to a
+    # temporary file and renamed into place, so concurrent runs never see a
+    # partial entry. Reading an entry refreshes its modification time, and
+    # the least recently used entries are evicted once the directory grows
+    # past `max_bytes`. An entry that cannot be read back, such as one cut
+    # short by a full disk, is deleted and counted as a miss.
+    #
+    # The cache is best-effort: a directory that cannot be created, read or
+    # written, such as a read-only or full one, only costs the caching. Each
+    # such failure is counted in `errors` and the run carries on uncached.
+    #
+    # An entry is a `marshal`led tuple of flat arrays: the token stream in
+    # the `TokenBuffer` style, and the AST in the `ExpressionArena` layout
+    # with operator tokens stored as indices into the token stream.
+    __FORMAT_VERSION = 1
+    __SUFFIX = ".lox-cache"
+    __TOKEN_TYPES = list(TokenType)
+    __TOKEN_TYPE_IDS = {token_type: i for i, token_type in enumerate(TokenType)}
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20):
+        self.__directory = Path(directory)
+        self.__max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        try:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            self.errors += 1
+
+    def key(self, data: bytes) -> str:
+        # `marshal`'s format may change between Python versions.
+        digest = hashlib.sha256(
+            f"{__version__}:{GRAMMAR_VERSION}:{ParseCache.__FORMAT_VERSION}:"
+            f"{sys.implementation.cache_tag}:{marshal.version}:".encode()
+        )
+        digest.update(data)
+        return digest.hexdigest()
+
+    def __entry_path(self, key: str) -> Path:
+        return self.__directory / f"{key}{ParseCache.__SUFFIX}"
+
+    def load(self, key: str) -> Optional[Tuple[List[Token], Expression]]:
+        path = self.__entry_path(key)
+        try:
+            data = path.read_bytes()
+        except OSError as error:
+            if not isinstance(error, FileNotFoundError):
+                self.errors += 1
+            self.misses += 1
+            return None
+
+        try:
+            entry = ParseCache.__deserialize(data)
+        except Exception:
+            # A corrupt entry can fail in about any way while it is decoded.
+            self.misses += 1
+            self.__unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # The entry is only evicted sooner.
+            self.errors += 1
+        self.hits += 1
+        return entry
+
+    def __unlink(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # Deleted by a concurrent run.
+            pass
+        except OSError:
+            self.errors += 1
+
+    def store(
+        self, key: str, tokens: List[Token], arena: ExpressionArena, root: int
+    ) -> None:
+        data = ParseCache.__serialize(tokens, arena, root)
+        try:
+            descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.__directory, suffix=".tmp"
+            )
+        except OSError:
+            self.errors += 1
+            return
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, self.__entry_path(key))
+        except OSError:
+            self.__unlink(Path(temporary_path))
+            self.errors += 1
+            return
+        except BaseException:
+            self.__unlink(Path(temporary_path))
+            raise
+        self.__evict()
+
+    def __evict(self) -> None:
+        entries = []
+        try:
+            paths = list(self.__directory.glob(f"*{ParseCache.__SUFFIX}"))
+        except OSError:
+            self.errors += 1
+            return
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                # Evicted by a concurrent run.
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.__max_bytes:
+                break
+            try:
+                path.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                self.errors += 1
+            total_bytes -= size
+
+    def parse_file(
+        self, file_path: str, scanner_class: type, max_errors: Optional[int] = None
+    ) -> Optional[Expression]:
+        # Returns the cached AST when there is one. Otherwise the file is
+        # scanned and parsed, and the result is cached if no error was
+        # reported, so that diagnostics are always produced by a real parse.
+        # Errors are collected and reported as by `lox.parse`.
+        # The file is read once, and the bytes that are hashed are the bytes
+        # that are parsed, so an edit made meanwhile cannot put one version's
+        # AST under the other's key. They are decoded as `open` would.
+        with open(file_path, "rb") as file:
+            data = file.read()
+        key = self.key(data)
+        entry = self.load(key)
+        if entry is not None:
+            return entry[1]
+
+        tokens: List[Token] = []
+        arena = ExpressionArena()
+        diagnostics = Diagnostics(max_errors)
+        with TextIOWrapper(BytesIO(data)) as file:
+            scanner = scanner_class(file, diagnostics=diagnostics)
+            stream = ParseCache.__record(scanner.iter_tokens(), tokens)
+            root = Parser(stream, arena, diagnostics).parse()
+            # Scan the rest of the input so that its errors are still reported.
+            for _ in stream:
+                pass
+
+        Reporter.report_errors(diagnostics)
+        if Reporter.has_error():
+            return None
+        self.store(key, tokens, arena, root)
+        return ParseCache.__build_expression(arena, root)
+
+    @staticmethod
+    def __record(tokens: Iterable[Token], into: List[Token]) -> Iterator[Token]:
+        for token in tokens:
+            into.append(token)
+            yield token
+
+    @staticmethod
+    def __serialize(tokens: List[Token], arena: ExpressionArena, root: int) -> bytes:
+        token_ids = {id(token): i for i, token in enumerate(tokens)}
+        return marshal.dumps(
+            (
+                array(
+                    "B",
+                    (ParseCache.__TOKEN_TYPE_IDS[token.token_type] for token in tokens),
+                ).tobytes(),
+                array("I", (token.line for token in tokens)).tobytes(),
+                tuple(token.lexeme for token in tokens),
+                {
+                    i: token.literal
+                    for i, token in enumerate(tokens)
+                    if token.literal is not None
+                },
+                arena.kinds.tobytes(),
+                tuple(slot.tobytes() for slot in arena.slots),
+                array("I", (token_ids[id(token)] for token in arena.tokens)).tobytes(),
+                tuple(arena.values),
+                root,
+            )
+        )
+
+    @staticmethod
+    def __deserialize(data: bytes) -> Tuple[List[Token], Expression]:
+        (
+            token_types,
+            token_lines,
+            lexemes,
+            literals,
+            kinds,
+            slots,
+            operator_tokens,
+            values,
+            root,
+        ) = marshal.loads(data)
+
+        lines = array("I")
+        lines.frombytes(token_lines)
+        tokens = [
+            Token(ParseCache.__TOKEN_TYPES[token_type], lexeme, literals.get(i), line)
+            for i, (token_type, lexeme, line) in enumerate(
+                zip(token_types, lexemes, lines)
+            )
+        ]
+
+        arena = ExpressionArena()
+        arena.kinds.frombytes(kinds)
+        for slot, slot_data in zip(arena.slots, slots):
+            slot.frombytes(slot_data)
+        operator_indices = array("I")
+        operator_indices.frombytes(operator_tokens)
+        arena.tokens.extend(tokens[i] for i in operator_indices)
+        arena.values.extend(values)
+        return tokens, ParseCache.__build_expression(arena, root)
+
+    @staticmethod
+    def __build_expression(arena: ExpressionArena, root: int) -> Expression:
+        # Children are always created before their parents, so a single pass
+        # in index order builds every node without recursion.
+        factory = ExpressionFactory()
+        first, second, third = arena.slots
+        nodes: List[Expression] = []
+        for i, kind in enumerate(arena.kinds):
+            match kind:
+                case ExpressionArena.BINARY_EXPRESSION:
+                    node = factory.binary_expression(
+                        nodes[first[i]], arena.tokens[second[i]], nodes[third[i]]
+                    )
+                case ExpressionArena.GROUPING_EXPRESSION:
+                    node = factory.grouping_expression(nodes[first[i]])
+                case ExpressionArena.LITERAL_EXPRESSION:
+                    node = factory.literal_expression(arena.values[first[i]])
+                case ExpressionArena.UNARY_EXPRESSION:
+                    node = factory.unary_expression(
+                        arena.tokens[first[i]], nodes[second[i]]
+                    )
+                case ExpressionArena.TERNARY_EXPRESSION:
+                    node = factory.ternary_expression(
+                        nodes[first[i]], nodes[second[i]], nodes[third[i]]
+                    )
+                case ExpressionArena.VARIABLE_EXPRESSION:
+                    node = factory.variable_expression(arena.tokens[first[i]])
+            nodes.append(node)
+        return nodes[root]
@@ -1,70 +1,140 @@
-from typing import List, Optional
-
-from pylox.expression import (
-    BinaryExpression,
-    Expression,
-    GroupingExpression,
-    LiteralExpression,
-    TernaryExpression,
-    UnaryExpression,
-)
-from pylox.reporter import ParseException, Reporter
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+from pylox.expression import Expression, ExpressionFactory
+from pylox.reporter import Diagnostics, ParseException, Reporter
+from pylox.token_buffer import TOKEN_TYPES, TokenBuffer
 from pylox.token_type import TokenType
 from pylox.tokens import Token
 
+if TYPE_CHECKING:
+    # Only needed for annotations, and not imported at start-up.
+    from pylox.expression_arena import ExpressionArena
+
+# Part of the `ParseCache` key. Bump it whenever the grammar or the shape of
+# the AST changes, so that stale cache entries are not reused.
+GRAMMAR_VERSION = 2
+
+
+# Frames on the `Parser.__expression` stack.
+_UNARY = 0
+_GROUPING = 1
+_BINARY = 2
+_TERNARY_CONDITION = 3
+_TERNARY_TRUE = 4
+
+
+# How tightly each infix operator binds: an operand being parsed at some
+# level only takes the operators at that level or above. `Document` reasons
+# about the same levels to reparse part of a tree.
+INFIX_LEVELS = {
+    TokenType.COMMA: 0,
+    TokenType.BANG_EQUAL: 1,
+    TokenType.EQUAL_EQUAL: 1,
+    TokenType.QUESTION_MARK: 2,
+    TokenType.GREATER: 3,
+    TokenType.GREATER_EQUAL: 3,
+    TokenType.LESS: 3,
+    TokenType.LESS_EQUAL: 3,
+    TokenType.MINUS: 4,
+    TokenType.PLUS: 4,
+    TokenType.SLASH: 5,
+    TokenType.STAR: 5,
+}
+# Both branches of a ternary are comparisons.
+TERNARY_OPERAND_LEVEL = 3
 
-class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.__tokens: List[Token] = tokens
-        self.__current = 0
-
-    def __match(self, *token_types: TokenType) -> bool:
-        for token_type in token_types:
-            if self.__check(token_type):
-                self.__advance()
-                return True
 
-        return False
+class Parser:
+    __PREFIX_TOKEN_TYPES = {TokenType.BANG, TokenType.MINUS, TokenType.LEFT_PAREN}
+    __LITERALS = {TokenType.FALSE: False, TokenType.TRUE: True, TokenType.NIL: None}
+
+    def __init__(
+        self,
+        tokens: Iterable[Token] | TokenBuffer,
+        factory: "ExpressionFactory | ExpressionArena" = ExpressionFactory(),
+        diagnostics: Optional[Diagnostics] = None,
+    ):
+        # Tokens are pulled one at a time, so only the current token is held
+        # at any point. This lets the parser consume a lazy
+        # `Scanner.iter_tokens()` stream. A `TokenBuffer` is read in place
+        # instead, through its arrays: the parser only looks at the type of
+        # most tokens, and builds a `Token` for the current token only when it
+        # goes into the tree or into an error.
+        if isinstance(tokens, TokenBuffer):
+            self.__buffer: Optional[TokenBuffer] = tokens
+            self.__types = map(TOKEN_TYPES.__getitem__, tokens.type_ids)
+            self.__index = 0
+            self.__current_token: Optional[Token] = None
+            self.__current_type = next(self.__types)
+        else:
+            self.__buffer = None
+            self.__tokens = iter(tokens)
+            self.__current_token = next(self.__tokens)
+            self.__current_type = self.__current_token.token_type
+        # Nodes are built through the factory, so the same parser can produce
+        # either `Expression` objects or indices into an `ExpressionArena`.
+        self.__factory = factory
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
+        # Set by `parse_program` once a statement has an error, so that only
+        # the first error of each statement is reported.
+        self.__panic = False
+        self.__statements = False
 
     def __check(self, token_type: TokenType) -> bool:
         if self.__is_at_end():
             return False
-        return self.__peek().token_type == token_type
+        return self.__current_type == token_type
 
     def __advance(self) -> None:
-        if not self.__is_at_end():
-            self.__current += 1
-        return self.__previous()
-
-    def __previous(self) -> Token:
-        return self.__tokens[self.__current - 1]
+        if self.__current_type != TokenType.EOF:
+            if self.__buffer is None:
+                self.__current_token = next(self.__tokens)
+                self.__current_type = self.__current_token.token_type
+            else:
+                self.__index += 1
+                self.__current_type = next(self.__types)
 
     def __is_at_end(self) -> bool:
-        return self.__peek().token_type == TokenType.EOF
+        return self.__current_type == TokenType.EOF
 
     def __peek(self) -> Token:
-        return self.__tokens[self.__current]
+        if self.__buffer is None:
+            return self.__current_token
+        return self.__buffer[self.__index]
+
+    def __peek_line(self) -> int:
+        if self.__buffer is None:
+            return self.__current_token.line
+        return self.__buffer.line(self.__index)
 
     def __consume(self, token_type: TokenType, message: str) -> None:
         if self.__check(token_type):
-            return self.__advance()
-
-        return self.__error(self.__peek(), message)
+            self.__advance()
+        else:
+            self.__error(self.__peek(), message)
 
     def __error(self, token: Token, message: str) -> Optional[ParseException]:
+        if self.__panic:
+            return ParseException()
+        self.__panic = self.__statements
         if token.token_type == TokenType.EOF:
-            Reporter.report_error(token.line, " at end", message)
+            self.__diagnostics.report_error(token.line, " at end", message)
         else:
-            Reporter.report_error(token.line, f"at '{token.lexeme}'", message)
+            self.__diagnostics.report_error(token.line, f"at '{token.lexeme}'", message)
         return ParseException()
 
     def __synchronize(self) -> None:
-        self.__advance()
-
+        # Skips the rest of a statement with an error. Stops at the next `;`,
+        # which is left for `parse_program` to consume, so that the scanner
+        # does not run ahead into the next statement. Otherwise stops before
+        # a keyword that starts a statement, after skipping at least one
+        # token.
         while not self.__is_at_end():
-            if self.__previous().token_type == TokenType.SEMICOLON:
+            if self.__current_type == TokenType.SEMICOLON:
                 return
-            match self.__peek().token_type:
+            self.__advance()
+            match self.__current_type:
                 case (
                     TokenType.CLASS
                     | TokenType.FUN
@@ -76,114 +146,119 @@ class Parser:
                     | TokenType.RETURN
                 ):
                     return
-            self.__advance()
 
     def __expression(self) -> Expression:
-        # expression     → comma
-        return self.__comma()
-
-    def __comma(self) -> Expression:
-        # comma       → equality ( "," equality )* ;
-        expression = self.__equality()
-
-        while self.__match(TokenType.COMMA):
-            operator = self.__previous()
-            right = self.__comma()
-            expression = BinaryExpression(expression, operator, right)
-
-        return expression
-
-    def __equality(self) -> Expression:
+        # expression     → comma ;
+        # comma          → equality ( "," comma )? ;
         # equality       → ternary ( ( "!=" | "==" ) ternary )* ;
-        expression = self.__ternary()
-
-        while self.__match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.__previous()
-            right = self.__ternary()
-            expression = BinaryExpression(expression, operator, right)
-
-        return expression
-
-    def __ternary(self) -> Expression:
-        # ternary       → comparison ( "?" comparison ":" comparison)* ;
-        expression = self.__comparison()
-
-        while self.__match(TokenType.QUESTION_MARK):
-            true_expression = self.__comparison()
-            self.__consume(TokenType.COLON, "Expect ':' after expression.")
-            false_expression = self.__comparison()
-            expression = TernaryExpression(
-                expression, true_expression, false_expression
-            )
-
-        return expression
-
-    def __comparison(self) -> Expression:
+        # ternary        → comparison ( "?" comparison ":" comparison )* ;
         # comparison     → term ( ( ">" | ">=" | "<" | "<=" ) term )* ;
-        expression = self.__term()
-
-        while self.__match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.__previous()
-            right = self.__term()
-            expression = BinaryExpression(expression, operator, right)
-
-        return expression
-
-    def __term(self) -> Expression:
         # term           → factor ( ( "-" | "+" ) factor )* ;
-        expression = self.__factor()
-
-        while self.__match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.__previous()
-            right = self.__factor()
-            expression = BinaryExpression(expression, operator, right)
-
-        return expression
-
-    def __factor(self) -> Expression:
         # factor         → unary ( ( "/" | "*" ) unary )* ;
-        expression = self.__unary()
-
-        while self.__match(TokenType.SLASH, TokenType.STAR):
-            operator = self.__previous()
-            right = self.__unary()
-            expression = BinaryExpression(expression, operator, right)
-
-        return expression
-
-    def __unary(self) -> Expression:
         # unary          → ( "!" | "-" ) unary | primary ;
-        if self.__match(TokenType.BANG, TokenType.MINUS):
-            operator = self.__previous()
-            right = self.__unary()
-            return UnaryExpression(operator, right)
-        else:
-            return self.__primary()
+        #
+        # Precedence climbing over `INFIX_LEVELS`, with operators waiting
+        # for their right operand kept on an explicit stack rather than the
+        # call stack, so that nesting depth is only limited by memory. The
+        # tokens are consumed, and errors reported, in the same order as by
+        # a recursive descent over the grammar above.
+        factory = self.__factory
+        infix_levels = INFIX_LEVELS
+        stack: List[Tuple[int, any, any, int]] = []
+        # Only infix operators at this level or above extend the operand.
+        level = 0
+
+        while True:
+            token_type = self.__current_type
+            while token_type in Parser.__PREFIX_TOKEN_TYPES:
+                if token_type == TokenType.LEFT_PAREN:
+                    stack.append((_GROUPING, None, None, level))
+                    level = 0
+                else:
+                    stack.append((_UNARY, self.__peek(), None, level))
+                self.__advance()
+                token_type = self.__current_type
+            operand = self.__primary()
+
+            while True:
+                while stack and stack[-1][0] == _UNARY:
+                    operand = factory.unary_expression(stack.pop()[1], operand)
+
+                token_type = self.__current_type
+                token_level = infix_levels.get(token_type)
+                if token_level is not None and token_level >= level:
+                    if token_type == TokenType.QUESTION_MARK:
+                        stack.append((_TERNARY_CONDITION, operand, None, level))
+                        level = TERNARY_OPERAND_LEVEL
+                    else:
+                        stack.append((_BINARY, operand, self.__peek(), level))
+                        # The comma is right-associative.
+                        level = 0 if token_type == TokenType.COMMA else token_level + 1
+                    self.__advance()
+                    break
+
+                if not stack:
+                    return operand
+                kind, first, second, level = stack.pop()
+                if kind == _BINARY:
+                    operand = factory.binary_expression(first, second, operand)
+                elif kind == _TERNARY_CONDITION:
+                    self.__consume(TokenType.COLON, "Expect ':' after expression.")
+                    stack.append((_TERNARY_TRUE, first, operand, level))
+                    level = TERNARY_OPERAND_LEVEL
+                    break
+                elif kind == _TERNARY_TRUE:
+                    operand = factory.ternary_expression(first, second, operand)
+                else:
+                    self.__consume(
+                        TokenType.RIGHT_PAREN, "Expect ')' after expression."
+                    )
+                    operand = factory.grouping_expression(operand)
 
     def __primary(self) -> Expression:
         # primary        → NUMBER | STRING | "true" | "false" | "nil"
-        #                  | "(" expression ")" ;
-        if self.__match(TokenType.FALSE):
-            return LiteralExpression(False)
-        elif self.__match(TokenType.TRUE):
-            return LiteralExpression(True)
-        elif self.__match(TokenType.NIL):
-            return LiteralExpression(None)
-        elif self.__match(TokenType.NUMBER, TokenType.STRING):
-            return LiteralExpression(self.__previous().literal)
-        elif self.__match(TokenType.LEFT_PAREN):
-            expression = self.__expression()
-            self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return GroupingExpression(expression)
+        #                  | IDENTIFIER | "(" expression ")" ;
+        # Parentheses are handled by `__expression`.
+        token_type = self.__current_type
+        if token_type in Parser.__LITERALS:
+            self.__advance()
+            return self.__factory.literal_expression(Parser.__LITERALS[token_type])
+        elif token_type == TokenType.NUMBER or token_type == TokenType.STRING:
+            if self.__buffer is None:
+                literal = self.__current_token.literal
+            else:
+                literal = self.__buffer.literal(self.__index)
+            self.__advance()
+            return self.__factory.literal_expression(literal)
+        elif token_type == TokenType.IDENTIFIER:
+            token = self.__peek()
+            self.__advance()
+            return self.__factory.variable_expression(token)
         else:
             self.__error(self.__peek(), "Expect expression.")
 
-    def parse(self) -> Optional[Expression]:
+    def parse_program(self) -> Iterator[Tuple[Optional[Expression | int], int]]:
+        # program        → ( expression ";" )* EOF ;
+        #
+        # Yields each statement's expression, or `None` for a statement with
+        # an error, after which the parser synchronizes and carries on, with
+        # the line the statement ends on. A statement is yielded before its
+        # `;` is consumed, so that a streaming scanner has not reported the
+        # errors of the next statement yet.
+        self.__statements = True
+        while not self.__is_at_end():
+            self.__panic = False
+            expression = self.__expression()
+            if not self.__check(TokenType.SEMICOLON):
+                self.__error(self.__peek(), "Expect ';' after expression.")
+            if self.__panic:
+                self.__synchronize()
+                expression = None
+            yield expression, self.__peek_line()
+            if self.__check(TokenType.SEMICOLON):
+                self.__advance()
+
+    def parse(self) -> Optional[Expression | int]:
         try:
             return self.__expression()
         except ParseException:
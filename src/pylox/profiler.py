@@ -0,0 +1,172 @@
+import gc
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pylox.expression import Expression, ExpressionFactory
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics, Reporter, RuntimeException
+from pylox.scanner import Scanner
+
+# Part of every report. Bump it whenever a field is renamed or changes meaning,
+# so that dashboards reading the reports can tell.
+PROFILE_VERSION = 1
+
+
+class CountingFactory(ExpressionFactory):
+    # Builds nodes through `factory` and counts the nodes asked for by class.
+    # The parser already builds nodes through a factory, so profiling needs
+    # no hook in `Parser` itself and an ordinary parse pays nothing for it.
+    def __init__(self, factory: ExpressionFactory = ExpressionFactory()):
+        self.counts: Dict[str, int] = {}
+        for name in [
+            "binary_expression",
+            "grouping_expression",
+            "literal_expression",
+            "unary_expression",
+            "ternary_expression",
+            "variable_expression",
+        ]:
+            setattr(
+                self,
+                name,
+                self.__counted(
+                    getattr(ExpressionFactory, name).__name__, getattr(factory, name)
+                ),
+            )
+
+    def __counted(
+        self, name: str, build: Callable[..., Expression]
+    ) -> Callable[..., Expression]:
+        counts = self.counts
+        counts[name] = 0
+
+        def counted(*args) -> Expression:
+            counts[name] += 1
+            return build(*args)
+
+        return counted
+
+
+class Profiler:
+    # Times each phase of a run and counts what it allocates. Phases run one
+    # after another rather than interleaved as in `lox.run`, so that each
+    # gets its own figures. `allocated_blocks` is the change in the number of
+    # memory blocks the interpreter holds, so it counts what a phase keeps,
+    # such as tokens or nodes, rather than everything it allocates on the
+    # way. `gc_collections` counts the garbage collections the phase caused.
+    # The first run of a backend also imports its modules, as in `lox.run`.
+    def __init__(self):
+        self.phases: List[Dict] = []
+
+    def measure(self, name: str, function: Callable, *args) -> Any:
+        collections = sum(stats["collections"] for stats in gc.get_stats())
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases.append(
+                {
+                    "name": name,
+                    "seconds": seconds,
+                    "allocated_blocks": sys.getallocatedblocks() - blocks,
+                    "gc_collections": sum(
+                        stats["collections"] for stats in gc.get_stats()
+                    )
+                    - collections,
+                }
+            )
+
+
+def _scan(scanner_class: type, source: str, diagnostics: Diagnostics) -> List:
+    return scanner_class(source, diagnostics=diagnostics).scan_tokens()
+
+
+def _parse(tokens: List, factory: CountingFactory, diagnostics: Diagnostics):
+    return Parser(tokens, factory, diagnostics).parse()
+
+
+def profile(
+    source: str,
+    scanner_class: type = Scanner,
+    backend: Optional[Callable[[Expression], str]] = None,
+    backend_name: str = "backend",
+    optimize: bool = False,
+    max_errors: Optional[int] = None,
+    stats_path: Optional[str] = None,
+    share_nodes: bool = False,
+) -> Dict:
+    # Scans and parses `source`, then optionally optimizes the tree and runs
+    # `backend` on it, and returns a report that `json.dump` can write. The
+    # backend's result is in the report's `output`. Errors are reported
+    # through `Reporter` as for `lox.run`, and a backend is not run after
+    # them. With `stats_path`, the run is also profiled with `cProfile` and
+    # the statistics dumped there for `pstats`; the timings then include
+    # its overhead. With `share_nodes`, the tree is parsed with an
+    # `InterningFactory`, and the nodes it actually built are counted as
+    # `distinct`.
+    profiler = Profiler()
+    diagnostics = Diagnostics(max_errors)
+    output = None
+    runtime_error = None
+
+    if stats_path is not None:
+        import cProfile
+
+        function_profiler = cProfile.Profile()
+        function_profiler.enable()
+    try:
+        tokens = profiler.measure("scan", _scan, scanner_class, source, diagnostics)
+        if share_nodes:
+            from pylox.interning import InterningFactory
+
+            interning = InterningFactory()
+            factory = CountingFactory(interning)
+        else:
+            factory = CountingFactory()
+        expression = profiler.measure("parse", _parse, tokens, factory, diagnostics)
+        if not diagnostics.has_error():
+            if optimize:
+                from pylox.optimizer import Optimizer
+
+                expression = profiler.measure(
+                    "optimize", Optimizer().optimize, expression
+                )
+            if backend is not None:
+                try:
+                    output = profiler.measure(backend_name, backend, expression)
+                except RuntimeException as exception:
+                    runtime_error = exception
+    finally:
+        if stats_path is not None:
+            function_profiler.disable()
+            function_profiler.dump_stats(stats_path)
+
+    errors = len(diagnostics.diagnostics) + diagnostics.suppressed
+    Reporter.report_errors(diagnostics)
+    if runtime_error is not None:
+        Reporter.report_runtime_error(runtime_error)
+
+    node_count = sum(factory.counts.values())
+    token_counts: Dict[str, int] = {}
+    for token in tokens:
+        name = token.token_type.name
+        token_counts[name] = token_counts.get(name, 0) + 1
+    return {
+        "version": PROFILE_VERSION,
+        "source_characters": len(source),
+        "seconds": sum(phase["seconds"] for phase in profiler.phases),
+        "phases": profiler.phases,
+        "tokens": {"count": len(tokens), "by_type": token_counts},
+        "nodes": {
+            "count": node_count,
+            "distinct": interning.built if share_nodes else node_count,
+            "by_type": {name: count for name, count in factory.counts.items() if count},
+        },
+        "errors": errors,
+        "runtime_error": runtime_error is not None,
+        "cprofile": stats_path,
+        "output": output,
+    }
@@ -0,0 +1,160 @@
+import json
+from typing import Callable, List, NamedTuple, Optional, TextIO
+
+from pylox.expression import Expression, ExpressionFactory
+from pylox.parser import Parser
+from pylox.reporter import Diagnostic, Diagnostics, RuntimeException
+from pylox.scanner import Scanner
+
+
+class BufferedWriter:
+    # Collects lines and writes them `buffer_size` characters at a time, so
+    # that a program of many statements makes few `write` calls.
+    def __init__(self, output: TextIO, buffer_size: int = 1 << 16):
+        self.__output = output
+        self.__buffer_size = buffer_size
+        self.__lines: List[str] = []
+        self.__size = 0
+
+    def write_line(self, line: str) -> None:
+        self.__lines.append(line)
+        self.__size += len(line) + 1
+        if self.__size >= self.__buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.__lines:
+            self.__lines.append("")
+            self.__output.write("\n".join(self.__lines))
+            self.__lines.clear()
+            self.__size = 0
+        self.__output.flush()
+
+
+def _write_errors(
+    writer: BufferedWriter, jsonl: bool, index: int, errors: List[str]
+) -> None:
+    if jsonl:
+        record = {"index": index, "status": "error", "errors": errors}
+        writer.write_line(json.dumps(record))
+    else:
+        for error in errors:
+            writer.write_line(error)
+
+
+def _format_errors(errors: List[Diagnostic], max_errors: Optional[int]) -> List[str]:
+    # Shows at most `max_errors` of a statement's errors, as `Diagnostics`
+    # does for a whole run.
+    shown = errors if max_errors is None else errors[:max_errors]
+    lines = [error.format() for error in shown]
+    if len(shown) < len(errors):
+        lines.append(f"Too many errors, {len(errors) - len(shown)} more not shown.")
+    return lines
+
+
+class ProgramResult(NamedTuple):
+    statements: int
+    syntax_errors: int
+    runtime_errors: int
+
+
+def run_program(
+    source: str | TextIO,
+    backend: Callable[[Expression], str],
+    output: TextIO,
+    output_format: str = "text",
+    scanner_class: type = Scanner,
+    optimize: bool = False,
+    max_errors: Optional[int] = None,
+    share_nodes: bool = False,
+) -> ProgramResult:
+    # Runs every `;`-terminated expression of `source` through `backend`, in
+    # one pass over the input. A statement with an error gets its diagnostics
+    # in place of a result, and the statements after it still run. With the
+    # "jsonl" format each statement is a JSON object on its own line, with
+    # its 0-based index and a "status" of "ok", "error" or "runtime_error".
+    #
+    # `max_errors` applies to each statement. A limit on the whole run would
+    # stop the scanner once it was reached, and the statements after that
+    # point would silently not run.
+    #
+    # With `share_nodes`, repeated subexpressions of a statement are built
+    # as one shared node, for a `backend` that memoises per node. Nodes are
+    # only shared within a statement, so that the table of nodes does not
+    # grow with the program.
+    diagnostics = Diagnostics()
+    writer = BufferedWriter(output)
+    jsonl = output_format == "jsonl"
+    optimizer = None
+    if optimize:
+        from pylox.optimizer import Optimizer
+
+        optimizer = Optimizer()
+
+    statements = 0
+    syntax_errors = 0
+    runtime_errors = 0
+    if share_nodes:
+        from pylox.interning import InterningFactory
+
+        factory = InterningFactory()
+    else:
+        factory = ExpressionFactory()
+    parser = Parser(
+        scanner_class(source, diagnostics=diagnostics).iter_tokens(),
+        factory,
+        diagnostics,
+    )
+    # Errors from lines after the current statement, which a scanner that
+    # does not stream, such as the "regex" engine, reports up front. They are
+    # kept for the statements they belong to. Lines are all there is to go
+    # by, so with such a scanner an error can still be given to an earlier
+    # statement on the same line.
+    pending: List[Diagnostic] = []
+    for index, (expression, line) in enumerate(parser.parse_program()):
+        statements += 1
+        if share_nodes:
+            factory.clear()
+        pending.extend(diagnostics.drain())
+        errors = [error for error in pending if error.line <= line]
+        if len(errors) < len(pending):
+            pending = [error for error in pending if error.line > line]
+        else:
+            pending.clear()
+        if errors or expression is None:
+            syntax_errors += 1
+            _write_errors(writer, jsonl, index, _format_errors(errors, max_errors))
+            continue
+
+        if optimizer is not None:
+            expression = optimizer.optimize(expression)
+        try:
+            result = backend(expression)
+        except RuntimeException as exception:
+            runtime_errors += 1
+            line = exception.token.line
+            if jsonl:
+                record = {
+                    "index": index,
+                    "status": "runtime_error",
+                    "message": exception.message,
+                    "line": line,
+                }
+                writer.write_line(json.dumps(record))
+            else:
+                writer.write_line(f"{exception.message}\n[line {line}]")
+            continue
+        if jsonl:
+            writer.write_line(
+                json.dumps({"index": index, "status": "ok", "result": result})
+            )
+        else:
+            writer.write_line(result)
+
+    # Errors after the last statement, such as an unterminated comment.
+    errors = pending + diagnostics.drain()
+    if errors:
+        syntax_errors += 1
+        _write_errors(writer, jsonl, statements, _format_errors(errors, max_errors))
+    writer.flush()
+    return ProgramResult(statements, syntax_errors, runtime_errors)
@@ -0,0 +1,184 @@
+from typing import Iterable, Optional
+
+from pylox.expression import Expression, ExpressionFactory
+from pylox.expression_arena import ExpressionArena
+from pylox.reporter import Diagnostics, ParseException, Reporter
+from pylox.token_type import TokenType
+from pylox.tokens import Token
+
+
+class RecursiveDescentParser:
+    # The original parser, with one method per precedence level. `Parser`
+    # replaces it and must produce the same trees and errors, so it is kept
+    # as the reference for `benchmarks/parser.py`.
+    def __init__(
+        self,
+        tokens: Iterable[Token],
+        factory: ExpressionFactory | ExpressionArena = ExpressionFactory(),
+        diagnostics: Optional[Diagnostics] = None,
+    ):
+        # Tokens are pulled one at a time, so only the previous and the current
+        # token are held at any point. This lets the parser consume a lazy
+        # `Scanner.iter_tokens()` stream.
+        self.__tokens = iter(tokens)
+        self.__previous_token: Optional[Token] = None
+        self.__current_token: Token = next(self.__tokens)
+        # Nodes are built through the factory, so the same parser can produce
+        # either `Expression` objects or indices into an `ExpressionArena`.
+        self.__factory = factory
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
+
+    def __match(self, *token_types: TokenType) -> bool:
+        for token_type in token_types:
+            if self.__check(token_type):
+                self.__advance()
+                return True
+
+        return False
+
+    def __check(self, token_type: TokenType) -> bool:
+        if self.__is_at_end():
+            return False
+        return self.__peek().token_type == token_type
+
+    def __advance(self) -> None:
+        if not self.__is_at_end():
+            self.__previous_token = self.__current_token
+            self.__current_token = next(self.__tokens)
+        return self.__previous()
+
+    def __previous(self) -> Token:
+        return self.__previous_token
+
+    def __is_at_end(self) -> bool:
+        return self.__peek().token_type == TokenType.EOF
+
+    def __peek(self) -> Token:
+        return self.__current_token
+
+    def __consume(self, token_type: TokenType, message: str) -> None:
+        if self.__check(token_type):
+            return self.__advance()
+
+        return self.__error(self.__peek(), message)
+
+    def __error(self, token: Token, message: str) -> Optional[ParseException]:
+        if token.token_type == TokenType.EOF:
+            self.__diagnostics.report_error(token.line, " at end", message)
+        else:
+            self.__diagnostics.report_error(token.line, f"at '{token.lexeme}'", message)
+        return ParseException()
+
+    def __expression(self) -> Expression:
+        # expression     → comma
+        return self.__comma()
+
+    def __comma(self) -> Expression:
+        # comma       → equality ( "," equality )* ;
+        expression = self.__equality()
+
+        while self.__match(TokenType.COMMA):
+            operator = self.__previous()
+            right = self.__comma()
+            expression = self.__factory.binary_expression(expression, operator, right)
+
+        return expression
+
+    def __equality(self) -> Expression:
+        # equality       → ternary ( ( "!=" | "==" ) ternary )* ;
+        expression = self.__ternary()
+
+        while self.__match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
+            operator = self.__previous()
+            right = self.__ternary()
+            expression = self.__factory.binary_expression(expression, operator, right)
+
+        return expression
+
+    def __ternary(self) -> Expression:
+        # ternary       → comparison ( "?" comparison ":" comparison)* ;
+        expression = self.__comparison()
+
+        while self.__match(TokenType.QUESTION_MARK):
+            true_expression = self.__comparison()
+            self.__consume(TokenType.COLON, "Expect ':' after expression.")
+            false_expression = self.__comparison()
+            expression = self.__factory.ternary_expression(
+                expression, true_expression, false_expression
+            )
+
+        return expression
+
+    def __comparison(self) -> Expression:
+        # comparison     → term ( ( ">" | ">=" | "<" | "<=" ) term )* ;
+        expression = self.__term()
+
+        while self.__match(
+            TokenType.GREATER,
+            TokenType.GREATER_EQUAL,
+            TokenType.LESS,
+            TokenType.LESS_EQUAL,
+        ):
+            operator = self.__previous()
+            right = self.__term()
+            expression = self.__factory.binary_expression(expression, operator, right)
+
+        return expression
+
+    def __term(self) -> Expression:
+        # term           → factor ( ( "-" | "+" ) factor )* ;
+        expression = self.__factor()
+
+        while self.__match(TokenType.MINUS, TokenType.PLUS):
+            operator = self.__previous()
+            right = self.__factor()
+            expression = self.__factory.binary_expression(expression, operator, right)
+
+        return expression
+
+    def __factor(self) -> Expression:
+        # factor         → unary ( ( "/" | "*" ) unary )* ;
+        expression = self.__unary()
+
+        while self.__match(TokenType.SLASH, TokenType.STAR):
+            operator = self.__previous()
+            right = self.__unary()
+            expression = self.__factory.binary_expression(expression, operator, right)
+
+        return expression
+
+    def __unary(self) -> Expression:
+        # unary          → ( "!" | "-" ) unary | primary ;
+        if self.__match(TokenType.BANG, TokenType.MINUS):
+            operator = self.__previous()
+            right = self.__unary()
+            return self.__factory.unary_expression(operator, right)
+        else:
+            return self.__primary()
+
+    def __primary(self) -> Expression:
+        # primary        → NUMBER | STRING | "true" | "false" | "nil"
+        #                  | IDENTIFIER | "(" expression ")" ;
+        if self.__match(TokenType.FALSE):
+            return self.__factory.literal_expression(False)
+        elif self.__match(TokenType.TRUE):
+            return self.__factory.literal_expression(True)
+        elif self.__match(TokenType.NIL):
+            return self.__factory.literal_expression(None)
+        elif self.__match(TokenType.NUMBER, TokenType.STRING):
+            return self.__factory.literal_expression(self.__previous().literal)
+        elif self.__match(TokenType.IDENTIFIER):
+            return self.__factory.variable_expression(self.__previous())
+        elif self.__match(TokenType.LEFT_PAREN):
+            expression = self.__expression()
+            self.__consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return self.__factory.grouping_expression(expression)
+        else:
+            self.__error(self.__peek(), "Expect expression.")
+
+    def parse(self) -> Optional[Expression | int]:
+        try:
+            return self.__expression()
+        except ParseException:
+            return None
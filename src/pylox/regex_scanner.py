@@ -0,0 +1,196 @@
+import re
+from typing import Any, Callable, Iterator, List, Optional, TextIO
+
+from pylox.reporter import Diagnostics, Reporter
+from pylox.token_buffer import TokenBuffer
+from pylox.tokens import Token
+from pylox.token_type import RESERVED_KEYWORDS, TokenType
+
+
+class RegexScanner:
+    # Recognises whole lexemes with a single compiled pattern instead of walking
+    # the source one character at a time. The token list and the reported
+    # errors are identical to those produced by `Scanner`.
+    __TOKEN_PATTERN = re.compile(
+        r"""
+        (?P<whitespace>[ \t\r]+)
+        | (?P<newline>\n+)
+        | (?P<number>\d+(?:\.\d+)?)
+        | (?P<identifier>[A-Za-z][^\W_]*)
+        | (?P<operator>[!=<>]=?|[(){},.\-+;*?:])
+        | (?P<line_comment>//[^\n]*)
+        | (?P<block_comment>/\*)
+        | (?P<slash>/)
+        | (?P<string>"[^"]*")
+        | (?P<unterminated_string>"[^"]*)
+        | (?P<other>.)
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+    __COMMENT_DELIMITER_PATTERN = re.compile(r"/\*|\*/")
+    __IDENTIFIER_TAIL_PATTERN = re.compile(r"[^\W_]*")
+
+    __OPERATORS = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.STAR,
+        "?": TokenType.QUESTION_MARK,
+        ":": TokenType.COLON,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL,
+        "/": TokenType.SLASH,
+    }
+
+    def __init__(self, source: str | TextIO, diagnostics: Optional[Diagnostics] = None):
+        # The master pattern needs the whole source, so a file object is read
+        # up front rather than chunk by chunk.
+        self.__source = source if isinstance(source, str) else source.read()
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
+        self.__line = 1
+
+    def __error(self, start: int, where: str, message: str) -> bool:
+        # Columns are only needed for errors, so they are worked out here
+        # rather than tracked while scanning. Returns whether to stop.
+        column = start - self.__source.rfind("\n", 0, start)
+        self.__diagnostics.report_error(self.__line, where, message, column)
+        return self.__diagnostics.is_full()
+
+    def __match_block_comment(self, start: int) -> int:
+        # Newlines inside block comments are not counted, as in `Scanner`.
+        comment_blocks = 1
+        for delimiter in RegexScanner.__COMMENT_DELIMITER_PATTERN.finditer(
+            self.__source, start + 2
+        ):
+            comment_blocks += 1 if delimiter.group() == "/*" else -1
+            if comment_blocks == 0:
+                return delimiter.end()
+
+        self.__error(start, "", "Unterminated comment.")
+        return len(self.__source)
+
+    def __match_other(
+        self, start: int, add_token: Callable[[TokenType, int, int, Any, int], None]
+    ) -> int:
+        # Slow path for characters outside of the ASCII lexeme classes. This
+        # mirrors the `str.isdigit` and `str.isalpha` checks in `Scanner`.
+        source = self.__source
+        token = source[start]
+        current = start + 1
+
+        if token.isdigit():
+            while current < len(source) and source[current].isdigit():
+                current += 1
+            if (
+                current + 1 < len(source)
+                and source[current] == "."
+                and source[current + 1].isdigit()
+            ):
+                current += 1
+                while current < len(source) and source[current].isdigit():
+                    current += 1
+            literal = float(source[start:current])
+            add_token(TokenType.NUMBER, start, current, literal, self.__line)
+        elif token.isalpha():
+            current = RegexScanner.__IDENTIFIER_TAIL_PATTERN.match(
+                source, current
+            ).end()
+            token_type = RESERVED_KEYWORDS.get(
+                source[start:current], TokenType.IDENTIFIER
+            )
+            add_token(token_type, start, current, None, self.__line)
+        elif self.__error(start, token, "Unexpected character."):
+            return len(source)
+
+        return current
+
+    def __scan(
+        self,
+        add_token: Callable[[TokenType, int, int, Any, int], None],
+        current: int = 0,
+    ):
+        # Calls `add_token(token_type, start, end, literal, line)` for every
+        # token, so that the same loop can fill either representation.
+        source = self.__source
+        operators = RegexScanner.__OPERATORS
+        match_token = RegexScanner.__TOKEN_PATTERN.match
+
+        end = len(source)
+        while current < end:
+            match = match_token(source, current)
+            kind = match.lastgroup
+            start = current
+            current = match.end()
+
+            if kind == "whitespace" or kind == "line_comment":
+                continue
+            elif kind == "newline":
+                self.__line += current - start
+            elif kind == "operator" or kind == "slash":
+                add_token(operators[match.group()], start, current, None, self.__line)
+            elif kind == "number":
+                literal = float(match.group())
+                add_token(TokenType.NUMBER, start, current, literal, self.__line)
+            elif kind == "identifier":
+                token_type = RESERVED_KEYWORDS.get(match.group(), TokenType.IDENTIFIER)
+                add_token(token_type, start, current, None, self.__line)
+            elif kind == "string":
+                self.__line += source.count("\n", start, current)
+                literal = source[start + 1 : current - 1]
+                add_token(TokenType.STRING, start, current, literal, self.__line)
+            elif kind == "unterminated_string":
+                self.__line += source.count("\n", start, current)
+                self.__error(start, match.group(), "Unterminated string.")
+                add_token(TokenType.STRING, start, current, None, self.__line)
+            elif kind == "block_comment":
+                current = self.__match_block_comment(start)
+            else:
+                current = self.__match_other(start, add_token)
+
+        add_token(TokenType.EOF, end, end, None, self.__line)
+
+    def scan_range(
+        self,
+        start: int,
+        line: int,
+        add_token: Callable[[TokenType, int, int, Any, int], None],
+    ) -> None:
+        # Scans from `start`, which must be where a token begins, with the
+        # scanner on `line`. `add_token` is called as in `__scan` and may
+        # raise to stop the scan early.
+        self.__line = line
+        self.__scan(add_token, start)
+
+    def iter_tokens(self) -> Iterator[Token]:
+        return iter(self.scan_tokens())
+
+    def scan_tokens(self) -> List[Token]:
+        source = self.__source
+        tokens: List[Token] = []
+
+        def add_token(
+            token_type: TokenType, start: int, end: int, literal: Any, line: int
+        ) -> None:
+            tokens.append(Token(token_type, source[start:end], literal, line))
+
+        self.__scan(add_token)
+        return tokens
+
+    def scan_token_buffer(self) -> TokenBuffer:
+        # Same tokens as `scan_tokens`, in the compact `TokenBuffer` layout.
+        tokens = TokenBuffer(self.__source)
+        self.__scan(tokens.append)
+        return tokens
@@ -1,23 +1,175 @@
+import _thread
+import sys
+from typing import List, NamedTuple, Optional, TextIO
+
+from pylox.tokens import Token
+
+
 class ParseException(Exception):
     def __init__(self):
         super().__init__()
 
 
+class RuntimeException(Exception):
+    def __init__(self, token: Token, message: str):
+        super().__init__(message)
+        self.token = token
+        self.message = message
+
+
+class Diagnostic(NamedTuple):
+    # `column` is 1-based and counts from the last newline character. It is
+    # `None` for parser errors, since tokens only record their line. A
+    # `NamedTuple` rather than a frozen dataclass keeps `dataclasses` out of
+    # start-up.
+    line: int
+    column: Optional[int]
+    where: str
+    message: str
+
+    def format(self) -> str:
+        if len(self.where) > 0:
+            return f"[line {self.line}] Error {self.where}: {self.message}"
+        return f"[line {self.line}] Error: {self.message}"
+
+
+class Diagnostics:
+    # Collects the errors of a single run, so that runs in different threads
+    # do not share state through `Reporter`. Errors are buffered and written
+    # in one go by `flush`. A run of "Unexpected character." errors on
+    # adjacent characters is merged into a single error, and once
+    # `max_errors` errors are held further errors are only counted, and
+    # `is_full` tells the scanners to stop.
+    UNEXPECTED_CHARACTER = "Unexpected character."
+    UNEXPECTED_CHARACTERS = "Unexpected characters."
+
+    def __init__(self, max_errors: Optional[int] = None):
+        self.__max_errors = max_errors
+        self.__diagnostics: List[Diagnostic] = []
+        self.__error_count = 0
+        self.__suppressed = 0
+        # `threading.Lock` is this function. Importing `threading` for it would
+        # add to start-up.
+        self.__lock = _thread.allocate_lock()
+
+    def report_error(
+        self, line: int, where: str, message: str, column: Optional[int] = None
+    ) -> None:
+        with self.__lock:
+            diagnostics = self.__diagnostics
+            if message == Diagnostics.UNEXPECTED_CHARACTER and diagnostics:
+                last = diagnostics[-1]
+                if (
+                    last.line == line
+                    and last.column is not None
+                    and column == last.column + len(last.where)
+                    and last.message
+                    in (
+                        Diagnostics.UNEXPECTED_CHARACTER,
+                        Diagnostics.UNEXPECTED_CHARACTERS,
+                    )
+                ):
+                    diagnostics[-1] = Diagnostic(
+                        line,
+                        last.column,
+                        last.where + where,
+                        Diagnostics.UNEXPECTED_CHARACTERS,
+                    )
+                    return
+
+            if self.is_full():
+                self.__suppressed += 1
+                return
+            diagnostics.append(Diagnostic(line, column, where, message))
+            self.__error_count += 1
+
+    def is_full(self) -> bool:
+        return self.__max_errors is not None and self.__error_count >= self.__max_errors
+
+    def has_error(self) -> bool:
+        return self.__error_count > 0
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        with self.__lock:
+            return list(self.__diagnostics)
+
+    @property
+    def suppressed(self) -> int:
+        return self.__suppressed
+
+    def __format(self) -> List[str]:
+        lines = [diagnostic.format() for diagnostic in self.__diagnostics]
+        if self.__suppressed > 0:
+            lines.append(f"Too many errors, {self.__suppressed} more not shown.")
+        return lines
+
+    def format(self) -> List[str]:
+        with self.__lock:
+            return self.__format()
+
+    def flush(self, output: Optional[TextIO] = None) -> None:
+        # Writes the buffered errors with a single `write` call and empties
+        # the buffer. `has_error` and `is_full` are unaffected until `reset`.
+        with self.__lock:
+            lines = self.__format()
+            self.__diagnostics.clear()
+            self.__suppressed = 0
+        if lines:
+            (sys.stdout if output is None else output).write("\n".join(lines) + "\n")
+
+    def drain(self) -> List[Diagnostic]:
+        # Returns the buffered errors and empties the buffer, as `flush` does,
+        # for callers that format the errors themselves.
+        with self.__lock:
+            diagnostics = self.__diagnostics
+            self.__diagnostics = []
+        return diagnostics
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__diagnostics.clear()
+            self.__error_count = 0
+            self.__suppressed = 0
+
+
 class Reporter:
     __has_error = False
+    __has_runtime_error = False
 
     @staticmethod
-    def report_error(line: int, where: str, message: str) -> str:
+    def report_error(
+        line: int, where: str, message: str, column: Optional[int] = None
+    ) -> str:
         Reporter.__has_error = True
-        if len(where) > 0:
-            print(f"[line {line}] Error {where}: {message}")
-        else:
-            print(f"[line {line}] Error: {message}")
+        print(Diagnostic(line, column, where, message).format())
+
+    @staticmethod
+    def report_errors(diagnostics: Diagnostics) -> None:
+        # Prints the errors buffered by a run and records that there were any.
+        if diagnostics.has_error():
+            Reporter.__has_error = True
+            diagnostics.flush()
+
+    @staticmethod
+    def is_full() -> bool:
+        # `Reporter` can stand in for `Diagnostics` and never stops a scan.
+        return False
+
+    @staticmethod
+    def report_runtime_error(exception: RuntimeException) -> None:
+        Reporter.__has_runtime_error = True
+        print(f"{exception.message}\n[line {exception.token.line}]")
 
     @staticmethod
     def has_error() -> bool:
         return Reporter.__has_error
 
+    @staticmethod
+    def has_runtime_error() -> bool:
+        return Reporter.__has_runtime_error
+
     @staticmethod
     def reset_error() -> None:
         Reporter.__has_error = False
+        Reporter.__has_runtime_error = False
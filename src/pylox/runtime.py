@@ -0,0 +1,142 @@
+from typing import Dict
+
+from pylox.reporter import RuntimeException
+from pylox.token_type import TokenType
+from pylox.tokens import Token
+
+
+def is_truthy(value: any) -> bool:
+    # `nil` and `false` are falsey, everything else is truthy.
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    return True
+
+
+def is_equal(left: any, right: any) -> bool:
+    # Values of different types are never equal, so `1 == true` is false even
+    # though Python considers `1.0 == True`.
+    return type(left) is type(right) and left == right
+
+
+def stringify(value: any) -> str:
+    if value is None:
+        return "nil"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        text = str(value)
+        return text[:-2] if text.endswith(".0") else text
+    return str(value)
+
+
+def check_number_operand(operator: Token, operand: any) -> None:
+    if type(operand) is not float:
+        raise RuntimeException(operator, "Operand must be a number.")
+
+
+def check_number_operands(operator: Token, left: any, right: any) -> None:
+    if type(left) is not float or type(right) is not float:
+        raise RuntimeException(operator, "Operands must be numbers.")
+
+
+def look_up(variables: Dict[str, any], name: Token) -> any:
+    try:
+        return variables[name.lexeme]
+    except KeyError:
+        raise RuntimeException(name, f"Undefined variable '{name.lexeme}'.") from None
+
+
+def negate(operator: Token, right: any) -> any:
+    check_number_operand(operator, right)
+    return -right
+
+
+def logical_not(operator: Token, right: any) -> any:
+    return not is_truthy(right)
+
+
+def comma(operator: Token, left: any, right: any) -> any:
+    return right
+
+
+def not_equal(operator: Token, left: any, right: any) -> any:
+    return not is_equal(left, right)
+
+
+def equal(operator: Token, left: any, right: any) -> any:
+    return is_equal(left, right)
+
+
+def add(operator: Token, left: any, right: any) -> any:
+    if (type(left) is float and type(right) is float) or (
+        type(left) is str and type(right) is str
+    ):
+        return left + right
+    raise RuntimeException(operator, "Operands must be two numbers or two strings.")
+
+
+def greater(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left > right
+
+
+def greater_equal(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left >= right
+
+
+def less(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left < right
+
+
+def less_equal(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left <= right
+
+
+def subtract(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left - right
+
+
+def multiply(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    return left * right
+
+
+def divide(operator: Token, left: any, right: any) -> any:
+    check_number_operands(operator, left, right)
+    if right == 0:
+        raise RuntimeException(operator, "Division by zero.")
+    return left / right
+
+
+UNARY_OPERATIONS = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: logical_not,
+}
+
+BINARY_OPERATIONS = {
+    TokenType.COMMA: comma,
+    TokenType.BANG_EQUAL: not_equal,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.PLUS: add,
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: divide,
+}
+
+
+def unary(operator: Token, right: any) -> any:
+    return UNARY_OPERATIONS[operator.token_type](operator, right)
+
+
+def binary(operator: Token, left: any, right: any) -> any:
+    return BINARY_OPERATIONS[operator.token_type](operator, left, right)
@@ -1,52 +1,85 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, TextIO
 
-from pylox.reporter import Reporter
+from pylox.reporter import Diagnostics, Reporter
 from pylox.tokens import Token
-from pylox.token_type import TokenType
+from pylox.token_type import RESERVED_KEYWORDS, TokenType
 
 
 class Scanner:
-    __RESERVED_KEYWORDS = {
-        "and": TokenType.AND,
-        "class": TokenType.CLASS,
-        "else": TokenType.ELSE,
-        "false": TokenType.FALSE,
-        "fun": TokenType.FUN,
-        "for": TokenType.FOR,
-        "if": TokenType.IF,
-        "nil": TokenType.NIL,
-        "or": TokenType.OR,
-        "print": TokenType.PRINT,
-        "return": TokenType.RETURN,
-        "super": TokenType.SUPER,
-        "this": TokenType.THIS,
-        "true": TokenType.TRUE,
-        "var": TokenType.VAR,
-        "while": TokenType.WHILE,
-    }
-
-    def __init__(self, source: str):
-        self.__source = source
+    def __init__(
+        self,
+        source: str | TextIO,
+        chunk_size: int = 1 << 16,
+        diagnostics: Optional[Diagnostics] = None,
+    ):
+        # A file object is read lazily, `chunk_size` characters at a time, and
+        # only the characters of the lexeme being scanned are kept around.
+        if isinstance(source, str):
+            self.__source = source
+            self.__reader = None
+        else:
+            self.__source = ""
+            self.__reader = source
+        self.__chunk_size = chunk_size
+        # Errors go to the global `Reporter` unless a sink is given.
+        self.__diagnostics = Reporter if diagnostics is None else diagnostics
 
         self.__start = 0
         self.__current = 0
         self.__line = 1
+        # Where the current line starts in `__source`, for error columns.
+        self.__line_start = 0
 
         self.__tokens: List[Token] = []
 
     def __advance(self, step: int = 1) -> None:
         self.__current += step
 
+    def __fill(self, position: int) -> bool:
+        # Reads chunks until `position` is buffered or the reader is exhausted.
+        # Each read is at least as long as what is already buffered, so that
+        # a lexeme longer than a chunk, which keeps `__discard_consumed` from
+        # dropping anything, doubles the buffer rather than growing it by a
+        # chunk: every refill copies the buffer, and this keeps the copying
+        # linear in the length of the input.
+        while self.__reader is not None and position >= len(self.__source):
+            chunk = self.__reader.read(max(self.__chunk_size, len(self.__source)))
+            if len(chunk) == 0:
+                self.__reader = None
+                break
+            self.__source += chunk
+
+        return position < len(self.__source)
+
+    def __discard_consumed(self) -> None:
+        # Drops the characters of lexemes that have already been emitted.
+        if self.__reader is not None and self.__current >= self.__chunk_size:
+            self.__source = self.__source[self.__current :]
+            self.__line_start -= self.__current
+            self.__current = 0
+
     def __is_at_end(self) -> bool:
-        return self.__current >= len(self.__source)
+        return self.__current >= len(self.__source) and not self.__fill(self.__current)
 
     def __peek(self, lookahead: int = 0) -> Optional[str]:
         # Performs lookahead but does not consume the character.
-        if self.__current + lookahead < len(self.__source):
+        if self.__current + lookahead < len(self.__source) or self.__fill(
+            self.__current + lookahead
+        ):
             return self.__source[self.__current + lookahead]
 
         return None
 
+    def __column(self) -> int:
+        return self.__start - self.__line_start + 1
+
+    def __error(self, column: int, where: str, message: str) -> None:
+        self.__diagnostics.report_error(self.__line, where, message, column)
+        if self.__diagnostics.is_full():
+            # Stop scanning by treating the rest of the input as missing.
+            self.__source = self.__source[: self.__current]
+            self.__reader = None
+
     def __add_token(self, token_type: TokenType, literal: str = None) -> None:
         lexeme = self.__source[self.__start : self.__current]
         self.__tokens.append(Token(token_type, lexeme, literal, self.__line))
@@ -59,15 +92,15 @@ class Scanner:
         return False
 
     def __match_string(self) -> str:
+        column = self.__column()
         while (not self.__is_at_end()) and self.__peek() != '"':
             if self.__peek() == "\n":
                 self.__line += 1
+                self.__line_start = self.__current + 1
             self.__advance()
 
         if self.__is_at_end():
-            Reporter.report_error(
-                self.__line, self.__source[self.__start :], "Unterminated string."
-            )
+            self.__error(column, self.__source[self.__start :], "Unterminated string.")
             return
 
         # Consume the string terminating symbol.
@@ -104,10 +137,11 @@ class Scanner:
                 self.__advance()
         elif self.__match("*"):
             # Match multi-line `/* */` comments.
+            column = self.__column()
             comment_blocks = 1
             while comment_blocks > 0:
                 if self.__is_at_end():
-                    Reporter.report_error(self.__line, "", "Unterminated comment.")
+                    self.__error(column, "", "Unterminated comment.")
                     return
                 if self.__peek() == "/" and self.__peek(1) == "*":
                     comment_blocks += 1
@@ -116,6 +150,10 @@ class Scanner:
                     comment_blocks -= 1
                     self.__advance(2)
                 else:
+                    # Newlines in comments are not counted as lines, but they
+                    # still start a new column.
+                    if self.__peek() == "\n":
+                        self.__line_start = self.__current + 1
                     self.__advance()
 
     def __scan_token(self) -> None:
@@ -174,19 +212,35 @@ class Scanner:
                 return
             case "\n":
                 self.__line += 1
+                self.__line_start = self.__current
                 return
             case _:
                 if token.isdigit():
                     self.__add_token(TokenType.NUMBER, self.__match_number())
                 elif token.isalpha():
                     lexeme = self.__match_identifier()
-                    token_type = Scanner.__RESERVED_KEYWORDS.get(lexeme)
+                    token_type = RESERVED_KEYWORDS.get(lexeme)
                     if token_type is None:
                         self.__add_token(TokenType.IDENTIFIER)
                     else:
                         self.__add_token(token_type)
                 else:
-                    Reporter.report_error(self.__line, token, "Unexpected character.")
+                    self.__error(self.__column(), token, "Unexpected character.")
+
+    def iter_tokens(self) -> Iterator[Token]:
+        # Yields tokens as soon as they are scanned, so that a consumer such as
+        # the `Parser` can run interleaved with the scanner.
+        while not self.__is_at_end():
+            self.__discard_consumed()
+            # Indicates the beginning of the next lexeme.
+            self.__start = self.__current
+            self.__scan_token()
+
+            if len(self.__tokens) > 0:
+                yield from self.__tokens
+                self.__tokens.clear()
+
+        yield Token(TokenType.EOF, "", None, self.__line)
 
     def scan_tokens(self) -> List[Token]:
         while not self.__is_at_end():
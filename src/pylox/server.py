@@ -0,0 +1,442 @@
+from argparse import ArgumentParser
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from io import StringIO
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pylox import __version__
+from pylox.ast_printer import StreamingAstPrinter
+from pylox.incremental import Document
+from pylox.reporter import Diagnostic
+
+
+# LSP `TextDocumentSyncKind.Incremental`.
+_INCREMENTAL_SYNC = 2
+
+# JSON-RPC error codes.
+_PARSE_ERROR = -32700
+_INVALID_REQUEST = -32600
+_METHOD_NOT_FOUND = -32601
+_INVALID_PARAMS = -32602
+_INTERNAL_ERROR = -32603
+
+
+class _InvalidParams(Exception):
+    pass
+
+
+class _OpenDocument:
+    # What the server holds for a document the client has open. `changes`
+    # and `publish` belong to the event loop. `document` is only touched by
+    # jobs on the server's executor, which runs one job at a time in the
+    # order the jobs were submitted.
+    def __init__(self, text: str, version: int):
+        self.version = version
+        self.changes: List[Dict[str, Any]] = [{"text": text}]
+        # The debounced `publishDiagnostics`, while it is still waiting.
+        self.publish: Optional[asyncio.Task] = None
+        self.document: Optional[Document] = None
+
+
+def _offset(source: str, position: Dict[str, int]) -> int:
+    # LSP positions count UTF-16 code units within a line. They are taken as
+    # characters here, which is the same for text in the Basic Multilingual
+    # Plane.
+    offset = 0
+    for _ in range(position["line"]):
+        offset = source.find("\n", offset) + 1
+        if offset == 0:
+            return len(source)
+    return min(offset + position["character"], len(source))
+
+
+def _is_position(position: Any) -> bool:
+    return (
+        isinstance(position, dict)
+        and isinstance(position.get("line"), int)
+        and isinstance(position.get("character"), int)
+    )
+
+
+def _is_change(change: Any) -> bool:
+    # A change replaces the whole text, or a `range` with `start` and `end`.
+    if not isinstance(change, dict) or not isinstance(change.get("text"), str):
+        return False
+    if "range" not in change:
+        return True
+    span = change["range"]
+    return (
+        isinstance(span, dict)
+        and _is_position(span.get("start"))
+        and _is_position(span.get("end"))
+    )
+
+
+def _text_document(params: Any) -> Dict[str, Any]:
+    # The `textDocument` that every method but `initialize` takes, checked
+    # before anything is changed.
+    text_document = params.get("textDocument") if isinstance(params, dict) else None
+    if not isinstance(text_document, dict) or not isinstance(
+        text_document.get("uri"), str
+    ):
+        raise _InvalidParams("Missing textDocument.uri")
+    return text_document
+
+
+def _apply_changes(state: _OpenDocument, changes: List[Dict[str, Any]]) -> None:
+    # Runs on the executor. A change without a range replaces the whole text.
+    for change in changes:
+        if "range" not in change or state.document is None:
+            state.document = Document(change["text"])
+        else:
+            source = state.document.source
+            start = _offset(source, change["range"]["start"])
+            end = _offset(source, change["range"]["end"])
+            state.document.edit(start, end - start, change["text"])
+
+
+def _to_lsp(diagnostic: Diagnostic) -> Dict[str, Any]:
+    # Parser errors have no column, so they cover the start of their line.
+    line = diagnostic.line - 1
+    if diagnostic.column is None:
+        start = end = 0
+    else:
+        start = diagnostic.column - 1
+        end = start + len(diagnostic.where)
+    return {
+        "range": {
+            "start": {"line": line, "character": start},
+            "end": {"line": line, "character": end},
+        },
+        "severity": 1,
+        "source": "pylox",
+        "message": diagnostic.format(),
+    }
+
+
+def _diagnostics(
+    state: _OpenDocument, changes: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    _apply_changes(state, changes)
+    return [_to_lsp(diagnostic) for diagnostic in state.document.diagnostics]
+
+
+def _hover(
+    state: _OpenDocument, changes: List[Dict[str, Any]], position: Dict[str, int]
+) -> Optional[str]:
+    # The innermost node at `position`. A tree with errors has missing
+    # operands, so there is nothing to show.
+    _apply_changes(state, changes)
+    document = state.document
+    node = document.node_at(_offset(document.source, position))
+    if node is None:
+        return None
+    output = StringIO()
+    StreamingAstPrinter(output).print(node)
+    return output.getvalue()
+
+
+class LanguageServer:
+    # A long-lived JSON-RPC server speaking the subset of the Language Server
+    # Protocol needed to check Lox: open documents stay parsed in memory and
+    # are updated incrementally on every change, diagnostics are published
+    # `debounce` seconds after the last change, and hover shows the
+    # `AstPrinter` form of the innermost expression under the cursor.
+    #
+    # Scanning and parsing run on `executor` so that the event loop keeps
+    # reading messages meanwhile. The executor must run jobs one at a time, in
+    # order, as a single worker thread does: the documents are not locked.
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        executor: Optional[Executor] = None,
+        debounce: float = 0.05,
+    ):
+        self.__reader = reader
+        self.__writer = writer
+        self.__owns_executor = executor is None
+        self.__executor = (
+            ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        )
+        self.__debounce = debounce
+        self.__documents: Dict[str, _OpenDocument] = {}
+        self.__tasks: Set[asyncio.Task] = set()
+        self.__shutdown = False
+
+        self.__requests: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self.__initialize,
+            "shutdown": self.__shutdown_request,
+            "textDocument/hover": self.__hover,
+        }
+        self.__notifications: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "initialized": lambda params: None,
+            "textDocument/didOpen": self.__did_open,
+            "textDocument/didChange": self.__did_change,
+            "textDocument/didClose": self.__did_close,
+        }
+
+    async def serve(self) -> int:
+        # Handles messages until `exit` or the end of the input, and returns
+        # the exit code: 0 if the client asked to shut down first.
+        try:
+            while True:
+                message = await self.__read()
+                if message is None:
+                    break
+                if not isinstance(message, dict):
+                    # Batches are not supported.
+                    error = self.__error(_INVALID_REQUEST, "Invalid Request")
+                    self.__send({"id": None, "error": error})
+                    continue
+                if message.get("method") == "exit":
+                    break
+                self.__dispatch(message)
+        finally:
+            for task in list(self.__tasks):
+                task.cancel()
+            if self.__owns_executor:
+                self.__executor.shutdown()
+        return 0 if self.__shutdown else 1
+
+    async def __read(self) -> Optional[Dict[str, Any]]:
+        # Messages are framed by a `Content-Length` header, as in LSP. Only the
+        # end of the input ends the session. Header lines that cannot be read
+        # are skipped, and a frame without a usable `Content-Length` is
+        # answered with a parse error, after which reading carries on with
+        # the next lines until a frame can be read again.
+        reader = self.__reader
+        while True:
+            headers = {}
+            has_header = False
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the reader's limit.
+                    continue
+                if len(line) == 0:
+                    return None
+                line = line.strip()
+                # The body of a skipped frame runs into the header line of the
+                # next one, which has no newline of its own.
+                start = line.lower().rfind(b"content-length:")
+                if start > 0:
+                    line = line[start:]
+                if len(line) == 0:
+                    if has_header:
+                        break
+                    # Blank lines between frames are skipped.
+                    continue
+                has_header = True
+                name, separator, value = line.partition(b":")
+                if separator:
+                    headers[name.strip().lower()] = value.strip()
+
+            length = headers.get(b"content-length", b"")
+            if not length.isdigit():
+                self.__send(
+                    {"id": None, "error": self.__error(_PARSE_ERROR, "Parse error")}
+                )
+                continue
+            try:
+                body = await reader.readexactly(int(length))
+            except asyncio.IncompleteReadError:
+                return None
+            try:
+                return json.loads(body)
+            except ValueError:
+                self.__send(
+                    {"id": None, "error": self.__error(_PARSE_ERROR, "Parse error")}
+                )
+                return {}
+
+    def __send(self, message: Dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        self.__writer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    @staticmethod
+    def __error(code: int, message: str) -> Dict[str, Any]:
+        return {"code": code, "message": message}
+
+    @staticmethod
+    def __log(message: str) -> None:
+        # Standard output carries the protocol, so problems that cannot be
+        # answered go to standard error.
+        print(f"pylox.server: {message}", file=sys.stderr)
+
+    def __spawn(self, coroutine) -> asyncio.Task:
+        # Keeps a reference to the task until it is done.
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
+
+    def __dispatch(self, message: Dict[str, Any]) -> None:
+        method = message.get("method")
+        if not isinstance(method, str):
+            method = None
+        params = message.get("params") or {}
+        if "id" not in message:
+            # Notifications are handled straight away, so that changes are
+            # recorded in the order they arrive. They cannot be answered, so a
+            # notification that fails is logged and dropped.
+            handler = self.__notifications.get(method)
+            if handler is not None:
+                try:
+                    handler(params)
+                except _InvalidParams as exception:
+                    self.__log(f"ignored {method}: {exception}")
+                except Exception as exception:
+                    self.__log(f"{method} failed: {exception!r}")
+            return
+
+        handler = self.__requests.get(method)
+        if handler is None:
+            code = _INVALID_REQUEST if method is None else _METHOD_NOT_FOUND
+            error = self.__error(code, f"Unsupported method: {method}")
+            self.__send({"id": message["id"], "error": error})
+        else:
+            self.__spawn(self.__respond(message["id"], handler, params))
+
+    async def __respond(self, id: Any, handler: Callable, params: Dict[str, Any]):
+        try:
+            result = handler(params)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except _InvalidParams as exception:
+            error = self.__error(_INVALID_PARAMS, str(exception))
+            self.__send({"id": id, "error": error})
+        except Exception as exception:
+            error = self.__error(_INTERNAL_ERROR, str(exception))
+            self.__send({"id": id, "error": error})
+        else:
+            self.__send({"id": id, "result": result})
+        await self.__writer.drain()
+
+    def __run(self, state: _OpenDocument, job: Callable) -> asyncio.Future:
+        # Hands the changes received so far to a job on the executor.
+        changes, state.changes = state.changes, []
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.__executor, job, state, changes)
+
+    def __initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": _INCREMENTAL_SYNC},
+                "hoverProvider": True,
+            },
+            "serverInfo": {"name": "pylox", "version": __version__},
+        }
+
+    def __shutdown_request(self, params: Dict[str, Any]) -> None:
+        self.__shutdown = True
+
+    def __did_open(self, params: Dict[str, Any]) -> None:
+        text_document = _text_document(params)
+        if not isinstance(text_document.get("text"), str):
+            raise _InvalidParams("Missing textDocument.text")
+        state = _OpenDocument(text_document["text"], text_document.get("version", 0))
+        self.__documents[text_document["uri"]] = state
+        self.__schedule_publish(text_document["uri"], state)
+
+    def __did_change(self, params: Dict[str, Any]) -> None:
+        text_document = _text_document(params)
+        changes = params.get("contentChanges")
+        # Checked as a whole, so that a bad change leaves the document as it
+        # was rather than half edited.
+        if not isinstance(changes, list) or not all(map(_is_change, changes)):
+            raise _InvalidParams("Malformed contentChanges")
+        state = self.__documents.get(text_document["uri"])
+        if state is None:
+            return
+        state.version = text_document.get("version", state.version)
+        for change in changes:
+            if "range" not in change:
+                # Earlier changes are overwritten by the whole text.
+                state.changes.clear()
+            state.changes.append(change)
+        self.__schedule_publish(text_document["uri"], state)
+
+    def __did_close(self, params: Dict[str, Any]) -> None:
+        uri = _text_document(params)["uri"]
+        state = self.__documents.pop(uri, None)
+        if state is not None and state.publish is not None:
+            state.publish.cancel()
+        self.__send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "diagnostics": []},
+            }
+        )
+
+    def __schedule_publish(self, uri: str, state: _OpenDocument) -> None:
+        # Restarts the wait, so diagnostics follow a burst of changes once.
+        if state.publish is not None:
+            state.publish.cancel()
+        state.publish = self.__spawn(self.__publish_later(uri, state))
+
+    async def __publish_later(self, uri: str, state: _OpenDocument) -> None:
+        await asyncio.sleep(self.__debounce)
+        # Past this point the job must not be cancelled, or the changes it took
+        # would be lost.
+        state.publish = None
+        version = state.version
+        try:
+            diagnostics = await self.__run(state, _diagnostics)
+        except Exception as exception:
+            self.__log(f"checking {uri} failed: {exception!r}")
+            return
+        if self.__documents.get(uri) is not state:
+            return
+        self.__send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "version": version, "diagnostics": diagnostics},
+            }
+        )
+        await self.__writer.drain()
+
+    async def __hover(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        state = self.__documents.get(_text_document(params)["uri"])
+        position = params.get("position")
+        if not _is_position(position):
+            raise _InvalidParams("Missing position")
+        if state is None:
+            return None
+        text = await self.__run(
+            state, lambda state, changes: _hover(state, changes, position)
+        )
+        if text is None:
+            return None
+        return {"contents": {"kind": "plaintext", "value": text}}
+
+
+async def serve_stdio(debounce: float = 0.05) -> int:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+    )
+    transport, protocol = await loop.connect_write_pipe(
+        asyncio.streams.FlowControlMixin, sys.stdout
+    )
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return await LanguageServer(reader, writer, debounce=debounce).serve()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        prog="pylox.server", description="A Lox language server over stdio"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=50,
+        metavar="MS",
+        help="milliseconds to wait after a change before publishing diagnostics",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(serve_stdio(args.debounce / 1000)))
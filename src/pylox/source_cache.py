@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import sys
+from typing import Optional, Tuple
+
+from pylox.expression import Expression
+from pylox.node_counter import NodeCounter
+
+
+class SourceCache:
+    # An LRU cache from source text to the AST it parses to, bounded both by
+    # the number of entries and by their approximate size in bytes. Only
+    # successful parses are stored, so a source with errors is always parsed
+    # again and its errors reported each time. ASTs are shared between hits
+    # and must not be mutated. `options` are the parse options that change
+    # the tree, such as whether nodes are shared, and are part of the key.
+    #
+    # The size of an entry is the size of its source string plus an estimate
+    # per distinct node, roughly what `benchmarks/ast_memory.py` measures for
+    # slotted nodes including their operator tokens.
+    __NODE_BYTES = 64
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 << 20):
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__entries: OrderedDict[Tuple[str, Tuple], Tuple[Expression, int]] = (
+            OrderedDict()
+        )
+        self.__bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        return self.__bytes
+
+    def get(self, source: str, options: Tuple = ()) -> Optional[Expression]:
+        key = (source, options)
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, source: str, expression: Expression, options: Tuple = ()) -> None:
+        nodes = NodeCounter().count(expression, distinct=True)
+        size = sys.getsizeof(source) + nodes * SourceCache.__NODE_BYTES
+        if size > self.__max_bytes:
+            return
+
+        key = (source, options)
+        previous = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__bytes -= previous[1]
+        self.__entries[key] = (expression, size)
+        self.__bytes += size
+
+        while (
+            len(self.__entries) > self.__max_entries or self.__bytes > self.__max_bytes
+        ):
+            _, (_, evicted_size) = self.__entries.popitem(last=False)
+            self.__bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__bytes = 0
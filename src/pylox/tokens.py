@@ -1,13 +1,34 @@
-from dataclasses import dataclass
 from pylox.token_type import TokenType
 
 
-@dataclass
 class Token:
-    token_type: TokenType
-    lexeme: str
-    literal: any
-    line: int
+    # Written out rather than generated by `@dataclass`, which would import
+    # `dataclasses` on every start-up.
+    __hash__ = None
+
+    def __init__(self, token_type: TokenType, lexeme: str, literal: any, line: int):
+        self.token_type = token_type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+
+    def __repr__(self):
+        return (
+            f"Token(token_type={self.token_type!r}, lexeme={self.lexeme!r},"
+            f" literal={self.literal!r}, line={self.line!r})"
+        )
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.token_type, self.lexeme, self.literal, self.line) == (
+            other.token_type,
+            other.lexeme,
+            other.literal,
+            other.line,
+        )
 
     def __str__(self):
         return f"{self.token_type} {self.lexeme} {self.literal}"
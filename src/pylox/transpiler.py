@@ -0,0 +1,421 @@
+import ast
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple
+
+from pylox import runtime
+from pylox.evaluator import Evaluator
+from pylox.expression import (
+    BinaryExpression,
+    Expression,
+    GroupingExpression,
+    LiteralExpression,
+    TernaryExpression,
+    UnaryExpression,
+    VariableExpression,
+    Visitor,
+)
+from pylox.token_type import TokenType
+from pylox.tokens import Token
+
+
+def _load(name: str) -> ast.Name:
+    return ast.Name(id=name, ctx=ast.Load())
+
+
+def _assign(name: str, value: ast.expr) -> ast.NamedExpr:
+    return ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=value)
+
+
+def _type_is(value: ast.expr, type_name: str) -> ast.Compare:
+    return ast.Compare(
+        left=ast.Call(func=_load("type"), args=[value], keywords=[]),
+        ops=[ast.Is()],
+        comparators=[_load(type_name)],
+    )
+
+
+def _call(function: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(func=_load(function), args=list(args), keywords=[])
+
+
+def _is_falsey(name: str, value: ast.expr) -> ast.BoolOp:
+    # Inlines `not is_truthy(value)` as `(name := value) is None or name is False`.
+    return ast.BoolOp(
+        op=ast.Or(),
+        values=[
+            ast.Compare(
+                left=_assign(name, value),
+                ops=[ast.Is()],
+                comparators=[ast.Constant(None)],
+            ),
+            ast.Compare(
+                left=_load(name), ops=[ast.Is()], comparators=[ast.Constant(False)]
+            ),
+        ],
+    )
+
+
+class Transpiler(Visitor[None]):
+    # Translates an expression into a Python expression. Operands are bound
+    # to fresh names with `:=` so that the type checks of the fast path see
+    # both values, and `&` is used instead of `and` so that the right operand
+    # is always evaluated. Anything but the fast path calls the matching
+    # `pylox.runtime` function, which raises the same `RuntimeException` as
+    # the interpreters. Operator tokens are passed in through `namespace`.
+    #
+    # The tree is walked with an explicit stack, as in `Optimizer`. Each
+    # `visit_*` pushes its children and then a step that builds the node's
+    # Python expression from theirs, which are left on a stack of results.
+    #
+    # CPython's compiler recurses over the syntax tree, and gives up on
+    # nesting of about 200 to 1000 operators, depending on their kind. A tree
+    # nested deeper than `__MAX_DEPTH` could not be compiled, so it raises
+    # `RecursionError` as soon as that is seen, rather than after building all
+    # of its syntax tree.
+    __MAX_DEPTH = 1000
+    __FAST_PATH_OPERATORS = {
+        TokenType.GREATER: (ast.Gt, "greater"),
+        TokenType.GREATER_EQUAL: (ast.GtE, "greater_equal"),
+        TokenType.LESS: (ast.Lt, "less"),
+        TokenType.LESS_EQUAL: (ast.LtE, "less_equal"),
+        TokenType.MINUS: (ast.Sub, "subtract"),
+        TokenType.STAR: (ast.Mult, "multiply"),
+        TokenType.SLASH: (ast.Div, "divide"),
+        TokenType.PLUS: (ast.Add, "add"),
+    }
+
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {
+            "is_equal": runtime.is_equal,
+            "negate": runtime.negate,
+            "look_up": runtime.look_up,
+            **{
+                function: getattr(runtime, function)
+                for _, function in Transpiler.__FAST_PATH_OPERATORS.values()
+            },
+        }
+        self.__names = 0
+        self.__stack: List[Expression | Tuple[Callable, Expression]] = []
+        self.__results: List[ast.expr] = []
+
+    def __fresh_name(self, prefix: str) -> str:
+        self.__names += 1
+        return f"_{prefix}{self.__names}"
+
+    def __token(self, token: Token) -> ast.Name:
+        name = self.__fresh_name("t")
+        self.namespace[name] = token
+        return _load(name)
+
+    def transpile(self, expression: Expression) -> ast.Expression:
+        # The expression is wrapped in a lambda so that the `:=` targets are
+        # fast locals rather than dictionary lookups.
+        stack = self.__stack
+        stack.append(expression)
+        # The steps on the stack are those of the node's ancestors.
+        depth = 0
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Expression):
+                size = len(stack)
+                item.accept(self)
+                # A step is pushed before the children it waits for.
+                if len(stack) > size and not isinstance(stack[size], Expression):
+                    depth += 1
+                    if depth > Transpiler.__MAX_DEPTH:
+                        raise RecursionError("Expression too deep to compile.")
+            else:
+                depth -= 1
+                build, node = item
+                self.__results.append(build(node))
+        body = self.__results.pop()
+        return ast.fix_missing_locations(
+            ast.Expression(
+                body=ast.Lambda(
+                    args=ast.arguments(
+                        posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[]
+                    ),
+                    body=body,
+                )
+            )
+        )
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__binary, expression))
+        stack.append(expression.right)
+        stack.append(expression.left)
+
+    def __binary(self, expression: BinaryExpression) -> ast.expr:
+        right = self.__results.pop()
+        left = self.__results.pop()
+        token_type = expression.operator.token_type
+
+        match token_type:
+            case TokenType.COMMA:
+                return ast.Subscript(
+                    value=ast.Tuple(elts=[left, right], ctx=ast.Load()),
+                    slice=ast.Constant(1),
+                    ctx=ast.Load(),
+                )
+            case TokenType.EQUAL_EQUAL:
+                return _call("is_equal", left, right)
+            case TokenType.BANG_EQUAL:
+                return ast.UnaryOp(op=ast.Not(), operand=_call("is_equal", left, right))
+
+        left_name = self.__fresh_name("l")
+        right_name = self.__fresh_name("r")
+        operator_class, fallback = Transpiler.__FAST_PATH_OPERATORS[token_type]
+        if issubclass(operator_class, ast.cmpop):
+            operation = ast.Compare(
+                left=_load(left_name),
+                ops=[operator_class()],
+                comparators=[_load(right_name)],
+            )
+        else:
+            operation = ast.BinOp(
+                left=_load(left_name), op=operator_class(), right=_load(right_name)
+            )
+
+        if token_type == TokenType.PLUS:
+            # type(l := left) is type(r := right) and (type(l) is float or ...)
+            condition = ast.BoolOp(
+                op=ast.And(),
+                values=[
+                    ast.Compare(
+                        left=_call("type", _assign(left_name, left)),
+                        ops=[ast.Is()],
+                        comparators=[_call("type", _assign(right_name, right))],
+                    ),
+                    ast.BoolOp(
+                        op=ast.Or(),
+                        values=[
+                            _type_is(_load(left_name), "float"),
+                            _type_is(_load(left_name), "str"),
+                        ],
+                    ),
+                ],
+            )
+        else:
+            # (type(l := left) is float) & (type(r := right) is float)
+            condition = ast.BinOp(
+                left=_type_is(_assign(left_name, left), "float"),
+                op=ast.BitAnd(),
+                right=_type_is(_assign(right_name, right), "float"),
+            )
+            if token_type == TokenType.SLASH:
+                condition = ast.BoolOp(
+                    op=ast.And(),
+                    values=[
+                        condition,
+                        ast.Compare(
+                            left=_load(right_name),
+                            ops=[ast.NotEq()],
+                            comparators=[ast.Constant(0)],
+                        ),
+                    ],
+                )
+
+        return ast.IfExp(
+            test=condition,
+            body=operation,
+            orelse=_call(
+                fallback,
+                self.__token(expression.operator),
+                _load(left_name),
+                _load(right_name),
+            ),
+        )
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.__stack.append(expression.expression)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        self.__results.append(ast.Constant(expression.value))
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__unary, expression))
+        stack.append(expression.right)
+
+    def __unary(self, expression: UnaryExpression) -> ast.expr:
+        right = self.__results.pop()
+        name = self.__fresh_name("r")
+
+        match expression.operator.token_type:
+            case TokenType.BANG:
+                return _is_falsey(name, right)
+            case TokenType.MINUS:
+                return ast.IfExp(
+                    test=_type_is(_assign(name, right), "float"),
+                    body=ast.UnaryOp(op=ast.USub(), operand=_load(name)),
+                    orelse=_call(
+                        "negate", self.__token(expression.operator), _load(name)
+                    ),
+                )
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        stack = self.__stack
+        stack.append((self.__ternary, expression))
+        stack.append(expression.false_expression)
+        stack.append(expression.true_expression)
+        stack.append(expression.conditional_expression)
+
+    def __ternary(self, expression: TernaryExpression) -> ast.expr:
+        results = self.__results
+        false_expression = results.pop()
+        true_expression = results.pop()
+        condition = results.pop()
+        return ast.IfExp(
+            test=_is_falsey(self.__fresh_name("c"), condition),
+            body=false_expression,
+            orelse=true_expression,
+        )
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        # No variables are bound when transpiling, so this always fails.
+        self.__results.append(
+            _call(
+                "look_up", ast.Dict(keys=[], values=[]), self.__token(expression.name)
+            )
+        )
+
+
+class StructuralKey(Visitor[None]):
+    # Two expressions with the same key transpile to the same code. Lines are
+    # part of the key because they appear in runtime errors, and literals are
+    # keyed by `repr` so that `1` and `true`, or `0` and `-0`, stay distinct.
+    #
+    # The key is a flat tuple of the nodes in pre-order, each as its class
+    # followed by its fields. Every class has a fixed number of children, so
+    # this is unambiguous. It is built with an explicit stack, and a flat
+    # tuple hashes without recursion, however deep the tree.
+    def __init__(self):
+        self.__parts: List = []
+        self.__stack: List[Expression] = []
+
+    def key(self, expression: Expression) -> Tuple:
+        stack = self.__stack
+        stack.append(expression)
+        while stack:
+            stack.pop().accept(self)
+        return tuple(self.__parts)
+
+    def visit_binary_expression(self, expression: BinaryExpression) -> None:
+        self.__parts += (
+            BinaryExpression,
+            expression.operator.token_type,
+            expression.operator.line,
+        )
+        self.__stack += (expression.right, expression.left)
+
+    def visit_grouping_expression(self, expression: GroupingExpression) -> None:
+        self.__stack.append(expression.expression)
+
+    def visit_literal_expression(self, expression: LiteralExpression) -> None:
+        self.__parts += (LiteralExpression, repr(expression.value))
+
+    def visit_unary_expression(self, expression: UnaryExpression) -> None:
+        self.__parts += (
+            UnaryExpression,
+            expression.operator.token_type,
+            expression.operator.line,
+        )
+        self.__stack.append(expression.right)
+
+    def visit_ternary_expression(self, expression: TernaryExpression) -> None:
+        self.__parts.append(TernaryExpression)
+        self.__stack += (
+            expression.false_expression,
+            expression.true_expression,
+            expression.conditional_expression,
+        )
+
+    def visit_variable_expression(self, expression: VariableExpression) -> None:
+        self.__parts += (
+            VariableExpression,
+            expression.name.line,
+            expression.name.lexeme,
+        )
+
+
+class _LruCache:
+    # Bounded both by the number of entries and by the total of their sizes.
+    # An entry larger than `max_size` on its own is not kept.
+    def __init__(self, max_entries: int, max_size: int):
+        self.__max_entries = max_entries
+        self.__max_size = max_size
+        self.__entries: OrderedDict[Any, Tuple[Any, int]] = OrderedDict()
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def get(self, key: Any) -> Any:
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Any, value: Any, size: int) -> None:
+        previous = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__size -= previous[1]
+        if size > self.__max_size:
+            return
+        self.__entries[key] = (value, size)
+        self.__size += size
+        while len(self.__entries) > self.__max_entries or self.__size > self.__max_size:
+            _, (_, evicted_size) = self.__entries.popitem(last=False)
+            self.__size -= evicted_size
+
+
+class PythonBackend:
+    # Compiles expressions to CPython code objects through `Transpiler` and
+    # keeps the resulting functions in an LRU cache of `maxsize` entries,
+    # keyed by `StructuralKey`. The keys together hold at most
+    # `max_key_length` items, about three per node.
+    #
+    # Building a key walks the whole tree, so the function is also kept for
+    # the tree object itself, in a second LRU cache of the same bounds, and
+    # evaluating the same tree again costs a dictionary lookup. That cache
+    # holds on to the trees, so their identities are not reused, and they
+    # must not be mutated, as for `SourceCache`.
+    def __init__(self, maxsize: int = 1024, max_key_length: int = 1 << 20):
+        self.__functions = _LruCache(maxsize, max_key_length)
+        self.__trees = _LruCache(maxsize, max_key_length)
+
+    def compile(self, expression: Expression) -> Callable[[], Any]:
+        tree = self.__trees.get(id(expression))
+        if tree is not None:
+            return tree[1]
+
+        key = StructuralKey().key(expression)
+        function = self.__functions.get(key)
+        if function is None:
+            function = PythonBackend.__compile(expression)
+            self.__functions.put(key, function, len(key))
+        self.__trees.put(id(expression), (expression, function), len(key))
+        return function
+
+    @staticmethod
+    def __compile(expression: Expression) -> Callable[[], Any]:
+        try:
+            transpiler = Transpiler()
+            code = compile(transpiler.transpile(expression), "<lox>", "eval")
+            return eval(code, transpiler.namespace)
+        except RecursionError:
+            # CPython's compiler recurses over the syntax tree and gives up on
+            # very deep ones, such as a long chain of operators. Those are
+            # evaluated by the `Evaluator`, which walks them with its own
+            # stack and raises the same `RuntimeException`s.
+            return partial(Evaluator().evaluate, expression)
+
+    def evaluate(self, expression: Expression) -> Any:
+        return self.compile(expression)()
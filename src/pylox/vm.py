@@ -0,0 +1,133 @@
+from pylox.compiler import Chunk, OpCode
+from pylox.runtime import (
+    add,
+    divide,
+    greater,
+    greater_equal,
+    is_equal,
+    is_truthy,
+    less,
+    less_equal,
+    look_up,
+    multiply,
+    negate,
+    subtract,
+)
+from pylox.token_type import TokenType
+from pylox.tokens import Token
+
+
+class VM:
+    # A stack machine for `Chunk`s produced by the `Compiler`. Operations take
+    # an inline fast path for well-typed operands; otherwise the matching
+    # `pylox.runtime` function is called with a `Token` rebuilt from the line
+    # table, and raises the same `RuntimeException` as the interpreters.
+    __OPERATORS = {
+        OpCode.GREATER: (TokenType.GREATER, ">", greater),
+        OpCode.GREATER_EQUAL: (TokenType.GREATER_EQUAL, ">=", greater_equal),
+        OpCode.LESS: (TokenType.LESS, "<", less),
+        OpCode.LESS_EQUAL: (TokenType.LESS_EQUAL, "<=", less_equal),
+        OpCode.ADD: (TokenType.PLUS, "+", add),
+        OpCode.SUBTRACT: (TokenType.MINUS, "-", subtract),
+        OpCode.MULTIPLY: (TokenType.STAR, "*", multiply),
+        OpCode.DIVIDE: (TokenType.SLASH, "/", divide),
+    }
+
+    def __fail(self, chunk: Chunk, ip: int, *operands: any) -> None:
+        opcode = chunk.code[ip]
+        if opcode == OpCode.NEGATE:
+            negate(Token(TokenType.MINUS, "-", None, chunk.lines[ip]), *operands)
+        if opcode == OpCode.GET_VARIABLE:
+            name = chunk.constants[chunk.code[ip + 1]]
+            look_up({}, Token(TokenType.IDENTIFIER, name, None, chunk.lines[ip]))
+        token_type, lexeme, operation = VM.__OPERATORS[opcode]
+        operation(Token(token_type, lexeme, None, chunk.lines[ip]), *operands)
+
+    def run(self, chunk: Chunk) -> any:
+        # Indexing a list is cheaper than indexing the array, and the copy is a
+        # single C-level pass over the code.
+        code = chunk.code.tolist()
+        constants = chunk.constants
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        CONSTANT = OpCode.CONSTANT.value
+        NIL = OpCode.NIL.value
+        TRUE = OpCode.TRUE.value
+        FALSE = OpCode.FALSE.value
+        POP = OpCode.POP.value
+        EQUAL = OpCode.EQUAL.value
+        NOT_EQUAL = OpCode.NOT_EQUAL.value
+        GREATER = OpCode.GREATER.value
+        GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+        LESS = OpCode.LESS.value
+        ADD = OpCode.ADD.value
+        SUBTRACT = OpCode.SUBTRACT.value
+        MULTIPLY = OpCode.MULTIPLY.value
+        DIVIDE = OpCode.DIVIDE.value
+        NOT = OpCode.NOT.value
+        NEGATE = OpCode.NEGATE.value
+        JUMP = OpCode.JUMP.value
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        GET_VARIABLE = OpCode.GET_VARIABLE.value
+
+        ip = 0
+        while True:
+            opcode = code[ip]
+            ip += 1
+
+            if opcode == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif opcode <= FALSE:
+                push(None if opcode == NIL else opcode == TRUE)
+            elif opcode == POP:
+                pop()
+            elif opcode <= NOT_EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right) == (opcode == EQUAL)
+            elif opcode <= DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    if opcode == ADD:
+                        stack[-1] = left + right
+                    elif opcode == SUBTRACT:
+                        stack[-1] = left - right
+                    elif opcode == MULTIPLY:
+                        stack[-1] = left * right
+                    elif opcode == DIVIDE:
+                        if right == 0:
+                            self.__fail(chunk, ip - 1, left, right)
+                        stack[-1] = left / right
+                    elif opcode == GREATER:
+                        stack[-1] = left > right
+                    elif opcode == GREATER_EQUAL:
+                        stack[-1] = left >= right
+                    elif opcode == LESS:
+                        stack[-1] = left < right
+                    else:
+                        stack[-1] = left <= right
+                elif opcode == ADD and type(left) is str and type(right) is str:
+                    stack[-1] = left + right
+                else:
+                    self.__fail(chunk, ip - 1, left, right)
+            elif opcode == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+            elif opcode == NEGATE:
+                if type(stack[-1]) is not float:
+                    self.__fail(chunk, ip - 1, stack[-1])
+                stack[-1] = -stack[-1]
+            elif opcode == JUMP:
+                ip += code[ip] + 1
+            elif opcode == JUMP_IF_FALSE:
+                if is_truthy(pop()):
+                    ip += 1
+                else:
+                    ip += code[ip] + 1
+            elif opcode == GET_VARIABLE:
+                # No variables are bound in the VM, so this always fails.
+                self.__fail(chunk, ip - 1)
+            else:
+                return pop()
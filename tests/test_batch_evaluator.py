@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics, RuntimeException
+from pylox.scanner import Scanner
+
+np = pytest.importorskip("numpy")
+
+from pylox.batch_evaluator import BatchEvaluator  # noqa: E402
+
+# A `BatchEvaluator` must give each row what the `Interpreter` gives it with
+# the row's values bound to the column names, and fail if any row fails.
+
+COLUMNS = {
+    "x": [0.0, 1.0, -2.5, 3.0, 1e308, -0.0],
+    "y": [1.0, 0.0, 2.0, -2.5, 10.0, 4.0],
+    "s": np.array(["a", "b", "a", "ab", "", "b"], dtype=object),
+    "b": [True, False, False, True, True, False],
+    "m": np.array([1.0, "a", None, True, 0.0, "b"], dtype=object),
+}
+ATOMS = ["x", "y", "s", "b", "m", "0", "1", "2.5", '"a"', "true", "nil"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    operator = rng.choice(["+", "-", "*", "/", "==", "!=", "<", ">=", ","])
+    return rng.choice(
+        [
+            f"({left} {operator} {right})",
+            f"({left} ? {right} : {left})",
+            f"-{left}",
+            f"!{left}",
+        ]
+    )
+
+
+def parse(source: str):
+    diagnostics = Diagnostics()
+    tokens = Scanner(source, diagnostics=diagnostics).scan_tokens()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    assert not diagnostics.has_error(), source
+    return expression
+
+
+def evaluate_rows(expression, columns: dict) -> list:
+    # Each row on its own, or `None` if any row fails.
+    length = len(next(iter(columns.values())))
+    results = []
+    for row in range(length):
+        variables = {name: column[row] for name, column in columns.items()}
+        try:
+            results.append(repr(Interpreter(variables).evaluate(expression)))
+        except RuntimeException:
+            return None
+    return results
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_sources(seed: int):
+    rng = random.Random(seed)
+    for _ in range(500):
+        source = random_source(rng, rng.randint(0, 4))
+        expression = parse(source)
+        expected = evaluate_rows(expression, COLUMNS)
+        evaluator = BatchEvaluator(COLUMNS)
+        if expected is None:
+            with pytest.raises(RuntimeException):
+                evaluator.evaluate(expression)
+        else:
+            values = evaluator.evaluate(expression)
+            assert [repr(value) for value in values.tolist()] == expected, source
+
+
+def test_branches_only_fail_where_taken():
+    # The division by zero is in the branch the first row does not take.
+    expression = parse("(x == 0) ? -1 : 1 / x")
+    values = BatchEvaluator(COLUMNS).evaluate(expression)
+    assert [repr(value) for value in values.tolist()] == evaluate_rows(
+        expression, COLUMNS
+    )
+
+
+def test_errors_name_the_line():
+    with pytest.raises(RuntimeException) as error:
+        BatchEvaluator(COLUMNS).evaluate(parse("x\n+ s"))
+    assert error.value.message == "Operands must be two numbers or two strings."
+    assert error.value.token.line == 2
+
+
+def test_constant_expressions():
+    values = BatchEvaluator({}, length=3).evaluate(parse('"a" + "b"'))
+    assert values.tolist() == ["ab", "ab", "ab"]
+    assert BatchEvaluator({}).evaluate(parse("1 < 2")).tolist() == [True]
+
+
+def test_columns_are_checked():
+    with pytest.raises(ValueError):
+        BatchEvaluator({"x": [1.0, 2.0], "y": [1.0]})
+    with pytest.raises(ValueError):
+        BatchEvaluator({"x": [[1.0], [2.0]]})
@@ -0,0 +1,125 @@
+import os
+import random
+
+import pytest
+
+from pylox.byte_scanner import ByteScanner
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+
+# `ByteScanner` must produce the tokens and errors of `Scanner`, columns
+# included, for sources that are valid UTF-8.
+
+PIECES = [
+    "a",
+    "_b",
+    "and",
+    "orchid",
+    "1",
+    "2.5",
+    "3.",
+    ".",
+    " ",
+    "\t",
+    "\r",
+    "\n",
+    '"',
+    '"s\nt"',
+    '"é"',
+    "/*",
+    "*/",
+    "//",
+    "/",
+    "*",
+    "!",
+    "=",
+    "<",
+    "(",
+    ")",
+    "@",
+    "é",
+    "٣",
+    "😀",
+]
+
+
+def scan_file(scanner_class: type, path: str):
+    diagnostics = Diagnostics()
+    with open(path, "r") as file:
+        tokens = scanner_class(file, diagnostics=diagnostics).scan_tokens()
+    return tokens, diagnostics.format()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'"a\r\nb" + 1\r\n@ "c\rd"\r\n',
+        b'/* x\r\n */ 1 \r 2 // y\r\n\xc3\xa9 \r\n\r\n"',
+        b"1\r",
+    ],
+    ids=["crlf", "mixed", "trailing-cr"],
+)
+def test_files_are_read_as_text(tmp_path, data: bytes):
+    path = tmp_path / "source.lox"
+    path.write_bytes(data)
+    assert scan_file(ByteScanner, str(path)) == scan_file(Scanner, str(path))
+
+
+def test_pipes_are_read_as_text():
+    read, write = os.pipe()
+    os.write(write, b'"a\r\nb"\r\n@')
+    os.close(write)
+    with open(read, "rb") as pipe:
+        diagnostics = Diagnostics()
+        tokens = ByteScanner(pipe, diagnostics=diagnostics).scan_tokens()
+    expected = Diagnostics()
+    assert tokens == Scanner('"a\nb"\n@', diagnostics=expected).scan_tokens()
+    assert diagnostics.format() == expected.format()
+
+
+def test_invalid_utf8_is_reported():
+    diagnostics = Diagnostics()
+    source = b'1 \xff\xfe + "a\x80b" + x\xc3'
+    tokens = ByteScanner(source, diagnostics=diagnostics).scan_tokens()
+    assert [token.lexeme for token in tokens] == ["1", "+", '"a�b"', "+", "x", ""]
+    assert diagnostics.format() == [
+        "[line 1] Error: Invalid UTF-8.",
+        "[line 1] Error: Invalid UTF-8.",
+        "[line 1] Error: Invalid UTF-8.",
+    ]
+    assert [diagnostic.column for diagnostic in diagnostics.diagnostics] == [3, 10, 17]
+
+
+def test_random_sources():
+    rng = random.Random(0)
+    for _ in range(5000):
+        source = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        expected = Diagnostics()
+        tokens = Scanner(source, diagnostics=expected).scan_tokens()
+        for data in [source, source.encode("utf-8")]:
+            diagnostics = Diagnostics()
+            scanner = ByteScanner(data, diagnostics=diagnostics)
+            assert scanner.scan_tokens() == tokens, source
+            assert diagnostics.diagnostics == expected.diagnostics, source
+
+
+def test_random_files(tmp_path):
+    rng = random.Random(1)
+    path = str(tmp_path / "source.lox")
+    for _ in range(100):
+        source = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        with open(path, "w", newline="") as file:
+            file.write(source)
+        assert scan_file(ByteScanner, path) == scan_file(Scanner, path), source
+
+
+@pytest.mark.parametrize("max_errors", [1, 2, 5])
+def test_max_errors(max_errors: int):
+    # Both stop scanning once the sink is full, at the same token.
+    source = '1 @ 2 é 3\n$ "a\nb" % 4 /* 5 */ ^ 6 ~ "c'
+    expected = Diagnostics(max_errors)
+    tokens = Scanner(source, diagnostics=expected).scan_tokens()
+    diagnostics = Diagnostics(max_errors)
+    assert ByteScanner(source, diagnostics=diagnostics).scan_tokens() == tokens
+    assert diagnostics.format() == expected.format()
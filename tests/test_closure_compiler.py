@@ -0,0 +1,72 @@
+import pickle
+import random
+
+from pylox.closure_compiler import compile_expression
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics, RuntimeException
+from pylox.scanner import Scanner
+
+# A compiled expression must return what the `Interpreter` does, and fail
+# with the same error on the same line.
+
+ATOMS = ["0", "1", "2.5", '"a"', '"b"', "true", "false", "nil", "x"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    space = rng.choice([" ", "\n"])
+    operator = rng.choice(["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ","])
+    return rng.choice(
+        [
+            f"({left} {operator}{space}{right})",
+            f"({left} ?{space}{right} : {left})",
+            f"-{left}",
+            f"!{left}",
+        ]
+    )
+
+
+def parse(source: str):
+    diagnostics = Diagnostics()
+    tokens = Scanner(source, diagnostics=diagnostics).scan_tokens()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    assert not diagnostics.has_error(), source
+    return expression
+
+
+def evaluate(function):
+    try:
+        return repr(function())
+    except RuntimeException as exception:
+        return exception.message, exception.token.line
+
+
+def test_random_sources():
+    rng = random.Random(0)
+    for _ in range(3000):
+        source = random_source(rng, rng.randint(0, 6))
+        expression = parse(source)
+        expected = evaluate(lambda: Interpreter().evaluate(expression))
+        compiled = compile_expression(expression)
+        assert evaluate(compiled) == expected, source
+        # Calling again gives the same result.
+        assert evaluate(compiled) == expected, source
+
+
+def test_pickles_as_its_expression():
+    compiled = compile_expression(parse('("a" + "b" == "ab") ? 1 : 2'))
+    assert pickle.loads(pickle.dumps(compiled))() == 1.0
+
+
+def test_deep_trees():
+    # Too deep for the closures, and evaluated by the `Evaluator` instead.
+    assert compile_expression(parse(" + ".join(["1"] * 5000)))() == 5000.0
+    source = "1 -\n" + " - ".join(['"a"'] * 5000)
+    assert evaluate(compile_expression(parse(source))) == (
+        "Operands must be numbers.",
+        1,
+    )
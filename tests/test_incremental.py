@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+import random
+
+import pytest
+
+from pylox import incremental
+from pylox.expression import Expression
+from pylox.incremental import Document
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics
+
+# After any edit, a `Document` must hold what scanning and parsing its new
+# source from scratch produces.
+
+ATOMS = ["1", "2.5", '"a"', '"b\nc"', "true", "nil", "x", "yy"]
+SPACES = [" ", "\n", "  ", "/* c\n */", "// z\n"]
+SNIPPETS = [
+    "(",
+    ")",
+    "+",
+    " ",
+    "\n",
+    "1",
+    "x",
+    '"',
+    "/*",
+    "*/",
+    "//",
+    "=",
+    "!",
+    "?",
+    ":",
+    "12.5",
+    "ab",
+    "@",
+    ".",
+    "3",
+]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    space = rng.choice(SPACES)
+    return rng.choice(
+        [
+            f"({left} +{space}{right})",
+            f"({left}{space}== {right})",
+            f"({left} ? {right} : {left})",
+            f"-!{left}",
+            f"({left}, {right})",
+            f"({left} * {right})",
+            f"{left} -{space}{right}",
+            f"{left} < {right} / {right}",
+            f"{left} ? {right} : {left}",
+            f"{left}, {right}",
+        ]
+    )
+
+
+def parse(source: str):
+    diagnostics = Diagnostics()
+    tokens = RegexScanner(source, diagnostics).scan_tokens()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    return tokens, expression, diagnostics.diagnostics
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_edits_match_a_full_parse(seed: int):
+    rng = random.Random(seed)
+    for _ in range(200):
+        document = Document(random_source(rng, rng.randint(0, 5)))
+        for _ in range(8):
+            length = len(document.source)
+            offset = rng.randint(0, length)
+            removed = rng.randint(0, min(3, length - offset))
+            inserted = "".join(rng.choice(SNIPPETS) for _ in range(rng.randint(0, 2)))
+            document.edit(offset, removed, inserted)
+            tokens, expression, diagnostics = parse(document.source)
+            assert document.tokens == tokens, document.source
+            assert document.expression == expression, document.source
+            assert document.diagnostics == diagnostics, document.source
+
+
+def test_edits_stay_local():
+    # In a long chain with an error at its end, an edit only replaces the
+    # nodes and tokens it touches, and moves the lines after a newline.
+    source = " + ".join(["1"] * 1000) + " +"
+    document = Document(source)
+    expression = document.expression
+    tokens = list(document.tokens)
+    middle = source.index("1", len(source) // 2)
+
+    document.edit(middle, 1, "7")
+    assert document.expression is expression
+    changed = [
+        index
+        for index, token in enumerate(document.tokens)
+        if token is not tokens[index]
+    ]
+    assert len(changed) == 1
+    assert document.tokens[changed[0]].literal == 7.0
+
+    document.edit(middle, 0, "\n")
+    assert document.expression is expression
+    assert all(
+        token is tokens[index]
+        for index, token in enumerate(document.tokens)
+        if index != changed[0]
+    )
+    assert document.tokens[-1].line == 2
+    assert document.diagnostics == parse(document.source)[2]
+
+
+def test_edit_out_of_range():
+    with pytest.raises(ValueError):
+        Document("1 + 2").edit(4, 2, "")
+
+
+def test_frozen_nodes_are_rejected(monkeypatch):
+    @dataclass(frozen=True)
+    class GroupingExpression(Expression):
+        expression: Expression
+
+    monkeypatch.setattr(incremental, "GroupingExpression", GroupingExpression)
+    with pytest.raises(TypeError):
+        Document("(1)")
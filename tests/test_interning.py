@@ -0,0 +1,119 @@
+from io import StringIO
+import random
+
+import pytest
+
+from pylox.ast_printer import AstPrinter
+from pylox.evaluator import Evaluator
+from pylox.interning import InterningFactory
+from pylox.lox import Options, backend, print_expression
+from pylox.parser import Parser
+from pylox.program import run_program
+from pylox.profiler import profile
+from pylox.reporter import Diagnostics, RuntimeException
+from pylox.runtime import stringify
+from pylox.scanner import Scanner
+
+# An `InterningFactory` shares repeated subexpressions, and whatever walks
+# the shared tree must see what it sees in the plain one.
+
+ATOMS = ["1", "2", '"a"', "true", "nil", "x"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = rng.choice([left, random_source(rng, depth - 1)])
+    space = rng.choice([" ", "\n"])
+    return rng.choice(
+        [
+            f"({left} +{space}{right})",
+            f"({left} =={space}{right})",
+            f"({left} ? {right} :{space}{left})",
+            f"-{left}",
+            f"({left} * {right})",
+        ]
+    )
+
+
+def parse(source: str, factory=None):
+    diagnostics = Diagnostics()
+    tokens = Scanner(source, diagnostics=diagnostics).scan_tokens()
+    if factory is None:
+        expression = Parser(tokens, diagnostics=diagnostics).parse()
+    else:
+        expression = Parser(tokens, factory, diagnostics).parse()
+    assert not diagnostics.has_error(), source
+    return expression
+
+
+def evaluate(expression, memoize: bool):
+    try:
+        return stringify(Evaluator(memoize=memoize).evaluate(expression))
+    except RuntimeException as exception:
+        return exception.message, exception.token.line
+
+
+def test_shared_within_a_line():
+    factory = InterningFactory()
+    expression = parse("(1 + 2) * (1 + 2)", factory)
+    assert expression.left is expression.right
+    assert factory.requested == 9
+    assert factory.built == 5
+
+
+def test_not_shared_across_lines():
+    # The operators stay apart, so that an error names its own line, but
+    # the literals under them are still shared.
+    expression = parse("(1 + 2) *\n(1 + 2)", InterningFactory())
+    left = expression.left.expression
+    right = expression.right.expression
+    assert left is not right
+    assert print_expression(left) == print_expression(right)
+    assert (left.operator.line, right.operator.line) == (1, 2)
+    assert left.left is right.left
+
+
+def test_runtime_errors_name_the_line():
+    # Only the copy on the second line is evaluated.
+    source = 'false ? -"a" :\n-"a"'
+    expression = parse(source, InterningFactory())
+    assert evaluate(expression, memoize=True) == ("Operand must be a number.", 2)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_walkers_see_the_same_tree(seed: int):
+    rng = random.Random(seed)
+    for _ in range(300):
+        source = random_source(rng, rng.randint(0, 6))
+        plain = parse(source)
+        shared = parse(source, InterningFactory())
+        assert shared == plain
+        assert AstPrinter(memoize=True).print(shared) == AstPrinter().print(plain)
+        assert print_expression(shared) == print_expression(plain)
+        assert evaluate(shared, memoize=True) == evaluate(plain, memoize=False)
+
+
+@pytest.mark.parametrize("name", ["print", "evaluate", "vm"])
+def test_program_and_profile_share_nodes(name: str):
+    source = "(1 + 2) * (1 + 2);\n-(x == x);\n(1 + 2) * (1 + 2);\n"
+    outputs = []
+    for share_nodes in [False, True]:
+        output = StringIO()
+        options = Options(backend=name, share_nodes=share_nodes)
+        run_program(source, backend(options), output, share_nodes=share_nodes)
+        outputs.append(output.getvalue())
+    assert outputs[0] == outputs[1]
+
+    statement = "(1 + 2) * (1 + 2)"
+    report = profile(statement, backend=backend(Options(backend=name)))
+    shared = profile(
+        statement,
+        backend=backend(Options(backend=name, share_nodes=True)),
+        share_nodes=True,
+    )
+    assert shared["output"] == report["output"]
+    assert shared["nodes"]["count"] == report["nodes"]["count"] == 9
+    assert shared["nodes"]["distinct"] == 5
+    assert report["nodes"]["distinct"] == 9
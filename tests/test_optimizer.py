@@ -0,0 +1,82 @@
+import random
+
+from pylox.evaluator import Evaluator
+from pylox.interpreter import Interpreter
+from pylox.node_counter import NodeCounter
+from pylox.optimizer import Optimizer
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics, RuntimeException
+from pylox.scanner import Scanner
+
+# An optimized tree must evaluate to what the original does, and fail with
+# the same error on the same line.
+
+ATOMS = ["0", "1", "2.5", '"a"', '"b"', "true", "false", "nil", "x"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    space = rng.choice([" ", "\n"])
+    operator = rng.choice(["+", "-", "*", "/", "==", "!=", "<", ">=", ","])
+    return rng.choice(
+        [
+            f"({left} {operator}{space}{right})",
+            f"({left} ?{space}{right} : {left})",
+            f"-{left}",
+            f"!{left}",
+        ]
+    )
+
+
+def parse(source: str):
+    diagnostics = Diagnostics()
+    tokens = Scanner(source, diagnostics=diagnostics).scan_tokens()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    assert not diagnostics.has_error(), source
+    return expression
+
+
+def evaluate(evaluator, expression):
+    try:
+        return repr(evaluator.evaluate(expression))
+    except RuntimeException as exception:
+        return exception.message, exception.token.line
+
+
+def test_random_sources():
+    rng = random.Random(0)
+    for _ in range(3000):
+        source = random_source(rng, rng.randint(0, 6))
+        expression = parse(source)
+        expected = evaluate(Interpreter(), expression)
+        optimizer = Optimizer()
+        optimized = optimizer.optimize(expression)
+        assert evaluate(Interpreter(), optimized) == expected, source
+        assert (
+            NodeCounter().count(expression) - NodeCounter().count(optimized)
+            == optimizer.removed_nodes
+        ), source
+
+
+def test_folds_literals():
+    optimizer = Optimizer()
+    optimized = optimizer.optimize(parse('((1 + 2) * 3 == 9) ? "a" + "b" : x'))
+    assert optimized.value == "ab"
+    assert optimizer.removed_nodes == 13
+
+
+def test_keeps_failing_operations():
+    source = '1 +\n(2 / 0 + "a")'
+    optimized = Optimizer().optimize(parse(source))
+    assert evaluate(Interpreter(), optimized) == ("Division by zero.", 2)
+
+
+def test_deep_trees():
+    source = " + ".join(["(1 - x)"] * 5000)
+    optimized = Optimizer().optimize(parse(source))
+    assert evaluate(Evaluator(), optimized) == evaluate(Evaluator(), parse(source))
+    optimized = Optimizer().optimize(parse("-" * 5000 + "1 * 2"))
+    assert optimized.value == 2.0
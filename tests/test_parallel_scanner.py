@@ -0,0 +1,142 @@
+import concurrent.futures
+import random
+
+import pytest
+
+from pylox.lox import Options, parse, print_expression
+from pylox.parallel_scanner import ParallelScanner, split_points
+from pylox.reporter import Diagnostics, Reporter
+from pylox.scanner import Scanner
+
+# `ParallelScanner` must produce the tokens and errors of `Scanner`, however
+# the source is split.
+
+PIECES = [
+    "a",
+    "1",
+    "2.5",
+    " ",
+    "\n",
+    "\n",
+    "\n",
+    '"',
+    "/*",
+    "*/",
+    "//",
+    "/",
+    "*",
+    "(",
+    ")",
+    "@",
+    "é",
+    "\r",
+    "x",
+    '"s\nt"',
+    "/* a\n b */",
+    "==",
+]
+
+
+class InlineExecutor:
+    # Runs the chunks in this process, one after another, so that many
+    # splits can be tried quickly.
+    def __init__(self, max_workers: int):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        pass
+
+    def map(self, function, iterable):
+        return map(function, iterable)
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", InlineExecutor)
+
+
+def test_random_sources(inline):
+    rng = random.Random(0)
+    for _ in range(5000):
+        source = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 60)))
+        expected = Diagnostics()
+        tokens = Scanner(source, diagnostics=expected).scan_tokens()
+        diagnostics = Diagnostics()
+        scanner = ParallelScanner(
+            source,
+            diagnostics=diagnostics,
+            workers=rng.randint(2, 5),
+            chunks_per_worker=rng.randint(1, 4),
+            min_size=0,
+        )
+        assert scanner.scan_tokens() == tokens, source
+        assert diagnostics.format() == expected.format(), source
+
+        diagnostics = Diagnostics()
+        scanner = ParallelScanner(
+            source,
+            diagnostics=diagnostics,
+            workers=rng.randint(2, 5),
+            chunks_per_worker=rng.randint(1, 4),
+            min_size=0,
+        )
+        buffer = scanner.scan_token_buffer()
+        assert list(buffer) == tokens, source
+        assert [buffer.literal(i) for i in range(len(buffer))] == [
+            token.literal for token in tokens
+        ], source
+        assert diagnostics.format() == expected.format(), source
+
+        points = split_points(source, 7)
+        assert points[0] == 0 and points[-1] == len(source)
+        assert points == sorted(set(points)) or source == ""
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_reporter_sink(inline, capsys, workers: int):
+    # `Reporter` prints every error as it comes, without merging.
+    source = "1 @@ 2\n#\n3 $%^\n" * 4
+    try:
+        tokens = Scanner(source).scan_tokens()
+        expected = capsys.readouterr().out
+        scanner = ParallelScanner(source, workers=workers, min_size=0)
+        assert scanner.scan_tokens() == tokens
+        assert capsys.readouterr().out == expected
+    finally:
+        Reporter.reset_error()
+
+
+def test_process_pool():
+    source = '1 + @@\n"a\nb" /* c\n*/ 2\n' * 200
+    expected = Diagnostics()
+    tokens = Scanner(source, diagnostics=expected).scan_tokens()
+    diagnostics = Diagnostics()
+    scanner = ParallelScanner(source, diagnostics=diagnostics, workers=2, min_size=0)
+    assert scanner.scan_tokens() == tokens
+    assert diagnostics.format() == expected.format()
+    assert list(scanner.scan_token_buffer()) == tokens
+
+
+def test_lines_after_block_comments(inline):
+    # Newlines in block comments are not counted, and the chunks after one
+    # must start on the line the scanner would be on.
+    source = "/* a\n\n b */ 1\n" * 50 + '"s\nt"\n2'
+    tokens = Scanner(source, diagnostics=Diagnostics()).scan_tokens()
+    scanner = ParallelScanner(
+        source, diagnostics=Diagnostics(), workers=4, chunks_per_worker=8, min_size=0
+    )
+    buffer = scanner.scan_token_buffer()
+    assert [buffer.line(i) for i in range(len(buffer))] == [
+        token.line for token in tokens
+    ]
+
+
+@pytest.mark.parametrize("engine", ["default", "parallel"])
+def test_lox_parses_the_buffer(inline, engine: str):
+    # Large enough to be split, in few tokens.
+    source = ('"' + "a" * 1000 + '" +\n') * 1100 + '"a" == (2 - 3 ? 4 : 5)'
+    expression = parse(source, Options(scanner_engine=engine))
+    assert print_expression(expression) == print_expression(parse(source, Options()))
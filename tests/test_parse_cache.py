@@ -0,0 +1,66 @@
+import marshal
+
+import pytest
+
+from pylox.ast_printer import AstPrinter
+from pylox.parse_cache import ParseCache
+from pylox.reporter import Reporter
+from pylox.scanner import Scanner
+
+# The cache must never change what a parse returns, and must never stop a run:
+# a bad entry or an unusable directory only costs the caching.
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "source.lox"
+    path.write_text('(1 + 2) * -x ? "a" : nil\n')
+    return str(path)
+
+
+def entries(directory):
+    return sorted(directory.glob("*.lox-cache"))
+
+
+def test_hit(tmp_path, source_file):
+    cache = ParseCache(str(tmp_path / "cache"))
+    expected = AstPrinter().print(cache.parse_file(source_file, Scanner))
+    assert AstPrinter().print(cache.parse_file(source_file, Scanner)) == expected
+    assert (cache.hits, cache.misses, cache.errors) == (1, 1, 0)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\x00garbage",
+        marshal.dumps(None),
+        marshal.dumps((b"", b"", (), {}, b"", (b"", b"", b""), b"", (), 0)),
+        marshal.dumps((b"\x00", b"", (), {}, b"\x07", (b"", b"", b""), b"", (), 0)),
+    ],
+    ids=["empty", "garbage", "none", "no-nodes", "bad-kind"],
+)
+def test_corrupt_entry(tmp_path, source_file, data: bytes):
+    directory = tmp_path / "cache"
+    cache = ParseCache(str(directory))
+    expected = AstPrinter().print(cache.parse_file(source_file, Scanner))
+    [entry] = entries(directory)
+    entry.write_bytes(data)
+
+    cache = ParseCache(str(directory))
+    assert AstPrinter().print(cache.parse_file(source_file, Scanner)) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+    # Deleted, then written again by the parse.
+    [entry] = entries(directory)
+    assert entry.read_bytes() != data
+
+
+def test_unusable_directory(tmp_path, source_file):
+    # A file where the directory should be cannot be created or written to.
+    directory = tmp_path / "cache"
+    directory.write_text("")
+    cache = ParseCache(str(directory))
+    expression = cache.parse_file(source_file, Scanner)
+    assert expression is not None
+    assert not Reporter.has_error()
+    assert cache.errors > 0
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from pylox.expression_arena import ExpressionArena
+from pylox.parser import Parser
+from pylox.recursive_descent_parser import RecursiveDescentParser
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+# `Parser` replaced `RecursiveDescentParser` and must build the same trees,
+# report the same errors and stop at the same token, for any input.
+
+PIECES = [
+    "1",
+    "2.5",
+    "x",
+    '"s"',
+    "true",
+    "false",
+    "nil",
+    "(",
+    ")",
+    "!",
+    "-",
+    "+",
+    "*",
+    "/",
+    ",",
+    "==",
+    "!=",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "?",
+    ":",
+    ";",
+    "var",
+]
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(["1", "0", "2.5", '"a"', "true", "false", "nil", "x"])
+    kind = rng.randrange(4)
+    if kind == 0:
+        operator = rng.choice(
+            ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=", ","]
+        )
+        left = random_expression(rng, depth - 1)
+        right = random_expression(rng, depth - 1)
+        return f"{left} {operator} {right}"
+    if kind == 1:
+        return rng.choice(["-", "!"]) + random_expression(rng, depth - 1)
+    if kind == 2:
+        condition, true, false = (random_expression(rng, depth - 1) for _ in range(3))
+        return f"{condition} ? {true} : {false}"
+    return f"({random_expression(rng, depth - 1)})"
+
+
+def parse(parser_class: type, source: str, arena: bool):
+    # Returns what a parse produced: the tree, or the arena's contents when
+    # parsing into one, the errors, and the tokens that were not consumed.
+    tokens = iter(Scanner(source).scan_tokens())
+    diagnostics = Diagnostics()
+    if arena:
+        factory = ExpressionArena()
+        root = parser_class(tokens, factory, diagnostics).parse()
+        result = (
+            root,
+            list(factory.kinds),
+            [list(slot) for slot in factory.slots],
+            factory.tokens,
+            factory.values,
+        )
+    else:
+        result = parser_class(tokens, diagnostics=diagnostics).parse()
+    return result, diagnostics.diagnostics, list(tokens)
+
+
+@pytest.mark.parametrize("arena", [False, True])
+def test_random_token_sequences(arena: bool):
+    # Mostly malformed input, which exercises error recovery.
+    rng = random.Random(0)
+    for _ in range(3000):
+        source = " ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 14)))
+        assert parse(Parser, source, arena) == parse(
+            RecursiveDescentParser, source, arena
+        ), source
+
+
+@pytest.mark.parametrize("arena", [False, True])
+def test_random_expressions(arena: bool):
+    rng = random.Random(1)
+    for _ in range(2000):
+        source = random_expression(rng, rng.randint(0, 6))
+        assert parse(Parser, source, arena) == parse(
+            RecursiveDescentParser, source, arena
+        ), source
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "+".join(["1"] * 5000),
+        "-" * 5000 + "1",
+        "(" * 3000 + "1" + ")" * 3000,
+        " ? 1 : ".join(["1"] * 3000),
+    ],
+    ids=["binary", "unary", "grouping", "ternary"],
+)
+def test_deep_expressions(source: str):
+    # Deeper than `RecursiveDescentParser` can go.
+    diagnostics = Diagnostics()
+    expression = Parser(Scanner(source).scan_tokens(), diagnostics=diagnostics).parse()
+    assert expression is not None
+    assert not diagnostics.has_error()
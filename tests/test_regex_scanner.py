@@ -0,0 +1,88 @@
+from io import StringIO
+import random
+
+import pytest
+
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics, Reporter
+from pylox.scanner import Scanner
+
+# `RegexScanner` must produce the tokens and errors of `Scanner`, columns
+# included.
+
+PIECES = [
+    "a",
+    "_b",
+    "and",
+    "orchid",
+    "nil",
+    "1",
+    "2.5",
+    "3.",
+    ".",
+    " ",
+    "\t",
+    "\r",
+    "\n",
+    '"',
+    '"s\nt"',
+    "/*",
+    "*/",
+    "//",
+    "/",
+    "*",
+    "!",
+    "=",
+    "<",
+    ">",
+    "(",
+    ")",
+    "?",
+    ":",
+    "@",
+    "#",
+    "é",
+    "٣",
+]
+
+
+def scan(scanner_class: type, source, diagnostics: Diagnostics):
+    return scanner_class(source, diagnostics=diagnostics).scan_tokens()
+
+
+def test_random_sources():
+    rng = random.Random(0)
+    for _ in range(5000):
+        source = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        expected = Diagnostics()
+        tokens = scan(Scanner, source, expected)
+        diagnostics = Diagnostics()
+        assert scan(RegexScanner, source, diagnostics) == tokens, source
+        assert diagnostics.diagnostics == expected.diagnostics, source
+
+        diagnostics = Diagnostics()
+        scanner = RegexScanner(StringIO(source), diagnostics=diagnostics)
+        assert list(scanner.iter_tokens()) == tokens, source
+        assert diagnostics.diagnostics == expected.diagnostics, source
+
+
+@pytest.mark.parametrize("max_errors", [1, 2, 5])
+def test_max_errors(max_errors: int):
+    # Both stop scanning once the sink is full, at the same token.
+    source = '1 @ 2 # 3\n$ "a\nb" % 4 /* 5 */ ^ 6 ~ "c'
+    expected = Diagnostics(max_errors)
+    tokens = scan(Scanner, source, expected)
+    diagnostics = Diagnostics(max_errors)
+    assert scan(RegexScanner, source, diagnostics) == tokens
+    assert diagnostics.format() == expected.format()
+
+
+def test_reporter_sink(capsys):
+    source = "1 @@ 2\n#\n3 $%^ /* a\n"
+    try:
+        tokens = Scanner(source).scan_tokens()
+        expected = capsys.readouterr().out
+        assert RegexScanner(source).scan_tokens() == tokens
+        assert capsys.readouterr().out == expected
+    finally:
+        Reporter.reset_error()
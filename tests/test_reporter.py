@@ -0,0 +1,127 @@
+from io import StringIO
+import threading
+
+from pylox.lox import Options, parse
+from pylox.reporter import Diagnostic, Diagnostics, Reporter
+from pylox.scanner import Scanner
+
+# A `Diagnostics` buffers the errors of one run: runs of unexpected
+# characters are merged, errors past `max_errors` are only counted, and
+# `flush` writes them all at once.
+
+
+class CountingWriter(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def test_unexpected_characters_are_merged():
+    diagnostics = Diagnostics()
+    Scanner("1 @#$ 2 %\n^& 3", diagnostics=diagnostics).scan_tokens()
+    assert diagnostics.diagnostics == [
+        Diagnostic(1, 3, "@#$", "Unexpected characters."),
+        Diagnostic(1, 9, "%", "Unexpected character."),
+        Diagnostic(2, 1, "^&", "Unexpected characters."),
+    ]
+
+
+def test_only_adjacent_characters_are_merged():
+    diagnostics = Diagnostics()
+    diagnostics.report_error(1, "@", "Unexpected character.", 1)
+    diagnostics.report_error(1, "#", "Unexpected character.", 3)
+    diagnostics.report_error(2, "$", "Unexpected character.", 4)
+    diagnostics.report_error(2, "", "Unterminated string.", 5)
+    diagnostics.report_error(2, "%", "Unexpected character.", 6)
+    assert [diagnostic.where for diagnostic in diagnostics.diagnostics] == [
+        "@",
+        "#",
+        "$",
+        "",
+        "%",
+    ]
+
+
+def test_max_errors():
+    diagnostics = Diagnostics(max_errors=2)
+    diagnostics.report_error(1, "", "Unterminated string.", 1)
+    assert not diagnostics.is_full()
+    diagnostics.report_error(2, "@", "Unexpected character.", 1)
+    assert diagnostics.is_full()
+    # Merged into the last error held, which does not count as another.
+    diagnostics.report_error(2, "#", "Unexpected character.", 2)
+    diagnostics.report_error(3, "", "Unterminated string.", 1)
+    diagnostics.report_error(3, "$", "Unexpected character.", 2)
+    assert diagnostics.suppressed == 2
+    assert diagnostics.format() == [
+        "[line 1] Error: Unterminated string.",
+        "[line 2] Error @#: Unexpected characters.",
+        "Too many errors, 2 more not shown.",
+    ]
+
+
+def test_flush():
+    diagnostics = Diagnostics(max_errors=1)
+    diagnostics.report_error(1, "at ')'", "Expect expression.")
+    diagnostics.report_error(2, " at end", "Expect expression.")
+    output = CountingWriter()
+    diagnostics.flush(output)
+    assert output.writes == 1
+    assert output.getvalue() == (
+        "[line 1] Error at ')': Expect expression.\n"
+        "Too many errors, 1 more not shown.\n"
+    )
+    # The buffer is emptied, but the run still had errors.
+    assert diagnostics.format() == []
+    assert diagnostics.has_error() and diagnostics.is_full()
+    diagnostics.flush(output)
+    assert output.writes == 1
+
+    diagnostics.reset()
+    assert not diagnostics.has_error() and not diagnostics.is_full()
+
+
+def test_drain():
+    diagnostics = Diagnostics()
+    diagnostics.report_error(1, "", "Unterminated comment.", 4)
+    assert diagnostics.drain() == [Diagnostic(1, 4, "", "Unterminated comment.")]
+    assert diagnostics.drain() == []
+
+
+def test_threads_do_not_lose_errors():
+    diagnostics = Diagnostics()
+
+    def report(line: int):
+        for column in range(1, 1001):
+            diagnostics.report_error(line, "", "Unterminated string.", column)
+
+    threads = [threading.Thread(target=report, args=(line,)) for line in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(diagnostics.diagnostics) == 4000
+
+
+def test_parse_reports_each_run(capsys):
+    # Each run buffers its own errors and prints them when it is done.
+    try:
+        assert parse("1 + @@ 2 +", Options(source_cache=False)) is None
+        assert capsys.readouterr().out == (
+            "[line 1] Error @@: Unexpected characters.\n"
+            "[line 1] Error  at end: Expect expression.\n"
+        )
+        Reporter.reset_error()
+        # The scanner stops at the first error past the limit.
+        options = Options(source_cache=False, max_errors=1)
+        assert parse("@ 1 # 2 $", options) is None
+        assert capsys.readouterr().out == (
+            "[line 1] Error @: Unexpected character.\n"
+            "Too many errors, 1 more not shown.\n"
+        )
+    finally:
+        Reporter.reset_error()
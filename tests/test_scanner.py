@@ -0,0 +1,45 @@
+import io
+
+import pytest
+
+from pylox.reporter import Diagnostics
+from pylox.scanner import Scanner
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, source: str):
+        super().__init__(source)
+        self.reads = 0
+
+    def read(self, size: int = -1) -> str:
+        self.reads += 1
+        return super().read(size)
+
+
+@pytest.mark.parametrize(
+    "lexeme",
+    ['"' + "a\n" * 50000 + '"', "/*" + "b" * 100000 + "*/", "x" * 100000],
+    ids=["string", "comment", "identifier"],
+)
+def test_long_lexemes_are_read_in_few_chunks(lexeme: str):
+    # A lexeme longer than a chunk is read in chunks that double in size, so
+    # each refill does not copy a buffer that grew by a single chunk.
+    source = f"1 + {lexeme} + 2"
+    reader = CountingReader(source)
+    diagnostics = Diagnostics()
+    tokens = list(Scanner(reader, chunk_size=16, diagnostics=diagnostics).iter_tokens())
+    assert tokens == Scanner(source, diagnostics=Diagnostics()).scan_tokens()
+    assert not diagnostics.has_error()
+    assert reader.reads < 30
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_chunk_sizes(chunk_size: int):
+    source = '(1.5 + "a\nb") // c\n/* d\n/* e */ */ x >= y @ "z'
+    expected = Diagnostics()
+    tokens = Scanner(source, diagnostics=expected).scan_tokens()
+    diagnostics = Diagnostics()
+    reader = io.StringIO(source)
+    scanner = Scanner(reader, chunk_size=chunk_size, diagnostics=diagnostics)
+    assert list(scanner.iter_tokens()) == tokens
+    assert diagnostics.format() == expected.format()
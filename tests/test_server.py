@@ -0,0 +1,167 @@
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import threading
+
+import pytest
+
+# `python -m pylox.server` over pipes, as an editor runs it.
+
+
+class Client:
+    def __init__(self):
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join(
+            filter(
+                None,
+                [
+                    str(Path(__file__).resolve().parents[1] / "src"),
+                    environment.get("PYTHONPATH"),
+                ],
+            )
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "pylox.server", "--debounce", "0"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=environment,
+        )
+        # A server that stops answering fails the test rather than hanging it.
+        self.watchdog = threading.Timer(60, self.process.kill)
+        self.watchdog.start()
+
+    def write(self, data: bytes) -> None:
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        self.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    def receive(self) -> dict:
+        length = None
+        while True:
+            line = self.process.stdout.readline()
+            assert line, "the server stopped"
+            line = line.strip()
+            if len(line) == 0:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(self.process.stdout.read(length))
+
+    def response(self, id: int) -> dict:
+        # Skips the notifications published meanwhile.
+        while True:
+            message = self.receive()
+            if "method" not in message:
+                assert message["id"] == id
+                return message
+
+    def hover(self, id: int, line: int, character: int):
+        self.send(
+            {
+                "id": id,
+                "method": "textDocument/hover",
+                "params": {
+                    "textDocument": {"uri": "file:///a.lox"},
+                    "position": {"line": line, "character": character},
+                },
+            }
+        )
+        response = self.response(id)
+        if response["result"] is None:
+            return None
+        return response["result"]["contents"]["value"]
+
+    def close(self) -> int:
+        self.send({"id": 0, "method": "shutdown"})
+        assert self.response(0) == {"jsonrpc": "2.0", "id": 0, "result": None}
+        self.send({"method": "exit"})
+        self.process.stdin.close()
+        try:
+            return self.process.wait()
+        finally:
+            self.watchdog.cancel()
+            self.process.stdout.close()
+
+
+@pytest.fixture
+def client():
+    client = Client()
+    yield client
+    if client.process.poll() is None:
+        client.process.kill()
+        client.process.wait()
+    client.watchdog.cancel()
+
+
+def test_malformed_frames_are_skipped(client):
+    parse_error = {
+        "jsonrpc": "2.0",
+        "id": None,
+        "error": {"code": -32700, "message": "Parse error"},
+    }
+    client.write(b"Content-Length: many\r\n\r\n")
+    assert client.receive() == parse_error
+    client.write(b"no header here\r\n\r\n")
+    assert client.receive() == parse_error
+    # A body that follows a bad header runs into the next frame.
+    client.write(b"Content-Length: -2\r\n\r\n{}")
+    assert client.receive() == parse_error
+    client.write(b"Content-Length: 2\r\n\r\n{]")
+    assert client.receive() == parse_error
+
+    client.send({"id": 1, "method": "initialize", "params": {"capabilities": {}}})
+    response = client.response(1)
+    assert response["result"]["capabilities"]["hoverProvider"] is True
+    assert client.close() == 0
+
+
+def test_hover_shows_the_innermost_node(client):
+    client.send(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": "file:///a.lox",
+                    "version": 0,
+                    "text": "(1 + 2) *\n  x",
+                }
+            },
+        }
+    )
+    published = client.receive()
+    assert published["method"] == "textDocument/publishDiagnostics"
+    assert published["params"]["diagnostics"] == []
+
+    assert client.hover(1, 0, 1) == "1.0"
+    assert client.hover(2, 0, 3) == "(+  1.0 2.0)"
+    assert client.hover(3, 0, 6) == "(group  (+  1.0 2.0))"
+    assert client.hover(4, 0, 8) == "(*  (group  (+  1.0 2.0)) x)"
+    assert client.hover(5, 1, 2) == "x"
+    # Between tokens.
+    assert client.hover(6, 1, 0) is None
+
+    client.send(
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": "file:///a.lox", "version": 1},
+                "contentChanges": [
+                    {
+                        "range": {
+                            "start": {"line": 0, "character": 5},
+                            "end": {"line": 0, "character": 6},
+                        },
+                        "text": "y",
+                    }
+                ],
+            },
+        }
+    )
+    assert client.hover(7, 0, 3) == "(+  1.0 y)"
+    assert client.close() == 0
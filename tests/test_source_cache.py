@@ -0,0 +1,41 @@
+from pylox.expression import ExpressionFactory
+from pylox.interning import InterningFactory
+from pylox.node_counter import NodeCounter
+from pylox.parser import Parser
+from pylox.scanner import Scanner
+from pylox.source_cache import SourceCache
+
+
+def parse(source: str, factory: ExpressionFactory = ExpressionFactory()):
+    return Parser(Scanner(source).scan_tokens(), factory).parse()
+
+
+def test_options_are_part_of_the_key():
+    cache = SourceCache()
+    source = "(1 + 2) * (1 + 2)"
+    tree = parse(source)
+    cache.put(source, tree, (False,))
+    assert cache.get(source, (True,)) is None
+    assert cache.get(source, (False,)) is tree
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_shared_nodes_are_counted_once():
+    # Each level doubles the size of the tree but adds two distinct nodes, a
+    # grouping and a binary expression.
+    levels = 14
+    source = "1"
+    for _ in range(levels):
+        source = f"({source} + {source})"
+    tree = parse(source, InterningFactory())
+    assert NodeCounter().count(tree, distinct=True) == 2 * levels + 1
+    assert NodeCounter().count(parse(source)) == 3 * 2**levels - 2
+
+
+def test_size_bound():
+    cache = SourceCache(max_bytes=4096)
+    for i in range(100):
+        source = f"{i} + {i}"
+        cache.put(source, parse(source))
+    assert cache.size <= 4096
+    assert cache.evictions > 0
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+# Runs the checks of `benchmarks/startup.py`: each way of starting pylox must
+# leave the modules that only other modes need unimported. Import times
+# depend on the machine, so their budgets are only checked with
+# `PYLOX_STARTUP_BUDGET=1` in the environment, on a machine like the one they
+# were set on.
+
+_path = Path(__file__).resolve().parents[1] / "benchmarks" / "startup.py"
+_spec = importlib.util.spec_from_file_location("startup", _path)
+startup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(startup)
+
+MODES = ["import", "run", "check"]
+
+
+@pytest.fixture(scope="module")
+def environment():
+    return startup.source_environment()
+
+
+@pytest.fixture(scope="module")
+def baseline(environment):
+    return set(startup.import_times(["-c", "pass"], environment))
+
+
+@pytest.fixture(scope="module")
+def source_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("startup") / "source.lox"
+    path.write_text("(1 + 2) * 3\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_lazy_imports(mode: str, environment, baseline, source_file):
+    arguments, forbidden, _ = startup.modes(source_file)[mode]
+    imported = set(startup.import_times(arguments, environment)) - baseline
+    assert sorted(imported & forbidden) == []
+
+
+@pytest.mark.skipif(
+    os.environ.get("PYLOX_STARTUP_BUDGET") != "1",
+    reason="set PYLOX_STARTUP_BUDGET=1 to check import times",
+)
+@pytest.mark.parametrize("mode", MODES)
+def test_import_budget(mode: str, environment, baseline, source_file):
+    arguments, _, budget = startup.modes(source_file)[mode]
+    median, _ = startup.measure(arguments, environment, baseline, 5)
+    assert median <= budget
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from pylox.expression_arena import ExpressionArena
+from pylox.parser import Parser
+from pylox.regex_scanner import RegexScanner
+from pylox.reporter import Diagnostics
+from pylox.token_buffer import _offset_type
+
+# A `Parser` reading a `TokenBuffer` in place must build the same trees and
+# report the same errors as one reading the buffer's tokens from a list.
+
+PIECES = [
+    "1",
+    "2.5",
+    "x",
+    '"s"',
+    '"a\nb"',
+    "true",
+    "nil",
+    "(",
+    ")",
+    "!",
+    "-",
+    "+",
+    "*",
+    ",",
+    "==",
+    "<",
+    "?",
+    ":",
+    ";",
+    "var",
+    "\n",
+    "@",
+]
+
+
+def parse(tokens, arena: bool, program: bool):
+    diagnostics = Diagnostics()
+    factory = ExpressionArena() if arena else None
+    if factory is None:
+        parser = Parser(tokens, diagnostics=diagnostics)
+    else:
+        parser = Parser(tokens, factory, diagnostics)
+    if program:
+        result = list(parser.parse_program())
+    else:
+        result = parser.parse()
+    if arena:
+        result = (
+            result,
+            list(factory.kinds),
+            [list(slot) for slot in factory.slots],
+            factory.tokens,
+            factory.values,
+        )
+    return result, diagnostics.diagnostics
+
+
+@pytest.mark.parametrize("program", [False, True])
+@pytest.mark.parametrize("arena", [False, True])
+def test_buffer_parses_as_list(arena: bool, program: bool):
+    rng = random.Random(0)
+    for _ in range(2000):
+        source = " ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 16)))
+        buffer = RegexScanner(source, Diagnostics()).scan_token_buffer()
+        tokens = RegexScanner(source, Diagnostics()).scan_tokens()
+        assert list(buffer) == tokens, source
+        assert parse(buffer, arena, program) == parse(tokens, arena, program), source
+
+
+def test_offsets_past_4_gib():
+    assert _offset_type(0) == "I"
+    assert _offset_type((1 << 32) - 2) == "I"
+    assert _offset_type((1 << 32) - 1) == "Q"
+    assert _offset_type(1 << 40) == "Q"
@@ -0,0 +1,84 @@
+import random
+
+from pylox.expression import ExpressionFactory
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.reporter import RuntimeException
+from pylox.scanner import Scanner
+from pylox.transpiler import PythonBackend, StructuralKey
+
+ATOMS = ["0", "1", "2.5", '"a"', '"b"', "true", "false", "nil", "x"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    space = rng.choice([" ", "\n"])
+    operator = rng.choice(["+", "-", "*", "/", "==", "!=", "<", ">=", ","])
+    return rng.choice(
+        [
+            f"({left} {operator}{space}{right})",
+            f"({left} ?{space}{right} : {left})",
+            f"-{left}",
+            f"!{left}",
+        ]
+    )
+
+
+def parse(source: str):
+    return Parser(Scanner(source).scan_tokens(), ExpressionFactory()).parse()
+
+
+def evaluate(function):
+    try:
+        return repr(function())
+    except RuntimeException as exception:
+        return exception.message, exception.token.line
+
+
+def test_random_sources():
+    # The compiled code returns what the `Interpreter` does, and fails with
+    # the same error on the same line, whether or not it comes from the
+    # cache.
+    rng = random.Random(0)
+    backend = PythonBackend(maxsize=64)
+    for _ in range(2000):
+        source = random_source(rng, rng.randint(0, 5))
+        expression = parse(source)
+        expected = evaluate(lambda: Interpreter().evaluate(expression))
+        assert evaluate(lambda: backend.evaluate(expression)) == expected, source
+        assert evaluate(lambda: backend.evaluate(parse(source))) == expected, source
+
+
+def test_cache_hits_by_tree_and_by_structure(monkeypatch):
+    backend = PythonBackend()
+    tree = parse("1 + 2 * 3")
+    function = backend.compile(tree)
+    assert backend.evaluate(tree) == 7
+
+    # The same tree again is found without building its key.
+    monkeypatch.setattr(StructuralKey, "key", None)
+    assert backend.compile(tree) is function
+    monkeypatch.undo()
+    # An equal tree is found by its key.
+    assert backend.compile(parse("1 + 2 * 3")) is function
+    assert backend.compile(parse("1 + 2 * 4")) is not function
+
+
+def test_cache_bounds():
+    backend = PythonBackend(maxsize=4, max_key_length=60)
+    trees = [parse(f"{i} + {i} * 2") for i in range(10)]
+    functions = [backend.compile(tree) for tree in trees]
+    assert [function() for function in functions] == [3 * i for i in range(10)]
+    # The oldest trees were evicted, the newest kept.
+    assert backend.compile(trees[0]) is not functions[0]
+    assert backend.compile(trees[9]) is functions[9]
+
+
+def test_too_deep_to_compile():
+    # Evaluated by the `Evaluator` instead.
+    backend = PythonBackend()
+    assert backend.evaluate(parse("+".join(["1"] * 20000))) == 20000
+    assert backend.evaluate(parse("-" * 3001 + "1")) == -1
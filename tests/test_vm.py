@@ -0,0 +1,78 @@
+import random
+
+from pylox.compiler import Compiler
+from pylox.interpreter import Interpreter
+from pylox.parser import Parser
+from pylox.reporter import Diagnostics, RuntimeException
+from pylox.scanner import Scanner
+from pylox.vm import VM
+
+# The `VM` must return what the `Interpreter` does for a compiled chunk, and
+# fail with the same error on the same line.
+
+ATOMS = ["0", "1", "2.5", '"a"', '"b"', "true", "false", "nil", "x"]
+
+
+def random_source(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(ATOMS)
+    left = random_source(rng, depth - 1)
+    right = random_source(rng, depth - 1)
+    space = rng.choice([" ", "\n"])
+    operator = rng.choice(["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ","])
+    return rng.choice(
+        [
+            f"({left} {operator}{space}{right})",
+            f"({left} ?{space}{right} : {left})",
+            f"-{left}",
+            f"!{left}",
+        ]
+    )
+
+
+def parse(source: str):
+    diagnostics = Diagnostics()
+    tokens = Scanner(source, diagnostics=diagnostics).scan_tokens()
+    expression = Parser(tokens, diagnostics=diagnostics).parse()
+    assert not diagnostics.has_error(), source
+    return expression
+
+
+def evaluate(function):
+    try:
+        return repr(function())
+    except RuntimeException as exception:
+        return exception.message, exception.token.line
+
+
+def run(expression):
+    return VM().run(Compiler().compile(expression))
+
+
+def test_random_sources():
+    rng = random.Random(0)
+    for _ in range(3000):
+        source = random_source(rng, rng.randint(0, 6))
+        expression = parse(source)
+        expected = evaluate(lambda: Interpreter().evaluate(expression))
+        assert evaluate(lambda: run(expression)) == expected, source
+
+
+def test_error_lines():
+    # Operands are evaluated in order, and each error names its operator's
+    # line, or the variable's.
+    assert evaluate(lambda: run(parse("1 +\n2 *\n-true"))) == (
+        "Operand must be a number.",
+        3,
+    )
+    assert evaluate(lambda: run(parse('true ?\n"a" < 1 :\n2'))) == (
+        "Operands must be numbers.",
+        2,
+    )
+    assert evaluate(lambda: run(parse("1,\n\nx"))) == ("Undefined variable 'x'.", 3)
+
+
+def test_deep_trees():
+    assert run(parse(" + ".join(["1"] * 20000))) == 20000.0
+    assert run(parse("(" * 5000 + "1" + ")" * 5000)) == 1.0
+    assert run(parse("!" * 5001 + "nil")) is True
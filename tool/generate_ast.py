@@ -13,67 +13,140 @@ def __title_case_to_camel_case(title_case: str) -> str:
     return camel_case
 
 
-def define_ast() -> str:
+@dataclass
+class ClassType:
     @dataclass
-    class ClassType:
-        @dataclass
-        class PropertyType:
-            name: str
-            type: str
-
+    class PropertyType:
         name: str
-        base_name: str
-        property_types: List[PropertyType]
+        type: str
+
+    name: str
+    base_name: str
+    property_types: List[PropertyType]
+
+
+CLASS_TYPES: List[ClassType] = [
+    ClassType(
+        "BinaryExpression",
+        "Expression",
+        [
+            ClassType.PropertyType("left", "Expression"),
+            ClassType.PropertyType("operator", "Token"),
+            ClassType.PropertyType("right", "Expression"),
+        ],
+    ),
+    ClassType(
+        "GroupingExpression",
+        "Expression",
+        [ClassType.PropertyType("expression", "Expression")],
+    ),
+    ClassType(
+        "LiteralExpression", "Expression", [ClassType.PropertyType("value", "any")]
+    ),
+    ClassType(
+        "UnaryExpression",
+        "Expression",
+        [
+            ClassType.PropertyType("operator", "Token"),
+            ClassType.PropertyType("right", "Expression"),
+        ],
+    ),
+    ClassType(
+        "TernaryExpression",
+        "Expression",
+        [
+            ClassType.PropertyType("conditional_expression", "Expression"),
+            ClassType.PropertyType("true_expression", "Expression"),
+            ClassType.PropertyType("false_expression", "Expression"),
+        ],
+    ),
+    ClassType(
+        "VariableExpression", "Expression", [ClassType.PropertyType("name", "Token")]
+    ),
+]
+
+
+def define_plain_class(class_type: ClassType, slots: bool = False) -> str:
+    # Spells out what `@dataclass` would generate, `__init__`, `__repr__` and
+    # `__eq__`, so that importing the module does not run the decorator or
+    # import `dataclasses`.
+    names = [property_type.name for property_type in class_type.property_types]
+    parameters = ", ".join(
+        f"{property_type.name}: {property_type.type}"
+        for property_type in class_type.property_types
+    )
+    fields = ", ".join(f"{name}={{self.{name}!r}}" for name in names)
+    own_values = "".join(f"self.{name}, " for name in names)
+    other_values = "".join(f"other.{name}, " for name in names)
+    lines = [
+        *([f"__slots__ = {tuple(names)!r}"] if slots else []),
+        f"__match_args__ = {tuple(names)!r}",
+        "__hash__ = None",
+        f"def __init__(self, {parameters}):",
+        *(f"    self.{name} = {name}" for name in names),
+        "def __repr__(self) -> str:",
+        f"    return f'{class_type.name}({fields})'",
+        "def __eq__(self, other) -> bool:",
+        "    if self is other:",
+        "        return True",
+        "    if other.__class__ is not self.__class__:",
+        "        return NotImplemented",
+        f"    return ({own_values}) == ({other_values})",
+        "def accept[T](self, visitor: Visitor[T]) -> T:",
+        f"    return visitor.visit_{__title_case_to_camel_case(class_type.name)}(self)",
+    ]
+    return f"class {class_type.name}({class_type.base_name}):\n" + "\n".join(
+        f"    {line}" for line in lines
+    )
+
 
+def define_ast(slots: bool = False, frozen: bool = False, plain: bool = False) -> str:
     imports = [
         ast.ImportFrom(module="__future__", names=[ast.alias(name="annotations")]),
         ast.ImportFrom(
             module="abc",
             names=[ast.alias(name="ABC"), ast.alias(name="abstractmethod")],
         ),
-        ast.ImportFrom(module="dataclasses", names=[ast.alias(name="dataclass")]),
+        *(
+            []
+            if plain
+            else [
+                ast.ImportFrom(
+                    module="dataclasses", names=[ast.alias(name="dataclass")]
+                )
+            ]
+        ),
         ast.ImportFrom(module="pylox.tokens", names=[ast.alias(name="Token")]),
     ]
 
-    class_types: List[ClassType] = [
-        ClassType(
-            "BinaryExpression",
-            "Expression",
-            [
-                ClassType.PropertyType("left", "Expression"),
-                ClassType.PropertyType("operator", "Token"),
-                ClassType.PropertyType("right", "Expression"),
-            ],
-        ),
-        ClassType(
-            "GroupingExpression",
-            "Expression",
-            [ClassType.PropertyType("expression", "Expression")],
-        ),
-        ClassType(
-            "LiteralExpression", "Expression", [ClassType.PropertyType("value", "any")]
-        ),
-        ClassType(
-            "UnaryExpression",
-            "Expression",
-            [
-                ClassType.PropertyType("operator", "Token"),
-                ClassType.PropertyType("right", "Expression"),
-            ],
-        ),
-        ClassType(
-            "TernaryExpression",
-            "Expression",
-            [
-                ClassType.PropertyType("conditional_expression", "Expression"),
-                ClassType.PropertyType("true_expression", "Expression"),
-                ClassType.PropertyType("false_expression", "Expression"),
-            ],
-        ),
+    dataclass_options = [
+        ast.keyword(arg=option, value=ast.Constant(value=True))
+        for option, enabled in [("slots", slots), ("frozen", frozen)]
+        if enabled
     ]
+    dataclass_decorator = (
+        ast.Call(func=ast.Name(id="dataclass"), args=[], keywords=dataclass_options)
+        if len(dataclass_options) > 0
+        else ast.Name(id="dataclass")
+    )
 
     base_classes = [
-        ast.ClassDef(name="Expression", bases=[ast.Name(id="ABC")], body=[ast.Pass()])
+        ast.ClassDef(
+            name="Expression",
+            bases=[ast.Name(id="ABC")],
+            # Without empty `__slots__` on the base, slotted subclasses would
+            # still get a per-instance `__dict__`.
+            body=[
+                ast.fix_missing_locations(
+                    ast.Assign(
+                        targets=[ast.Name(id="__slots__", ctx=ast.Store())],
+                        value=ast.Tuple(elts=[]),
+                    )
+                )
+                if slots
+                else ast.Pass()
+            ],
+        )
     ]
     sub_classes = map(
         lambda class_type: ast.ClassDef(
@@ -117,10 +190,38 @@ def define_ast() -> str:
                     )
                 )
             ],
-            decorator_list=[ast.Name(id="dataclass")],
+            decorator_list=[dataclass_decorator],
         ),
-        class_types,
+        CLASS_TYPES,
     )
+    if plain:
+        sub_classes = ast.parse(
+            "\n".join(
+                define_plain_class(class_type, slots) for class_type in CLASS_TYPES
+            )
+        ).body
+    factory_classes = [
+        ast.ClassDef(
+            name="ExpressionFactory",
+            bases=[],
+            body=list(
+                map(
+                    lambda class_type: ast.fix_missing_locations(
+                        ast.Assign(
+                            targets=[
+                                ast.Name(
+                                    id=__title_case_to_camel_case(class_type.name),
+                                    ctx=ast.Store(),
+                                )
+                            ],
+                            value=ast.Name(id=class_type.name),
+                        )
+                    ),
+                    CLASS_TYPES,
+                )
+            ),
+        )
+    ]
     visitor_classes = [
         ast.ClassDef(
             name="Visitor",
@@ -145,25 +246,157 @@ def define_ast() -> str:
                             decorator_list=[ast.Name(id="abstractmethod")],
                         )
                     ),
-                    class_types,
+                    CLASS_TYPES,
                 )
             ),
         )
     ]
 
     return ast.unparse(
-        ast.Module(body=[*imports, *base_classes, *sub_classes, *visitor_classes])
+        ast.Module(
+            body=[
+                *imports,
+                *base_classes,
+                *sub_classes,
+                *factory_classes,
+                *visitor_classes,
+            ]
+        )
+    )
+
+
+def define_arena() -> str:
+    # Emits an `ExpressionArena` that stores nodes as indices into parallel
+    # arrays: one kind id per node, and one slot array per property position.
+    # A slot holds a child node index for `Expression` properties, an index
+    # into `tokens` for `Token` properties, and an index into `values` for
+    # anything else. It has the same factory methods as `ExpressionFactory`,
+    # and `node()` wraps an index in a view that `Visitor`s can walk.
+    slot_count = max(len(class_type.property_types) for class_type in CLASS_TYPES)
+
+    def define_factory_method(class_type: ClassType) -> str:
+        method_name = __title_case_to_camel_case(class_type.name)
+        parameters = ", ".join(
+            f"{property_type.name}: "
+            + ("int" if property_type.type == "Expression" else property_type.type)
+            for property_type in class_type.property_types
+        )
+        body = []
+        for slot in range(slot_count):
+            if slot >= len(class_type.property_types):
+                body.append(f"self.slots[{slot}].append(-1)")
+                continue
+            property_type = class_type.property_types[slot]
+            if property_type.type == "Expression":
+                # The parser carries on after reporting some errors with a
+                # missing operand, which is stored as unused.
+                name = property_type.name
+                body.append(
+                    f"self.slots[{slot}].append(-1 if {name} is None else {name})"
+                )
+            else:
+                table = "tokens" if property_type.type == "Token" else "values"
+                body.append(f"self.slots[{slot}].append(len(self.{table}))")
+                body.append(f"self.{table}.append({property_type.name})")
+        kind_name = method_name.upper()
+        body.append(f"self.kinds.append(ExpressionArena.{kind_name})")
+        body.append("return len(self.kinds) - 1")
+        return f"def {method_name}(self, {parameters}) -> int:\n" + "\n".join(
+            f"    {line}" for line in body
+        )
+
+    def define_view_class(class_type: ClassType) -> str:
+        properties = []
+        for slot, property_type in enumerate(class_type.property_types):
+            if property_type.type == "Expression":
+                value = f"self.arena.node(self.arena.slots[{slot}][self.index])"
+            else:
+                table = "tokens" if property_type.type == "Token" else "values"
+                value = f"self.arena.{table}[self.arena.slots[{slot}][self.index]]"
+            properties.append(
+                f"@property\n"
+                f"def {property_type.name}(self) -> {property_type.type}:\n"
+                f"    return {value}"
+            )
+        method_name = __title_case_to_camel_case(class_type.name)
+        return f"class Arena{class_type.name}({class_type.base_name}):\n" + "\n".join(
+            f"    {line}"
+            for line in [
+                "__slots__ = ('arena', 'index')",
+                "def __init__(self, arena: ExpressionArena, index: int):",
+                "    self.arena = arena",
+                "    self.index = index",
+                *"\n".join(properties).split("\n"),
+                "def accept[T](self, visitor: Visitor[T]) -> T:",
+                f"    return visitor.visit_{method_name}(self)",
+            ]
+        )
+
+    kind_constants = "\n".join(
+        f"    {__title_case_to_camel_case(class_type.name).upper()} = {kind}"
+        for kind, class_type in enumerate(CLASS_TYPES)
     )
+    factory_methods = "\n".join(
+        "\n".join(f"    {line}" for line in define_factory_method(c).split("\n"))
+        for c in CLASS_TYPES
+    )
+    slot_arrays = ", ".join("array('i')" for _ in range(slot_count))
+    source = f"""
+from __future__ import annotations
+from array import array
+from typing import List
+from pylox.expression import Expression, Visitor
+from pylox.tokens import Token
+
+class ExpressionArena:
+{kind_constants}
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.slots = ({slot_arrays},)
+        self.tokens: List[Token] = []
+        self.values: List[any] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def node(self, index: int) -> Expression:
+        return NODE_CLASSES[self.kinds[index]](self, index)
+
+{factory_methods}
+
+{"\n\n".join(define_view_class(class_type) for class_type in CLASS_TYPES)}
+
+NODE_CLASSES = ({", ".join(f"Arena{class_type.name}" for class_type in CLASS_TYPES)},)
+"""
+    return ast.unparse(ast.parse(source))
+
+
+def generate_ast(
+    output_file: str, slots: bool = False, frozen: bool = False, plain: bool = False
+) -> None:
+    with open(output_file, "w+") as file:
+        file.writelines(define_ast(slots, frozen, plain))
 
 
-def generate_ast(output_file: str) -> None:
+def generate_arena(output_file: str) -> None:
     with open(output_file, "w+") as file:
-        file.writelines(define_ast())
+        file.writelines(define_arena())
 
 
 if __name__ == "__main__":
     parser = ArgumentParser(prog="pylox", description="Lox tool to generate ASTs")
     parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--slots", action="store_true", default=False)
+    parser.add_argument("--frozen", action="store_true", default=False)
+    parser.add_argument("--arena-output", required=False)
+    # Emits the methods `@dataclass` would add instead of the decorator, which
+    # keeps `dataclasses` out of the import of `pylox.expression`.
+    parser.add_argument("--plain", action="store_true", default=False)
 
     args = parser.parse_args()
-    generate_ast(args.output)
+    if args.plain and args.frozen:
+        parser.error("--frozen is not supported with --plain")
+    generate_ast(args.output, args.slots, args.frozen, args.plain)
+    if args.arena_output is not None:
+        generate_arena(args.arena_output)